@@ -0,0 +1,78 @@
+"""
+Compares the default SQLite connection settings with the configured
+`[database.performance]` profile on the trip repository queries.
+
+Usage: python -m app.cli.benchmark_db [--trips 20] [--repeat 3]
+
+Each run starts with a fresh connection pool, so the first pass measures
+loads with an empty SQLite page cache. The operating system file cache is
+not dropped; run the tool once beforehand for comparable numbers.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from app.repositories import trip
+from tools.config import load_config
+from tools.database.sqlite.ConnectionPool import ConnectionPool
+from tools.database.sqlite.ConnectionProfile import ConnectionProfile
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_profile(
+    db_name: str, profile: ConnectionProfile, traj_ids: List[int], repeat: int
+) -> Dict[str, List[float]]:
+    # Repositories share the registered pool, so registering one first makes
+    # them read through this profile
+    ConnectionPool.close_all()
+    ConnectionPool.get(db_name, factory=profile.connect_reader)
+
+    timings: Dict[str, List[float]] = {"load_all_trips": [], "load_signals": []}
+    for _ in range(repeat):
+        timings["load_all_trips"].append(_timed(trip.load_all_trips))
+        timings["load_signals"].append(
+            _timed(lambda: [trip.load_signals(traj_id) for traj_id in traj_ids])
+        )
+    ConnectionPool.close_all()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=20, help="Trips to load")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per profile")
+    parser.add_argument("--seed", type=int, default=0, help="Trip sampling seed")
+    args = parser.parse_args()
+
+    db_name = EvedDb().db_name
+    all_ids = [int(traj_id) for traj_id in trip.load_all_trips()["traj_id"]]
+    traj_ids = random.Random(args.seed).sample(all_ids, min(args.trips, len(all_ids)))
+
+    settings = load_config()["database"].get("performance", {})
+    profiles = {
+        "default": ConnectionProfile(),
+        "configured": ConnectionProfile.from_config(settings),
+    }
+
+    print(f"{len(traj_ids)} trips, {args.repeat} passes from a fresh pool")
+    for name, profile in profiles.items():
+        for query, times in run_profile(
+            db_name, profile, traj_ids, args.repeat
+        ).items():
+            print(
+                f"{name:>10}  {query:<15} first {times[0] * 1000:8.1f} ms"
+                f"  median {statistics.median(times) * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Builds the memory-mapped trip column store in bulk.
+
+Usage: python -m app.cli.build_column_cache [--batch 200] [--rebuild]
+"""
+
+import argparse
+import time
+
+from app.repositories.column_store import get_column_store
+from app.repositories.trip import load_all_trips, load_signals_many
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=200, help="Trips per query")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Discard existing cached trips"
+    )
+    args = parser.parse_args()
+
+    store = get_column_store()
+    if store is None:
+        raise SystemExit("The column store is disabled, see [cache.columns]")
+    if args.rebuild:
+        store.reset()
+
+    traj_ids = [
+        int(traj_id)
+        for traj_id in load_all_trips()["traj_id"]
+        if not store.contains(int(traj_id))
+    ]
+    start = time.perf_counter()
+    for i in range(0, len(traj_ids), args.batch):
+        load_signals_many(traj_ids[i : i + args.batch])
+        done = min(i + args.batch, len(traj_ids))
+        print(f"Cached {done}/{len(traj_ids)} trips")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Rebuilds the H3 aggregate cube of the configured database, for the speed
+density map layer.
+
+Usage: python -m app.cli.build_h3_cube
+
+The aggregated signal columns are held in memory while the cube is built,
+24 bytes per signal.
+"""
+
+import argparse
+import time
+
+from app.services.cube import build_h3_cube
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def report(resolution: int, count: int) -> None:
+    print(f"Resolution {resolution}: {count:,} cells")
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.strip().splitlines()[0]).parse_args()
+
+    start = time.perf_counter()
+    count = build_h3_cube(EvedDb(), report=report)
+    print(f"Built {count:,} cube cells in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Rebuilds the H3 cell to trip table of the configured database, used by area
+queries.
+
+Usage: python -m app.cli.build_trip_cells [--chunk 200]
+"""
+
+import argparse
+import time
+
+from app.services.spatial import build_trip_cells
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def report(done: int, total: int) -> None:
+    print(f"Indexed {done}/{total} trips", end="\r", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk", type=int, default=200, help="Trips per query")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_trip_cells(EvedDb(), chunk_size=args.chunk, report=report)
+    print()
+    print(f"Indexed {count:,} trip cells in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
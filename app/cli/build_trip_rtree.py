@@ -0,0 +1,33 @@
+"""
+Rebuilds the R*Tree spatial index of trip segments of the configured database.
+
+Usage: python -m app.cli.build_trip_rtree [--segment 64] [--chunk 200]
+"""
+
+import argparse
+import time
+
+from app.services.spatial import build_trip_rtree
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def report(done: int, total: int) -> None:
+    print(f"Indexed {done}/{total} trips", end="\r", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segment", type=int, default=64, help="Points per box")
+    parser.add_argument("--chunk", type=int, default=200, help="Trips per query")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_trip_rtree(
+        EvedDb(), segment_size=args.segment, chunk_size=args.chunk, report=report
+    )
+    print()
+    print(f"Indexed {count:,} segment boxes in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
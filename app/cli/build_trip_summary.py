@@ -0,0 +1,33 @@
+"""
+Rebuilds the materialized trip summary table of the configured database.
+
+Usage: python -m app.cli.build_trip_summary [--chunk 200]
+
+Run it again after loading or rebuilding the node table, as the summaries
+hold the node counts.
+"""
+
+import argparse
+import time
+
+from app.services.summary import build_trip_summaries
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def report(done: int, total: int) -> None:
+    print(f"Summarized {done}/{total} trips", end="\r", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk", type=int, default=200, help="Trips per query")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_trip_summaries(EvedDb(), chunk_size=args.chunk, report=report)
+    print()
+    print(f"Summarized {count} trips in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
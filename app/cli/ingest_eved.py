@@ -0,0 +1,50 @@
+"""
+Loads an eVED CSV release into the configured database.
+
+Usage: python -m app.cli.ingest_eved FOLDER [--vehicles FILE] [--batch 100000]
+
+Signal files are the `*.csv` files in FOLDER. Files loaded by a previous run
+are skipped, so an interrupted load resumes by running the command again.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app.services.ingest import EvedIngest, IngestProgress
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def report(progress: IngestProgress) -> None:
+    print(progress, end="\r", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", help="Folder with the eVED signal CSV files")
+    parser.add_argument("--vehicles", help="Vehicle static data CSV file")
+    parser.add_argument(
+        "--batch", type=int, default=100_000, help="Rows per insert batch"
+    )
+    args = parser.parse_args()
+
+    vehicles = Path(args.vehicles).resolve() if args.vehicles else None
+    signal_files = sorted(
+        path for path in Path(args.folder).glob("*.csv") if path.resolve() != vehicles
+    )
+
+    start = time.perf_counter()
+    ingest = EvedIngest(EvedDb(), batch_size=args.batch, report=report)
+    loaded = ingest.run(signal_files, vehicle_file=vehicles)
+    print()
+
+    rows = sum(progress.rows for progress in loaded)
+    seconds = time.perf_counter() - start
+    print(
+        f"Loaded {len(loaded)} of {len(signal_files)} files, {rows:,} rows "
+        f"in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
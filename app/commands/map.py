@@ -1,11 +1,11 @@
 from typing import Any
 
 from app.viewmodels.map import MapViewModel, NotNoneValueConverter
-from nicemvvm.command import Command
+from nicemvvm.command import AsyncCommand
 from nicemvvm.observables.observability import Observer
 
 
-class AddRouteToMapCommand(Command, Observer):
+class AddRouteToMapCommand(AsyncCommand, Observer):
     def __init__(self, view_model: MapViewModel, trace_name: str, **kwargs):
         self._view_model = view_model
         self._trace_name = trace_name
@@ -17,13 +17,11 @@ class AddRouteToMapCommand(Command, Observer):
             converter=NotNoneValueConverter(),
         )
 
-    def execute(self, arg: Any = None) -> Any:
+    async def async_execute(self, arg: Any = None) -> Any:
         trip = self._view_model.selected_trip
         if trip is not None:
-            if len(trip.signals) == 0:
-                trip.load_signals()
-            if len(trip.nodes) == 0:
-                trip.load_nodes()
+            await trip.load_signals_async()
+            await trip.load_nodes_async()
             self._view_model.show_polyline(trip, self._trace_name)
         else:
             print("No trip selected")
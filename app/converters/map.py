@@ -1,5 +1,9 @@
 from typing import Any, Dict
 
+import numpy as np
+import pandas as pd
+
+from app.geo.hexagons import cells_to_boundaries
 from app.viewmodels.circle import MapCircle
 from app.viewmodels.map import MapPolygon, MapPolyline
 from nicemvvm.controls.leaflet.circle import Circle
@@ -68,6 +72,7 @@ class MapPolylineMapConverter(ValueConverter):
                 color=map_polyline.color,
                 weight=map_polyline.weight,
                 opacity=map_polyline.opacity,
+                detail=map_polyline.encoded_at_zoom,
             )
             .bind(map_polyline, "color", "color")
             .bind(map_polyline, "weight", "weight")
@@ -130,3 +135,47 @@ class MapCircleMapConverter(ValueConverter):
             .bind(map_circle, "dash_array", "dash_array")
         )
         return circle
+
+
+class DensityGeoJsonConverter(ValueConverter):
+    """
+    Converts aggregate cube cells into GeoJSON hexagons, colored by their
+    median speed.
+    """
+
+    # Upper speed bounds in km/h and their colors, from slow to fast
+    SPEED_COLORS = (
+        (15.0, "#b2182b"),
+        (30.0, "#ef8a62"),
+        (50.0, "#fddbc7"),
+        (70.0, "#67a9cf"),
+        (np.inf, "#2166ac"),
+    )
+
+    # Cells without speeds
+    NO_SPEED_COLOR = "#999999"
+
+    def convert(self, cells: pd.DataFrame | None) -> Dict[str, Any] | None:
+        if cells is None or cells.empty:
+            return None
+        bounds = np.array([bound for bound, _ in self.SPEED_COLORS])
+        colors = [color for _, color in self.SPEED_COLORS] + [self.NO_SPEED_COLOR]
+        speeds = cells["speed_p50"].to_numpy(dtype=np.float64)
+        bands = np.where(np.isnan(speeds), len(bounds), np.searchsorted(bounds, speeds))
+        rings = cells_to_boundaries(cells["h3_cell"].to_numpy(dtype=np.int64))
+
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": ring},
+                "properties": {
+                    "style": {
+                        "stroke": False,
+                        "fillColor": colors[band],
+                        "fillOpacity": 0.5,
+                    },
+                },
+            }
+            for ring, band in zip(rings, bands.tolist())
+        ]
+        return {"type": "FeatureCollection", "features": features}
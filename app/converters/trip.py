@@ -1,18 +1,52 @@
-from typing import Dict
+from typing import Any, Dict
 
-from app.models.TripModel import Trip
+from app.models.TripModel import Trip, TripModel
 from nicemvvm.converter import ValueConverter
+from nicemvvm.ResourceLocator import ResourceLocator
 
 
 class TripToDictConverter(ValueConverter):
-    def __init__(self):
+    """
+    Converts trips into grid rows. Only scalar fields are sent to the grid,
+    the loaded signals and nodes stay on the server. Rows are resolved back
+    through the trip model, so the converter holds no trips itself.
+    """
+
+    def __init__(self, trip_model: TripModel | None = None):
         super().__init__()
+        self._trip_model = trip_model
+
+    @property
+    def trip_model(self) -> TripModel:
+        if self._trip_model is None:
+            self._trip_model = ResourceLocator()["TripModel"]
+        return self._trip_model
 
-    def convert(self, trip: Trip) -> Dict:
+    def convert(self, trip: Trip | None) -> Dict[str, Any]:
         if trip:
-            return trip.__dict__ | {"_source": trip}
+            summary = trip.summary
+            return {
+                "traj_id": trip.traj_id,
+                "vehicle_id": trip.vehicle_id,
+                "trip_id": trip.trip_id,
+                "km": trip.km,
+                "duration": trip.duration,
+                "engine": trip.engine,
+                "weight": trip.weight,
+                "start": trip.start,
+                "end": trip.end,
+                # Precomputed, see TripSummary
+                "points": summary.point_count if summary else None,
+                "avg_speed": (
+                    round(summary.avg_speed, 1)
+                    if summary and summary.avg_speed is not None
+                    else None
+                ),
+                "max_speed": summary.max_speed if summary else None,
+            }
         else:
-            return {"_source": None}
+            return {}
 
-    def reverse_convert(self, value: Dict) -> Trip:
-        return value["_source"]
+    def reverse_convert(self, value: Dict[str, Any]) -> Trip | None:
+        traj_id = value.get("traj_id") if value else None
+        return None if traj_id is None else self.trip_model.get(traj_id)
@@ -2,6 +2,10 @@ import math
 from typing import List, Tuple
 
 import numpy as np
+import shapely
+from shapely import STRtree
+
+from app.geo.projection import LocalProjection, projection_for
 
 
 def vec_haversine(
@@ -138,8 +142,8 @@ def x_meters_to_degrees(meters: float, lat: float, lon: float) -> float:
     :param lon: Longitude of reference location
     :return: Horizontal angle in degrees
     """
-    _, lon2 = delta_location(lat, lon, 90, meters)
-    return abs(lon - lon2)
+    _, lon2 = LocalProjection(lat, lon).inverse(meters, 0.0)
+    return abs(lon - float(lon2))
 
 
 def y_meters_to_degrees(meters: float, lat: float, lon: float) -> float:
@@ -150,8 +154,8 @@ def y_meters_to_degrees(meters: float, lat: float, lon: float) -> float:
     :param lon: Longitude of reference location
     :return: Vertical angle in degrees
     """
-    lat2, _ = delta_location(lat, lon, 0, meters)
-    return abs(lat - lat2)
+    lat2, _ = LocalProjection(lat, lon).inverse(0.0, meters)
+    return abs(lat - float(lat2))
 
 
 def vec_bearings(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
@@ -189,66 +193,165 @@ def heron_distance(a: float, b: float, c: float) -> float:
     return 2 * area / b
 
 
-def decode_polyline(encoded: str, order: str = "lonlat") -> List[List]:
+def vec_cross_track(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    path_lats: np.ndarray,
+    path_lons: np.ndarray,
+    projection: LocalProjection | None = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Projects points onto the nearest segment of a path, on a local projection
+    centered on the path. Nearest segments come from an STRtree query, so the
+    cost grows with n log m rather than n * m.
+    :param lats: Array of point latitudes in degrees
+    :param lons: Array of point longitudes in degrees
+    :param path_lats: Array of path vertex latitudes in degrees
+    :param path_lons: Array of path vertex longitudes in degrees
+    :param projection: Planar frame, by default centered on the path
+    :return: Offset distances from the path and along-track positions, in
+        meters, and the index of the nearest segment; NaN and -1 for missing
+        points, or when the path is empty
+    """
+    n = len(lats)
+    offsets = np.full(n, np.nan)
+    along = np.full(n, np.nan)
+    segments = np.full(n, -1, dtype=np.int64)
+    on_path = ~(np.isnan(path_lats) | np.isnan(path_lons))
+    path_lats, path_lons = path_lats[on_path], path_lons[on_path]
+    valid = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+    if len(path_lats) == 0 or len(valid) == 0:
+        return offsets, along, segments
+
+    if projection is None:
+        projection = projection_for(path_lats, path_lons)
+    px, py = projection.forward(path_lats, path_lons)
+    if len(px) == 1:
+        px, py = np.repeat(px, 2), np.repeat(py, 2)
+    x, y = projection.forward(lats[valid], lons[valid])
+
+    # Segment origins, directions and lengths
+    ax, ay = px[:-1], py[:-1]
+    dx, dy = np.diff(px), np.diff(py)
+    length2 = dx * dx + dy * dy
+    starts = np.r_[0.0, np.cumsum(np.sqrt(length2))[:-1]]
+
+    lines = shapely.linestrings(
+        np.stack((np.column_stack((ax, ay)), np.column_stack((px[1:], py[1:]))), 1)
+    )
+    pairs = STRtree(lines).query_nearest(shapely.points(x, y))
+    # Ties yield several pairs per point, keep the first
+    first = np.r_[True, pairs[0, 1:] != pairs[0, :-1]]
+    point, nearest = pairs[0, first], pairs[1, first]
+
+    bx, by = x[point] - ax[nearest], y[point] - ay[nearest]
+    safe_length2 = np.where(length2[nearest] > 0.0, length2[nearest], 1.0)
+    t = np.clip((bx * dx[nearest] + by * dy[nearest]) / safe_length2, 0.0, 1.0)
+    index = valid[point]
+    offsets[index] = np.hypot(bx - t * dx[nearest], by - t * dy[nearest])
+    along[index] = starts[nearest] + t * np.sqrt(length2[nearest])
+    segments[index] = nearest
+    return offsets, along, segments
+
+
+def polygon_area(
+    lats: np.ndarray, lons: np.ndarray, projection: LocalProjection | None = None
+) -> float:
+    """
+    Area of a small polygon, with the shoelace formula on a local projection
+    centered on its vertices.
+    :param lats: Array of vertex latitudes in degrees
+    :param lons: Array of vertex longitudes in degrees
+    :param projection: Planar frame, by default centered on the vertices
+    :return: Area in square meters
+    """
+    if len(lats) < 3:
+        return 0.0
+    if projection is None:
+        projection = projection_for(lats, lons)
+    x, y = projection.forward(lats, lons)
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2.0)
+
+
+def encode_polyline(lats: np.ndarray, lons: np.ndarray, precision: int = 6) -> str:
+    """
+    Vectorized encoder of the Google / Valhalla polyline format: coordinates
+    are rounded to `precision` decimals, delta-coded, zigzag-coded and
+    written in 5-bit chunks, least significant first. Missing locations are
+    dropped, as the format has no way to represent them.
+    :param lats: Array of latitudes in degrees
+    :param lons: Array of longitudes in degrees
+    :param precision: Decimal digits, 5 for Google polylines, 6 for Valhalla
+    :return: Encoded polyline
+    """
+    known = np.isfinite(lats) & np.isfinite(lons)
+    lats, lons = lats[known], lons[known]
+    if len(lats) == 0:
+        return ""
+    factor = 10.0**precision
+    points = np.column_stack((lats, lons))
+    fixed = np.round(points * factor).astype(np.int64)
+    deltas = np.diff(fixed, axis=0, prepend=0).ravel()
+    values = (deltas << 1) ^ (deltas >> 63)
+
+    # 13 chunks of 5 bits hold any 64-bit value
+    shifts = 5 * np.arange(13, dtype=np.int64)
+    chunks = (values[:, None] >> shifts) & 0x1F
+    counts = 1 + ((values[:, None] >> shifts[1:]) != 0).sum(axis=1)
+    used = np.arange(13) < counts[:, None]
+    # Every chunk but the last of a value has the continuation bit
+    more = np.arange(13) < (counts - 1)[:, None]
+    codes = (chunks | np.where(more, 0x20, 0)) + 63
+    return codes[used].astype(np.uint8).tobytes().decode("ascii")
+
+
+def vec_decode_polyline(
+    encoded: str, precision: int = 6
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Optimized polyline decoder based on https://valhalla.github.io/valhalla/decoding/
+    Vectorized decoder of the Google / Valhalla polyline format.
+    :param encoded: Encoded polyline
+    :param precision: Decimal digits, 5 for Google polylines, 6 for Valhalla
+    :return: Arrays of latitudes and longitudes in degrees
+    """
+    codes = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64)
+    codes -= 63
+    if len(codes) and (codes.min() < 0 or codes[-1] >= 0x20):
+        raise ValueError("decode_polyline - Invalid encoded polyline")
+    last = codes < 0x20
+    starts = np.r_[0, np.flatnonzero(last)[:-1] + 1].astype(np.int64)
+    if len(codes) == 0 or len(starts) % 2:
+        if len(codes) == 0:
+            return np.empty(0), np.empty(0)
+        raise ValueError("decode_polyline - Odd number of coordinates")
+
+    # Chunks of a value occupy disjoint bits, so summing them assembles it
+    value_of = np.cumsum(np.r_[0, last[:-1]])
+    shifts = 5 * (np.arange(len(codes)) - starts[value_of])
+    values = np.add.reduceat((codes & 0x1F) << shifts, starts)
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    fixed = np.cumsum(deltas.reshape(-1, 2), axis=0)
+    points = fixed / 10.0**precision
+    return points[:, 0], points[:, 1]
+
+
+def decode_polyline(
+    encoded: str, order: str = "lonlat", precision: int = 6
+) -> List[List]:
+    """
+    Decodes a polyline into coordinate lists, see `vec_decode_polyline`.
 
     :param encoded: String-encoded polyline
     :param order: Coordinate order: 'lonlat' (default) or 'latlon'
+    :param precision: Decimal digits, 5 for Google polylines, 6 for Valhalla
     :return: Decoded polyline as a list of [lat, lon] or [lon, lat] coordinates
     """
     if not encoded:
         return []
-
-    inv = 1.0 / 1e6
-    decoded = []
-    previous = [0, 0]
-    i = 0
-    encoded_len = len(encoded)
-
-    # Pre-allocate result list for better performance
-    # Estimate size: each coordinate pair typically takes 3-4 characters
-    estimated_size = encoded_len // 4
-    decoded = []
-    decoded.reserve = estimated_size if hasattr(decoded, "reserve") else lambda x: None
-    decoded.reserve(estimated_size)
-
-    while i < encoded_len:
-        # Process both coordinates (lat, lon) in one iteration
-        ll = [0, 0]
-        for j in range(2):  # 0 = lat, 1 = lon
-            shift = 0
-            result = 0
-
-            # Decode one coordinate
-            while True:
-                if i >= encoded_len:
-                    break
-
-                byte = ord(encoded[i]) - 63
-                i += 1
-                result |= (byte & 0x1F) << shift
-                shift += 5
-
-                if byte < 0x20:
-                    break
-
-            # Handle negative values and add to previous
-            if result & 1:
-                ll[j] = previous[j] - (result >> 1)
-            else:
-                ll[j] = previous[j] + (result >> 1)
-
-            previous[j] = ll[j]
-
-        # Format and append the coordinate pair
-        if order == "lonlat":
-            # Avoid string formatting for better performance
-            decoded.append([ll[1] * inv, ll[0] * inv])
-        else:
-            decoded.append([ll[0] * inv, ll[1] * inv])
-
-    return decoded
+    lats, lons = vec_decode_polyline(encoded, precision)
+    if order == "lonlat":
+        return np.column_stack((lons, lats)).tolist()
+    return np.column_stack((lats, lons)).tolist()
 
 
 def circle_to_polygon(
@@ -297,3 +400,80 @@ def circle_to_polygon(
     points = np.column_stack((np.degrees(lat_r2), np.degrees(lon_r2)))
 
     return points
+
+
+def simplification_importance(
+    lats: np.ndarray, lons: np.ndarray, projection: LocalProjection | None = None
+) -> np.ndarray:
+    """
+    Ranks the vertices of a polyline for Douglas-Peucker simplification. The
+    importance of a vertex is the largest tolerance, in meters, at which the
+    simplification keeps it, so the simplification at any tolerance is the
+    O(n) selection `importance >= tolerance`. Endpoints are always kept.
+
+    Distances are measured on a local projection centered on the trace, which
+    is accurate to well below a pixel over a city-sized trace.
+    :param lats: Array of latitudes in degrees
+    :param lons: Array of longitudes in degrees
+    :param projection: Planar frame, by default centered on the trace
+    :return: Array of importances in meters, infinite for the endpoints
+    """
+    n = len(lats)
+    importance = np.zeros(n, dtype=np.float64)
+    if n == 0:
+        return importance
+    importance[[0, -1]] = np.inf
+
+    if projection is None:
+        projection = projection_for(lats, lons)
+    x, y = projection.forward(lats, lons)
+
+    # Douglas-Peucker splits each range (first, last) at the vertex farthest
+    # from its chord. All the ranges of a recursion level are split together
+    # in one vectorized pass. A vertex is capped by the importance of the
+    # split that created its range, so coarser levels are subsets of finer
+    # ones.
+    first = np.array([0])
+    last = np.array([n - 1])
+    cap = np.array([np.inf])
+    while len(first):
+        open_ranges = last - first >= 2
+        first, last, cap = first[open_ranges], last[open_ranges], cap[open_ranges]
+        if not len(first):
+            break
+        sizes = last - first - 1
+        starts = np.cumsum(sizes) - sizes
+        owner = np.repeat(np.arange(len(first)), sizes)
+        vertex = first[owner] + 1 + (np.arange(len(owner)) - starts[owner])
+
+        x0, y0 = x[first][owner], y[first][owner]
+        dx, dy = (x[last] - x[first])[owner], (y[last] - y[first])[owner]
+        px, py = x[vertex] - x0, y[vertex] - y0
+        length2 = dx * dx + dy * dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(length2 > 0.0, (px * dx + py * dy) / length2, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        # Missing locations rank lowest
+        distances = np.nan_to_num(np.hypot(px - t * dx, py - t * dy), nan=0.0)
+
+        # The first vertex reaching each range's maximum splits it
+        farthest = np.maximum.reduceat(distances, starts)
+        candidates = np.flatnonzero(distances == farthest[owner])
+        split = vertex[candidates][np.unique(owner[candidates], return_index=True)[1]]
+        importance[split] = np.minimum(farthest, cap)
+
+        first, last = np.r_[first, split], np.r_[split, last]
+        cap = np.r_[importance[split], importance[split]]
+    return importance
+
+
+def zoom_tolerance(zoom: float, lat: float, pixels: float = 0.5) -> float:
+    """
+    Converts a distance in screen pixels at a web map zoom level to meters.
+    :param zoom: Web Mercator zoom level
+    :param lat: Latitude of the view in degrees
+    :param pixels: Distance in pixels
+    :return: Distance in meters
+    """
+    meters_per_pixel = 156543.03392 * math.cos(math.radians(lat)) / 2.0**zoom
+    return pixels * meters_per_pixel
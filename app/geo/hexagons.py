@@ -0,0 +1,96 @@
+import h3.api.numpy_int as h3
+import numpy as np
+
+
+def vec_latlng_to_cells(
+    lats: np.ndarray, lons: np.ndarray, resolution: int = 12
+) -> np.ndarray:
+    """
+    Converts arrays of locations to H3 cells. Each distinct location is
+    indexed once, so repeated fixes, like those of a stopped vehicle or of
+    map-matched points, cost a single lookup.
+    :param lats: Array of latitudes in degrees
+    :param lons: Array of longitudes in degrees
+    :param resolution: H3 resolution
+    :return: Array of H3 cells, zero where the location is missing
+    """
+    cells = np.zeros(len(lats), dtype=np.int64)
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    if not valid.any():
+        return cells
+
+    points = np.column_stack((lats[valid], lons[valid]))
+    unique, inverse = np.unique(points, axis=0, return_inverse=True)
+    unique_cells = np.fromiter(
+        (h3.latlng_to_cell(lat, lon, resolution) for lat, lon in unique.tolist()),
+        dtype=np.int64,
+        count=len(unique),
+    )
+    cells[valid] = unique_cells[inverse.ravel()]
+    return cells
+
+
+def polygon_to_cells(
+    lats: np.ndarray, lons: np.ndarray, resolution: int = 12
+) -> np.ndarray:
+    """
+    Covers a polygon with the H3 cells that overlap it, compacted to mixed
+    resolutions, so large areas need few cells.
+    :param lats: Array of vertex latitudes in degrees
+    :param lons: Array of vertex longitudes in degrees
+    :param resolution: Finest H3 resolution
+    :return: Array of compacted H3 cells
+    """
+    poly = h3.LatLngPoly(list(zip(lats.tolist(), lons.tolist())))
+    cells = h3.h3shape_to_cells_experimental(poly, resolution, contain="overlap")
+    return np.asarray(h3.compact_cells(cells), dtype=np.int64)
+
+
+def cell_ranges(cells: np.ndarray, resolution: int = 12) -> np.ndarray:
+    """
+    Converts cells of mixed resolutions into ranges of descendant cells at a
+    finer resolution. Descendants share the leading digits of their ancestor
+    and differ in the trailing ones, so each ancestor covers one contiguous
+    range of 64-bit indexes, which an index on the fine cells scans directly.
+    :param cells: Array of H3 cells, none finer than `resolution`
+    :param resolution: Resolution of the indexed cells
+    :return: Array of shape (len(cells), 2) with inclusive index ranges
+    """
+    ranges = np.empty((len(cells), 2), dtype=np.int64)
+    for i, cell in enumerate(cells.tolist()):
+        # The center child has all the digits below the ancestor set to zero
+        low = h3.cell_to_center_child(cell, resolution)
+        digits = resolution - h3.get_resolution(cell)
+        # Unused digits are all ones, three bits each, after the 15th digit
+        ranges[i] = low, low | (((1 << (3 * digits)) - 1) << (3 * (15 - resolution)))
+    return ranges
+
+
+# Bit layout of H3 cell indexes: the resolution takes 4 bits from bit 52, and
+# the 15 digits take 3 bits each, the finest last
+RESOLUTION_SHIFT = 52
+RESOLUTION_MASK = 0xF << RESOLUTION_SHIFT
+
+
+def vec_cell_to_parent(cells: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Vectorized parent of an array of H3 cells: the resolution field is set to
+    the parent's and the digits below it to the unused value, all ones.
+    :param cells: Array of H3 cells, none coarser than `resolution`
+    :param resolution: Parent resolution
+    :return: Array of parent cells
+    """
+    unused = (1 << (3 * (15 - resolution))) - 1
+    header = np.int64(resolution << RESOLUTION_SHIFT)
+    return (cells & ~np.int64(RESOLUTION_MASK)) | header | np.int64(unused)
+
+
+def cells_to_boundaries(cells: np.ndarray) -> list:
+    """
+    Converts H3 cells to GeoJSON polygon rings, in (lng, lat) order.
+    """
+    rings = []
+    for cell in cells.tolist():
+        ring = [[lng, lat] for lat, lng in h3.cell_to_boundary(cell)]
+        rings.append([ring + ring[:1]])
+    return rings
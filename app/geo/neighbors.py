@@ -0,0 +1,255 @@
+from typing import Tuple
+
+import numpy as np
+
+from app.geo.geomath import vec_haversine
+from app.geo.projection import LocalProjection, projection_for
+
+
+class NearestNeighbors:
+    """
+    Nearest-neighbour index of a set of locations, as a grid hash on a local
+    projection centered on them. Points are sorted by grid cell, so a cell is
+    a contiguous slice of the sorted points.
+
+    Queries search rings of cells around their own cell until the best
+    candidate is closer than any point outside the rings. Queries that are
+    still unresolved after `max_rings` rings, typically far from every
+    point, are answered by an exhaustive search in blocks. No step holds more
+    than `max_pairs` query-candidate pairs, whatever the input sizes. The
+    distances of the nearest points are refined with the haversine formula.
+    """
+
+    def __init__(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        cell_size: float | None = None,
+        max_pairs: int = 1 << 18,
+        max_rings: int = 16,
+        projection: LocalProjection | None = None,
+    ):
+        """
+        :param lats: Array of point latitudes in degrees, NaN to skip a point
+        :param lons: Array of point longitudes in degrees
+        :param cell_size: Grid cell size in meters, by default sized to the
+            spread of the points
+        :param max_pairs: Ceiling of query-candidate pairs held at once
+        :param max_rings: Rings searched before the exhaustive search
+        :param projection: Planar frame, by default centered on the points
+        """
+        self._lats = np.asarray(lats, dtype=np.float64)
+        self._lons = np.asarray(lons, dtype=np.float64)
+        self._max_pairs = max_pairs
+        self._max_rings = max_rings
+
+        valid = np.flatnonzero(~(np.isnan(self._lats) | np.isnan(self._lons)))
+        if len(valid) == 0:
+            self._points = valid
+            return
+        if projection is None:
+            projection = projection_for(self._lats[valid], self._lons[valid])
+        self._projection = projection
+        x, y = self.project(self._lats[valid], self._lons[valid])
+
+        self._x_min, self._y_min = x.min(), y.min()
+        width, height = x.max() - self._x_min, y.max() - self._y_min
+        if cell_size is None:
+            cell_size = np.sqrt(max(width, 1.0) * max(height, 1.0) / len(valid))
+        self._cell = max(float(cell_size), 1.0)
+        self._nx = int(width // self._cell) + 1
+        self._ny = int(height // self._cell) + 1
+
+        keys = self._keys(*self._cells(x, y))
+        order = np.argsort(keys, kind="stable")
+        self._points = valid[order]
+        self._x, self._y = x[order], y[order]
+        self._cell_keys, self._cell_starts = np.unique(keys[order], return_index=True)
+        self._cell_ends = np.r_[self._cell_starts[1:], len(order)]
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def project(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, ...]:
+        return self._projection.forward(lats, lons)
+
+    def _cells(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, ...]:
+        cx = np.floor((x - self._x_min) / self._cell).astype(np.int64)
+        cy = np.floor((y - self._y_min) / self._cell).astype(np.int64)
+        return cx, cy
+
+    def _keys(self, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        return cx * self._ny + cy
+
+    def query(
+        self, lats: np.ndarray, lons: np.ndarray, max_distance: float = np.inf
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the nearest point of each query location.
+        :param lats: Array of query latitudes in degrees
+        :param lons: Array of query longitudes in degrees
+        :param max_distance: Search radius in meters
+        :return: Haversine distances in meters and indices of the nearest
+            points; NaN and -1 for missing queries, or when no point lies
+            within the search radius
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        n = len(lats)
+        distances = np.full(n, np.nan)
+        indices = np.full(n, -1, dtype=np.int64)
+        pending = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+        if len(self._points) == 0 or len(pending) == 0:
+            return distances, indices
+
+        qx, qy = self.project(lats, lons)
+        # Missing queries are never searched, any cell will do
+        qcx, qcy = self._cells(np.nan_to_num(qx), np.nan_to_num(qy))
+        best = np.full(n, np.inf)  # Squared planar distances
+        nearest = np.full(n, -1, dtype=np.int64)  # Positions in sorted points
+
+        ring = 0
+        while len(pending) and ring <= self._max_rings:
+            offsets = _ring_offsets(ring)
+            self._search_cells(pending, offsets, qx, qy, qcx, qcy, best, nearest)
+            # Points outside the searched rings are at least `ring` cells away
+            reach = ring * self._cell
+            done = (best <= reach * reach) | (reach >= max_distance)
+            done[pending] |= self._covers_grid(qcx[pending], qcy[pending], ring)
+            pending = pending[~done[pending]]
+            ring += 1
+        if len(pending):
+            self._search_all(pending, qx, qy, best, nearest)
+
+        found = np.flatnonzero(nearest >= 0)
+        points = self._points[nearest[found]]
+        exact = vec_haversine(
+            lats[found], lons[found], self._lats[points], self._lons[points]
+        )
+        within = exact <= max_distance
+        distances[found[within]] = exact[within]
+        indices[found[within]] = points[within]
+        return distances, indices
+
+    def _covers_grid(self, cx: np.ndarray, cy: np.ndarray, ring: int) -> np.ndarray:
+        # Whether the rings around each query cell hold the whole grid
+        reach_x = np.maximum(cx, self._nx - 1 - cx)
+        reach_y = np.maximum(cy, self._ny - 1 - cy)
+        return np.maximum(reach_x, reach_y) <= ring
+
+    def _search_cells(
+        self,
+        queries: np.ndarray,
+        offsets: np.ndarray,
+        qx: np.ndarray,
+        qy: np.ndarray,
+        qcx: np.ndarray,
+        qcy: np.ndarray,
+        best: np.ndarray,
+        nearest: np.ndarray,
+    ) -> None:
+        # Query-cell pairs are blocked too, as rings grow with their radius
+        block = max(1, self._max_pairs // len(offsets))
+        for first in range(0, len(queries), block):
+            q = queries[first : first + block]
+            cx = (qcx[q, None] + offsets[:, 0]).ravel()
+            cy = (qcy[q, None] + offsets[:, 1]).ravel()
+            owner = np.repeat(q, len(offsets))
+            inside = (cx >= 0) & (cx < self._nx) & (cy >= 0) & (cy < self._ny)
+            keys = self._keys(cx[inside], cy[inside])
+            owner = owner[inside]
+
+            slot = np.searchsorted(self._cell_keys, keys)
+            slot = np.minimum(slot, len(self._cell_keys) - 1)
+            occupied = self._cell_keys[slot] == keys
+            starts = self._cell_starts[slot[occupied]]
+            counts = self._cell_ends[slot[occupied]] - starts
+            owner = owner[occupied]
+            self._refine_pairs(owner, starts, counts, qx, qy, best, nearest)
+
+    def _refine_pairs(
+        self,
+        owner: np.ndarray,
+        starts: np.ndarray,
+        counts: np.ndarray,
+        qx: np.ndarray,
+        qy: np.ndarray,
+        best: np.ndarray,
+        nearest: np.ndarray,
+    ) -> None:
+        # Expands (query, cell) pairs into (query, point) pairs, in blocks of
+        # at most `max_pairs` pairs, except for single cells larger than that
+        ends = np.cumsum(counts)
+        first = 0
+        while first < len(counts):
+            base = ends[first - 1] if first else 0
+            last = int(np.searchsorted(ends, base + self._max_pairs, side="right"))
+            last = max(last, first + 1)
+            block_counts = counts[first:last]
+            total = int(block_counts.sum())
+            queries = np.repeat(owner[first:last], block_counts)
+            offsets = np.arange(total) - np.repeat(
+                np.cumsum(block_counts) - block_counts, block_counts
+            )
+            points = np.repeat(starts[first:last], block_counts) + offsets
+            self._keep_nearest(queries, points, qx, qy, best, nearest)
+            first = last
+
+    def _search_all(
+        self,
+        queries: np.ndarray,
+        qx: np.ndarray,
+        qy: np.ndarray,
+        best: np.ndarray,
+        nearest: np.ndarray,
+    ) -> None:
+        block = max(1, self._max_pairs // len(self._points))
+        for first in range(0, len(queries), block):
+            q = queries[first : first + block]
+            dx = qx[q, None] - self._x
+            dy = qy[q, None] - self._y
+            distance2 = dx * dx + dy * dy
+            closest = np.argmin(distance2, axis=1)
+            closest_d2 = distance2[np.arange(len(q)), closest]
+            better = closest_d2 < best[q]
+            best[q[better]] = closest_d2[better]
+            nearest[q[better]] = closest[better]
+
+    def _keep_nearest(
+        self,
+        queries: np.ndarray,
+        points: np.ndarray,
+        qx: np.ndarray,
+        qy: np.ndarray,
+        best: np.ndarray,
+        nearest: np.ndarray,
+    ) -> None:
+        if len(queries) == 0:
+            return
+        dx = qx[queries] - self._x[points]
+        dy = qy[queries] - self._y[points]
+        distance2 = dx * dx + dy * dy
+        # The first pair of each query, sorted by distance, is its closest
+        order = np.lexsort((distance2, queries))
+        queries, points, distance2 = queries[order], points[order], distance2[order]
+        first = np.r_[True, queries[1:] != queries[:-1]]
+        queries, points, distance2 = queries[first], points[first], distance2[first]
+        better = distance2 < best[queries]
+        best[queries[better]] = distance2[better]
+        nearest[queries[better]] = points[better]
+
+
+def _ring_offsets(ring: int) -> np.ndarray:
+    # Cell offsets at a Chebyshev distance of `ring` cells
+    if ring == 0:
+        return np.zeros((1, 2), dtype=np.int64)
+    side = np.arange(-ring, ring + 1, dtype=np.int64)
+    inner = side[1:-1]
+    return np.concatenate(
+        (
+            np.column_stack((side, np.full(len(side), -ring))),
+            np.column_stack((side, np.full(len(side), ring))),
+            np.column_stack((np.full(len(inner), -ring), inner)),
+            np.column_stack((np.full(len(inner), ring), inner)),
+        )
+    )
@@ -0,0 +1,87 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS = 6378137.0
+
+
+class LocalProjection:
+    """
+    Equirectangular projection on the plane tangent to the sphere at an
+    origin, in meters east (x) and north (y) of it. Both directions are a
+    multiplication, so forward and inverse projections cost a few vectorized
+    operations per point, against the trigonometry of every haversine.
+
+    Meridian distances are exact. Parallels are scaled by the cosine of the
+    origin latitude rather than their own, so for points within `extent`
+    meters of the origin the relative error of planar distances and areas
+    is at most `distance_error(extent)`: about tan(lat0) * extent / R. Over
+    a 10 km trip around Ann Arbor this is 0.14%, or 1.4 m per km.
+    """
+
+    __slots__ = ("lat0", "lon0", "_lat0_r", "_lon0_r", "_x_scale")
+
+    def __init__(self, lat0: float, lon0: float):
+        """
+        :param lat0: Origin latitude in degrees
+        :param lon0: Origin longitude in degrees
+        """
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self._lat0_r = math.radians(self.lat0)
+        self._lon0_r = math.radians(self.lon0)
+        self._x_scale = EARTH_RADIUS * math.cos(self._lat0_r)
+
+    def forward(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Projects locations to the plane.
+        :param lats: Array of latitudes in degrees
+        :param lons: Array of longitudes in degrees
+        :return: Arrays of x and y in meters, NaN for missing locations
+        """
+        x = (np.radians(lons) - self._lon0_r) * self._x_scale
+        y = (np.radians(lats) - self._lat0_r) * EARTH_RADIUS
+        return x, y
+
+    def inverse(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Converts planar coordinates back to locations.
+        :param x: Array of x in meters
+        :param y: Array of y in meters
+        :return: Arrays of latitudes and longitudes in degrees
+        """
+        lats = np.degrees(np.asarray(y) / EARTH_RADIUS + self._lat0_r)
+        lons = np.degrees(np.asarray(x) / self._x_scale + self._lon0_r)
+        return lats, lons
+
+    def distance_error(self, extent: float) -> float:
+        """
+        Bound of the relative error of planar distances between points within
+        `extent` meters of the origin, against great-circle distances.
+        :param extent: Distance of the farthest point from the origin, in
+            meters
+        :return: Relative error
+        """
+        # Second-order expansion of cos(lat0) / cos(lat0 + delta)
+        delta = extent / EARTH_RADIUS
+        secant = 1.0 / math.cos(self._lat0_r)
+        return abs(math.tan(self._lat0_r)) * delta + (secant * delta) ** 2
+
+    def __repr__(self) -> str:
+        return f"LocalProjection({self.lat0!r}, {self.lon0!r})"
+
+
+def projection_for(lats: np.ndarray, lons: np.ndarray) -> LocalProjection:
+    """
+    Local projection of a set of locations, with its origin at their mean.
+    :param lats: Array of latitudes in degrees, NaN for missing locations
+    :param lons: Array of longitudes in degrees
+    :return: Projection, at (0, 0) when no location is known
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    known = ~(np.isnan(lats) | np.isnan(lons))
+    if not known.any():
+        return LocalProjection(0.0, 0.0)
+    return LocalProjection(lats[known].mean(), lons[known].mean())
@@ -0,0 +1,177 @@
+import sys
+from sqlite3 import Cursor
+from typing import Any, ClassVar, Dict, Iterable, Iterator, Self, Sequence, Tuple
+
+import numpy as np
+
+
+class ColumnarFrame(object):
+    """
+    Struct-of-arrays container with one contiguous, typed NumPy array per column.
+    Subclasses declare their columns, in query order, through `COLUMNS` and the
+    dataclass used for single-row views through `ROW_TYPE`. Float columns listed
+    in `NULLABLE` store SQL NULL as NaN and map it back to None in row views.
+    """
+
+    COLUMNS: ClassVar[Tuple[Tuple[str, np.dtype], ...]] = ()
+    NULLABLE: ClassVar[Tuple[str, ...]] = ()
+    ROW_TYPE: ClassVar[type] = dict
+
+    def __init__(self, **columns: Any):
+        self._columns: Dict[str, np.ndarray] = {}
+        length: int | None = None
+        for name, dtype in self.COLUMNS:
+            values = columns.get(name)
+            if values is None:
+                values = np.empty(0 if length is None else length, dtype=dtype)
+            array = np.ascontiguousarray(values, dtype=dtype)
+            if length is None:
+                length = len(array)
+            elif len(array) != length:
+                raise ValueError(
+                    f"{type(self).__name__} - Column {name} has {len(array)} rows, "
+                    f"expected {length}"
+                )
+            self._columns[name] = array
+
+    @classmethod
+    def empty(cls) -> Self:
+        return cls()
+
+    @classmethod
+    def names(cls) -> Tuple[str, ...]:
+        return tuple(name for name, _ in cls.COLUMNS)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> Self:
+        """
+        Builds the frame from a sequence of row tuples in `COLUMNS` order.
+        Extra trailing values in each row are ignored.
+        :param rows: Row tuples
+        :return: New columnar frame
+        """
+        if len(rows) == 0:
+            return cls.empty()
+        transposed = list(zip(*rows))
+        return cls(
+            **{
+                name: np.array(transposed[i], dtype=dtype)
+                for i, (name, dtype) in enumerate(cls.COLUMNS)
+            }
+        )
+
+    @classmethod
+    def from_cursor(cls, cursor: Cursor | Iterable, batch_size: int = 8192) -> Self:
+        """
+        Builds the frame straight from a query cursor whose select list follows
+        the `COLUMNS` order. Rows are fetched and converted in batches, so no
+        per-row Python objects outlive a batch.
+        :param cursor: Executed SQLite cursor
+        :param batch_size: Number of rows fetched per batch
+        :return: New columnar frame
+        """
+        frames = [cls.from_rows(rows) for rows in _batches(cursor, batch_size)]
+        return cls.concat(frames)
+
+    @classmethod
+    def group_from_cursor(
+        cls, cursor: Cursor | Iterable, batch_size: int = 8192
+    ) -> Dict[int, Self]:
+        """
+        Builds one frame per group from a cursor whose select list follows the
+        `COLUMNS` order plus a trailing integer group key, usually `traj_id`.
+        Rows keep their cursor order within each group.
+        :param cursor: Executed SQLite cursor
+        :param batch_size: Number of rows fetched per batch
+        :return: Dictionary of frames keyed by group
+        """
+        frames = []
+        keys = []
+        key_index = len(cls.COLUMNS)
+        for rows in _batches(cursor, batch_size):
+            frames.append(cls.from_rows(rows))
+            keys.append(np.fromiter((row[key_index] for row in rows), np.int64))
+        if not frames:
+            return {}
+
+        frame = cls.concat(frames)
+        all_keys = np.concatenate(keys)
+        order = np.argsort(all_keys, kind="stable")
+        frame = frame[order]
+        unique_keys, starts = np.unique(all_keys[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        return {
+            int(key): frame[start:end]
+            for key, start, end in zip(unique_keys, starts, ends)
+        }
+
+    @classmethod
+    def concat(cls, frames: Sequence[Self]) -> Self:
+        if len(frames) == 0:
+            return cls.empty()
+        if len(frames) == 1:
+            return frames[0]
+        return cls(
+            **{
+                name: np.concatenate([f.column(name) for f in frames])
+                for name in cls.names()
+            }
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return dict(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the column data, including the payload of object columns.
+        """
+        total = 0
+        for array in self._columns.values():
+            total += array.nbytes
+            if array.dtype == object:
+                total += sum(sys.getsizeof(v) for v in array if v is not None)
+        return total
+
+    def row(self, index: int) -> Any:
+        values = {
+            name: _to_python(array[index]) for name, array in self._columns.items()
+        }
+        for name in self.NULLABLE:
+            if values[name] != values[name]:  # NaN
+                values[name] = None
+        return self.ROW_TYPE(**values)
+
+    def __len__(self) -> int:
+        if not self._columns:
+            return 0
+        return len(next(iter(self._columns.values())))
+
+    def __getitem__(self, key: int | slice | np.ndarray) -> Any:
+        if isinstance(key, (int, np.integer)):
+            return self.row(int(key))
+        return type(self)(**{name: a[key] for name, a in self._columns.items()})
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(rows={len(self)}, nbytes={self.nbytes})"
+
+
+def _to_python(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _batches(cursor: Cursor | Iterable, batch_size: int) -> Iterator[list]:
+    if hasattr(cursor, "fetchmany"):
+        while rows := cursor.fetchmany(batch_size):
+            yield rows
+    else:
+        rows = list(cursor)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
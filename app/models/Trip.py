@@ -1,14 +1,21 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List
 
-from app.models.MapNode import MapNode
-from app.models.Signal import Signal
-from app.repositories.trip import load_signals, load_nodes
+from app.models.TripDataCache import TripDataCache
+from app.models.TripKinematics import TripKinematics
+from app.models.TripNodes import TripNodes
+from app.models.TripSignals import TripSignals
+from app.models.TripSummary import TripSummary
 
 
 @dataclass
 class Trip:
+    """
+    Trip metadata. Signals and nodes live in the shared `TripDataCache` and are
+    reloaded transparently when accessed after an eviction. The summary holds
+    precomputed statistics, when the trip_summary table has been built.
+    """
+
     traj_id: int
     vehicle_id: int
     trip_id: int
@@ -18,17 +25,65 @@ class Trip:
     weight: float
     start: datetime
     end: datetime
-    signals: List[Signal] = field(default_factory=list)
-    nodes: List[MapNode] = field(default_factory=list)
+    summary: TripSummary | None = None
+
+    @property
+    def signals(self) -> TripSignals:
+        return TripDataCache().get("signals", self.traj_id)
+
+    @signals.setter
+    def signals(self, signals: TripSignals) -> None:
+        TripDataCache().put("signals", self.traj_id, signals)
+
+    @property
+    def nodes(self) -> TripNodes:
+        return TripDataCache().get("nodes", self.traj_id)
+
+    @nodes.setter
+    def nodes(self, nodes: TripNodes) -> None:
+        TripDataCache().put("nodes", self.traj_id, nodes)
+
+    @property
+    def kinematics(self) -> TripKinematics:
+        """
+        Kinematics computed from the signals, cached along with them.
+        """
+        return TripDataCache().get("kinematics", self.traj_id)
+
+    @property
+    def has_signals(self) -> bool:
+        return TripDataCache().peek("signals", self.traj_id) is not None
+
+    @property
+    def has_nodes(self) -> bool:
+        return TripDataCache().peek("nodes", self.traj_id) is not None
 
     def load_signals(self) -> None:
         """
         Load signals for this trip.
         """
-        self.signals = load_signals(self.traj_id)
+        TripDataCache().get("signals", self.traj_id)
 
     def load_nodes(self) -> None:
         """
         Load map nodes for this trip.
         """
-        self.nodes = load_nodes(self.traj_id)
+        TripDataCache().get("nodes", self.traj_id)
+
+    async def load_signals_async(self) -> None:
+        """
+        Load signals for this trip without blocking the event loop.
+        """
+        await TripDataCache().get_async("signals", self.traj_id)
+
+    async def load_nodes_async(self) -> None:
+        """
+        Load map nodes for this trip without blocking the event loop.
+        """
+        await TripDataCache().get_async("nodes", self.traj_id)
+
+    async def load_kinematics_async(self) -> None:
+        """
+        Compute kinematics for this trip without blocking the event loop.
+        """
+        await TripDataCache().get_async("kinematics", self.traj_id)
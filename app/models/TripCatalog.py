@@ -0,0 +1,258 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.Trip import Trip
+from app.models.TripModel import TripModel
+from app.repositories.trip import (
+    CATALOG_SORT_KEYS,
+    count_trips_async,
+    load_trip_page_async,
+)
+from nicemvvm.datasource import (
+    DataSource,
+    FilterCondition,
+    FilterSpec,
+    RowBlock,
+    RowRequest,
+)
+from tools.database.sqlite.Predicate import AllOf, AnyOf, Condition, Predicate
+
+
+@dataclass(frozen=True)
+class CatalogField:
+    column: str
+    # Factor from the displayed value to the column value, for numbers
+    scale: float = 1.0
+    # Half of the display resolution, so that equality matches rounded values
+    tolerance: float = 0.0
+
+
+# Grid fields that can be filtered and sorted on
+FIELDS = {
+    "traj_id": CatalogField("traj_id"),
+    "vehicle_id": CatalogField("vehicle_id"),
+    "km": CatalogField("length_m", scale=1000.0, tolerance=0.05),
+    "start": CatalogField("dt_ini"),
+    "end": CatalogField("dt_end"),
+}
+
+NUMBER_OPERATORS = {
+    "lessThan": "<",
+    "lessThanOrEqual": "<=",
+    "greaterThan": ">",
+    "greaterThanOrEqual": ">=",
+}
+
+SortOrder = Tuple[str, bool]
+Signature = Tuple[SortOrder, Tuple[FilterSpec, ...]]
+
+
+@dataclass
+class CatalogView:
+    """
+    Cached state of one sort order and filter combination.
+    """
+
+    predicates: List[Predicate]
+    bookmarks: Dict[int, Tuple | None] = field(default_factory=lambda: {0: None})
+    blocks: OrderedDict[Tuple[int, int], List[Trip]] = field(
+        default_factory=OrderedDict
+    )
+    count: int | None = None
+
+
+def _number_predicate(spec: CatalogField, condition: FilterCondition) -> Predicate:
+    column = spec.column
+    if condition.type == "blank":
+        return Condition(column, "is null")
+    if condition.type == "notBlank":
+        return Condition(column, "is not null")
+
+    value = float(condition.value) * spec.scale
+    tolerance = spec.tolerance * spec.scale
+    match condition.type:
+        case "equals" if tolerance:
+            return AllOf(
+                (
+                    Condition(column, ">=", value - tolerance),
+                    Condition(column, "<", value + tolerance),
+                )
+            )
+        case "equals":
+            return Condition(column, "=", value)
+        case "notEqual" if tolerance:
+            return AnyOf(
+                (
+                    Condition(column, "<", value - tolerance),
+                    Condition(column, ">=", value + tolerance),
+                )
+            )
+        case "notEqual":
+            return Condition(column, "<>", value)
+        case "inRange":
+            value_to = float(condition.value_to) * spec.scale
+            return AllOf(
+                (Condition(column, ">=", value), Condition(column, "<=", value_to))
+            )
+        case operator if operator in NUMBER_OPERATORS:
+            return Condition(column, NUMBER_OPERATORS[operator], value)
+    raise ValueError(f"TripCatalog - Invalid number filter: {condition.type}")
+
+
+def _date_predicate(spec: CatalogField, condition: FilterCondition) -> Predicate:
+    """
+    Date filters compare whole days: the columns hold timestamps, so a day
+    matches the half-open range from its midnight to the next.
+    """
+    column = spec.column
+    if condition.type == "blank":
+        return Condition(column, "is null")
+    if condition.type == "notBlank":
+        return Condition(column, "is not null")
+
+    day = date.fromisoformat(condition.value[:10])
+    start, end = day.isoformat(), (day + timedelta(days=1)).isoformat()
+    match condition.type:
+        case "equals":
+            return AllOf((Condition(column, ">=", start), Condition(column, "<", end)))
+        case "notEqual":
+            return AnyOf((Condition(column, "<", start), Condition(column, ">=", end)))
+        case "lessThan":
+            return Condition(column, "<", start)
+        case "greaterThan":
+            return Condition(column, ">=", end)
+        case "inRange":
+            last = date.fromisoformat(condition.value_to[:10]) + timedelta(days=1)
+            return AllOf(
+                (
+                    Condition(column, ">=", start),
+                    Condition(column, "<", last.isoformat()),
+                )
+            )
+    raise ValueError(f"TripCatalog - Invalid date filter: {condition.type}")
+
+
+def to_predicate(spec: FilterSpec) -> Predicate:
+    """
+    Translates a grid filter into a predicate over the catalog columns.
+    """
+    if spec.field not in FIELDS:
+        raise ValueError(f"TripCatalog - Invalid filter field: {spec.field}")
+    field_spec = FIELDS[spec.field]
+    translate = _date_predicate if spec.kind == "date" else _number_predicate
+    parts = tuple(translate(field_spec, condition) for condition in spec.conditions)
+    return AnyOf(parts) if spec.any else AllOf(parts)
+
+
+class TripCatalog(DataSource):
+    """
+    Paged trip catalog for the trip grid. Filters and sort orders from the
+    grid become SQL predicates and keyset orders, so the browser never holds
+    more than the visible blocks.
+
+    Blocks are read with keyset pagination: the sort key of the last row of
+    each served block is kept as a bookmark, so the next block starts right
+    after it. A block that does not start at a bookmark, after a jump in the
+    scroll position, is read from the closest preceding bookmark with a small
+    offset. Bookmarks, row counts and recent blocks are cached per filter
+    signature, for the most recently used signatures.
+
+    The catalog can be restricted to a set of trips, like the results of an
+    area query, on top of the grid filters.
+    """
+
+    def __init__(
+        self,
+        trip_model: TripModel,
+        max_views: int = 16,
+        max_blocks: int = 32,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._trip_model = trip_model
+        self._max_views = max_views
+        self._max_blocks = max_blocks
+        self._views: OrderedDict[Signature, CatalogView] = OrderedDict()
+        self._restriction: Tuple[int, ...] | None = None
+
+    @staticmethod
+    def sort_order(request: RowRequest) -> SortOrder:
+        for sort in request.sort:
+            if sort.field in FIELDS:
+                return FIELDS[sort.field].column, sort.descending
+        return "traj_id", False
+
+    @property
+    def restriction(self) -> Tuple[int, ...] | None:
+        return self._restriction
+
+    def restrict(self, traj_ids: Iterable[int] | None) -> None:
+        """
+        Restricts the catalog to the given trips, or lifts the restriction
+        with None, and tells bound controls to reload.
+        """
+        self._restriction = None if traj_ids is None else tuple(traj_ids)
+        self.refresh()
+
+    def view(self, request: RowRequest) -> Tuple[SortOrder, CatalogView]:
+        order = self.sort_order(request)
+        signature = (order, tuple(request.filters))
+        view = self._views.get(signature)
+        if view is None:
+            predicates = [to_predicate(spec) for spec in request.filters]
+            if self._restriction is not None:
+                predicates.append(Condition("traj_id", "in", self._restriction))
+            view = CatalogView(predicates)
+            self._views[signature] = view
+            if len(self._views) > self._max_views:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(signature)
+        return order, view
+
+    async def get_rows(self, request: RowRequest) -> RowBlock:
+        (sort, descending), view = self.view(request)
+
+        block_key = (request.start, request.end)
+        trips = view.blocks.get(block_key)
+        if trips is None:
+            trips = await self._load_block(sort, descending, view, request)
+            view.blocks[block_key] = trips
+            if len(view.blocks) > self._max_blocks:
+                view.blocks.popitem(last=False)
+        else:
+            view.blocks.move_to_end(block_key)
+
+        if len(trips) < request.size:
+            return RowBlock(trips, request.start + len(trips))
+
+        # The total sizes the grid's scroll bar
+        if view.count is None:
+            view.count = await count_trips_async(view.predicates)
+        return RowBlock(trips, view.count)
+
+    async def _load_block(
+        self, sort: str, descending: bool, view: CatalogView, request: RowRequest
+    ) -> List[Trip]:
+        anchor = max(row for row in view.bookmarks if row <= request.start)
+        raw_trips = await load_trip_page_async(
+            sort,
+            descending,
+            after=view.bookmarks[anchor],
+            offset=request.start - anchor,
+            limit=request.size,
+            filters=view.predicates,
+        )
+        trips = self._trip_model.add_frame(raw_trips)
+
+        if trips:
+            key_columns = list(CATALOG_SORT_KEYS[sort])
+            last_key = tuple(raw_trips[key_columns].iloc[-1].tolist())
+            view.bookmarks[request.start + len(trips)] = last_key
+        return trips
+
+    def refresh(self) -> None:
+        self._views.clear()
+        super().refresh()
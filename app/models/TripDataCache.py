@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+from app.models.ColumnarFrame import ColumnarFrame
+from app.repositories.executor import run_in_executor
+from app.repositories.trip import load_nodes, load_signals
+from app.services.kinematics import compute_kinematics
+from nicemvvm.singleton import singleton
+from tools.config import load_config
+
+CacheKey = Tuple[str, int]
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+@singleton
+class TripDataCache:
+    """
+    Process-wide LRU cache of loaded trip data (signals and nodes) and data
+    derived from it (kinematics), with a byte budget. Each entry is charged
+    the real size of its column arrays. When an insertion exceeds the budget,
+    the least recently used entries are evicted; they are reloaded
+    transparently on their next access. Data larger than the whole budget is
+    returned without being cached.
+    """
+
+    def __init__(self):
+        settings = load_config().get("cache", {}).get("trips", {})
+        self.max_bytes: int = settings.get("max_bytes", 256 * 1024 * 1024)
+        self._loaders: Dict[str, Callable[[int], ColumnarFrame]] = {
+            "signals": load_signals,
+            "nodes": load_nodes,
+            "kinematics": self._load_kinematics,
+        }
+        self._entries: OrderedDict[CacheKey, ColumnarFrame] = OrderedDict()
+        self._bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._lock = threading.RLock()
+
+    def peek(self, kind: str, traj_id: int) -> ColumnarFrame | None:
+        """
+        Gets cached data without loading it or changing the LRU order.
+        """
+        with self._lock:
+            return self._entries.get((kind, traj_id))
+
+    def get(self, kind: str, traj_id: int) -> ColumnarFrame:
+        """
+        Gets the data of a trip, loading it on a cache miss.
+        :param kind: Data kind: "signals", "nodes" or "kinematics"
+        :param traj_id: Trajectory identifier
+        :return: Columnar trip data
+        """
+        frame = self._lookup(kind, traj_id)
+        if frame is None:
+            frame = self.put(kind, traj_id, self._loaders[kind](traj_id))
+        return frame
+
+    async def get_async(self, kind: str, traj_id: int) -> ColumnarFrame:
+        """
+        Gets the data of a trip, loading it on the repository thread pool on a
+        cache miss.
+        """
+        frame = self._lookup(kind, traj_id)
+        if frame is None:
+            loaded = await run_in_executor(self._loaders[kind], traj_id)
+            frame = self.put(kind, traj_id, loaded)
+        return frame
+
+    def put(self, kind: str, traj_id: int, frame: ColumnarFrame) -> ColumnarFrame:
+        size = frame.nbytes
+        key = (kind, traj_id)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return frame
+
+            self._entries[key] = frame
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+        return frame
+
+    def invalidate(self, traj_id: int) -> None:
+        with self._lock:
+            for kind in self._loaders:
+                self._remove((kind, traj_id))
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets its statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _load_kinematics(self, traj_id: int) -> ColumnarFrame:
+        return compute_kinematics(self.get("signals", traj_id))
+
+    def _lookup(self, kind: str, traj_id: int) -> ColumnarFrame | None:
+        key = (kind, traj_id)
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            return frame
+
+    def _remove(self, key: CacheKey) -> None:
+        frame = self._entries.pop(key, None)
+        if frame is not None:
+            self._bytes -= frame.nbytes
@@ -0,0 +1,53 @@
+import numpy as np
+
+from app.models.ColumnarFrame import ColumnarFrame
+
+
+class TripKinematics(ColumnarFrame):
+    """
+    Columnar per-signal kinematics of a single trip, aligned with its signals.
+    Values that need a previous or next signal are NaN where there is none.
+    """
+
+    COLUMNS = (
+        ("distance", np.dtype(np.float64)),  # m, from the previous signal
+        ("dt", np.dtype(np.float64)),  # s, from the previous signal
+        ("speed", np.dtype(np.float64)),  # m/s
+        ("acceleration", np.dtype(np.float64)),  # m/s²
+        ("jerk", np.dtype(np.float64)),  # m/s³
+        ("heading_change", np.dtype(np.float64)),  # degrees, signed
+        ("grade_distance", np.dtype(np.float64)),  # m, distance times gradient
+        ("energy", np.dtype(np.float64)),  # J/kg, positive tractive work
+    )
+
+    @property
+    def distance(self) -> np.ndarray:
+        return self.column("distance")
+
+    @property
+    def dt(self) -> np.ndarray:
+        return self.column("dt")
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self.column("speed")
+
+    @property
+    def acceleration(self) -> np.ndarray:
+        return self.column("acceleration")
+
+    @property
+    def jerk(self) -> np.ndarray:
+        return self.column("jerk")
+
+    @property
+    def heading_change(self) -> np.ndarray:
+        return self.column("heading_change")
+
+    @property
+    def grade_distance(self) -> np.ndarray:
+        return self.column("grade_distance")
+
+    @property
+    def energy(self) -> np.ndarray:
+        return self.column("energy")
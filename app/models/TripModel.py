@@ -1,12 +1,56 @@
-from typing import Dict, List
+import math
+import weakref
+from dataclasses import fields
+from typing import Iterable, List
+
+import pandas as pd
 
 from app.models.Trip import Trip
-from app.repositories.trip import load_all_trips
+from app.models.TripSummary import TripSummary
+from app.repositories.executor import run_in_executor
+from app.repositories.trip import (
+    load_all_trips,
+    load_nodes_many,
+    load_nodes_many_async,
+    load_signals_many,
+    load_signals_many_async,
+    load_trip,
+)
+
+SUMMARY_FIELDS = [field.name for field in fields(TripSummary)]
+
+
+def _optional(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def _make_summary(raw_trip) -> TripSummary | None:
+    """
+    Builds the summary of a catalog row, or None for trips without one.
+    """
+    if "point_count" not in raw_trip.dtype.names or math.isnan(raw_trip.point_count):
+        return None
+    values = {name: float(raw_trip[name]) for name in SUMMARY_FIELDS}
+    for name in ("point_count", "node_count", "h3_count"):
+        values[name] = int(values[name])
+    for name in ("min_speed", "max_speed", "avg_speed", "elevation_gain"):
+        values[name] = _optional(values[name])
+    return TripSummary(**values)
 
 
 class TripModel:
+    """
+    Shared registry of trip metadata. Trips are held weakly: a trip stays
+    known while a catalog block, a selection or a view uses it, and is
+    reloaded from the catalog by `get` once it has been collected.
+    """
+
     def __init__(self):
-        self.trips: Dict[int, Trip] = {}
+        self.trips: weakref.WeakValueDictionary[int, Trip] = (
+            weakref.WeakValueDictionary()
+        )
+        # Trips of `load`, which holds the whole catalog on purpose
+        self._all_trips: List[Trip] = []
         self._loaded: bool = False
 
     def load(self) -> List[Trip]:
@@ -20,35 +64,103 @@ class TripModel:
         - Caches results to avoid redundant loading
         """
         # Return cached trips if already loaded
-        if self._loaded and self.trips:
-            return list(self.trips.values())
+        if self._loaded and self._all_trips:
+            return list(self._all_trips)
 
-        # Load raw trip data
-        raw_trips = load_all_trips()
+        self._all_trips = self.add_frame(load_all_trips())
+        self._loaded = True
+        return list(self._all_trips)
 
-        # Pre-allocate result list with estimated size
+    def add_frame(self, raw_trips: pd.DataFrame) -> List[Trip]:
+        """
+        Converts catalog rows into trips. Trips that are already known are
+        reused, so every part of the application shares one instance per trip.
+        :param raw_trips: Trip catalog rows
+        :return: The trips, in row order
+        """
         trip_list: List[Trip] = []
 
         # Convert to numpy structured array for faster iteration
         trips_array = raw_trips.to_records(index=False)
 
-        # Process all trips
         for raw_trip in trips_array:
-            trip = Trip(
-                traj_id=int(raw_trip.traj_id),
-                vehicle_id=int(raw_trip.vehicle_id),
-                trip_id=int(raw_trip.trip_id),
-                km=round(raw_trip.length_m / 1000, 1),
-                duration=raw_trip.duration_s,
-                engine=raw_trip.engine,
-                weight=raw_trip.weight,
-                start=raw_trip.dt_ini[:19],
-                end=raw_trip.dt_end[:19],
-                signals=[],
-                nodes=[],
-            )
-            self.trips[trip.traj_id] = trip
+            traj_id = int(raw_trip.traj_id)
+            trip = self.trips.get(traj_id)
+            if trip is None:
+                trip = Trip(
+                    traj_id=traj_id,
+                    vehicle_id=int(raw_trip.vehicle_id),
+                    trip_id=int(raw_trip.trip_id),
+                    km=round(float(raw_trip.length_m) / 1000, 1),
+                    duration=float(raw_trip.duration_s),
+                    engine=raw_trip.engine,
+                    weight=float(raw_trip.weight),
+                    start=raw_trip.dt_ini[:19],
+                    end=raw_trip.dt_end[:19],
+                    summary=_make_summary(raw_trip),
+                )
+                self.trips[traj_id] = trip
             trip_list.append(trip)
-
-        self._loaded = True
         return trip_list
+
+    def get(self, traj_id: int) -> Trip | None:
+        """
+        Gets a trip, loading it from the catalog if it is not known yet.
+        :param traj_id: Trajectory identifier
+        :return: The trip, or None if it does not exist
+        """
+        traj_id = int(traj_id)
+        trip = self.trips.get(traj_id)
+        if trip is None:
+            trips = self.add_frame(load_trip(traj_id))
+            trip = trips[0] if trips else None
+        return trip
+
+    def get_many(self, traj_ids: Iterable[int]) -> List[Trip]:
+        """
+        Gets many trips, loading the unknown ones from the catalog.
+        :param traj_ids: Trajectory identifiers of existing trips
+        :return: The trips, in the given order
+        """
+        return [self.get(traj_id) for traj_id in traj_ids]
+
+    def load_details(self, traj_ids: Iterable[int]) -> List[Trip]:
+        """
+        Loads signals and nodes for many trips at once, skipping trips that
+        already have them.
+        :param traj_ids: Trajectory identifiers of existing trips
+        :return: The trips, in the given order
+        """
+        trips = self.get_many(traj_ids)
+
+        missing = [trip.traj_id for trip in trips if not trip.has_signals]
+        if missing:
+            for traj_id, signals in load_signals_many(missing).items():
+                self.trips[traj_id].signals = signals
+
+        missing = [trip.traj_id for trip in trips if not trip.has_nodes]
+        if missing:
+            for traj_id, nodes in load_nodes_many(missing).items():
+                self.trips[traj_id].nodes = nodes
+        return trips
+
+    async def load_details_async(self, traj_ids: Iterable[int]) -> List[Trip]:
+        """
+        Loads signals and nodes for many trips at once without blocking the
+        event loop, skipping trips that already have them.
+        :param traj_ids: Trajectory identifiers of existing trips
+        :return: The trips, in the given order
+        """
+        # Unknown trips are read from the catalog, off the event loop too
+        trips = await run_in_executor(self.get_many, list(traj_ids))
+
+        missing = [trip.traj_id for trip in trips if not trip.has_signals]
+        if missing:
+            for traj_id, signals in (await load_signals_many_async(missing)).items():
+                self.trips[traj_id].signals = signals
+
+        missing = [trip.traj_id for trip in trips if not trip.has_nodes]
+        if missing:
+            for traj_id, nodes in (await load_nodes_many_async(missing)).items():
+                self.trips[traj_id].nodes = nodes
+        return trips
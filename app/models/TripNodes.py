@@ -0,0 +1,41 @@
+import numpy as np
+
+from app.models.ColumnarFrame import ColumnarFrame
+from app.models.MapNode import MapNode
+
+
+class TripNodes(ColumnarFrame):
+    """
+    Columnar map-matched nodes of a single trip. Single rows are exposed as
+    `MapNode` views.
+    """
+
+    COLUMNS = (
+        ("node_id", np.dtype(np.int64)),
+        ("traj_id", np.dtype(np.int64)),
+        ("lat", np.dtype(np.float64)),
+        ("lon", np.dtype(np.float64)),
+        ("h3_12", np.dtype(np.int64)),
+        ("match_error", np.dtype(object)),
+    )
+    ROW_TYPE = MapNode
+
+    @property
+    def node_id(self) -> np.ndarray:
+        return self.column("node_id")
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self.column("lat")
+
+    @property
+    def lon(self) -> np.ndarray:
+        return self.column("lon")
+
+    @property
+    def h3_12(self) -> np.ndarray:
+        return self.column("h3_12")
+
+    @property
+    def match_error(self) -> np.ndarray:
+        return self.column("match_error")
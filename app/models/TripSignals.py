@@ -0,0 +1,100 @@
+from typing import Tuple
+
+import numpy as np
+
+from app.geo.projection import LocalProjection, projection_for
+from app.models.ColumnarFrame import ColumnarFrame
+from app.models.Signal import Signal
+
+
+class TripSignals(ColumnarFrame):
+    """
+    Columnar signals of a single trip. Single rows are exposed as `Signal` views.
+    """
+
+    COLUMNS = (
+        ("signal_id", np.dtype(np.int64)),
+        ("day_num", np.dtype(np.float64)),
+        ("timestamp", np.dtype(np.int64)),
+        ("vehicle_id", np.dtype(np.int32)),
+        ("trip_id", np.dtype(np.int32)),
+        ("lat", np.dtype(np.float64)),
+        ("lon", np.dtype(np.float64)),
+        ("match_lat", np.dtype(np.float64)),
+        ("match_lon", np.dtype(np.float64)),
+        ("speed", np.dtype(np.float32)),
+        ("elevation", np.dtype(np.float32)),
+        ("elevation_smooth", np.dtype(np.float32)),
+        ("gradient", np.dtype(np.float32)),
+        ("h3_12", np.dtype(np.int64)),
+    )
+    NULLABLE = ("gradient",)
+    ROW_TYPE = Signal
+
+    _projection: LocalProjection | None = None
+
+    @property
+    def signal_id(self) -> np.ndarray:
+        return self.column("signal_id")
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.column("timestamp")
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self.column("lat")
+
+    @property
+    def lon(self) -> np.ndarray:
+        return self.column("lon")
+
+    @property
+    def match_lat(self) -> np.ndarray:
+        return self.column("match_lat")
+
+    @property
+    def match_lon(self) -> np.ndarray:
+        return self.column("match_lon")
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self.column("speed")
+
+    @property
+    def elevation(self) -> np.ndarray:
+        return self.column("elevation")
+
+    @property
+    def elevation_smooth(self) -> np.ndarray:
+        return self.column("elevation_smooth")
+
+    @property
+    def gradient(self) -> np.ndarray:
+        return self.column("gradient")
+
+    @property
+    def h3_12(self) -> np.ndarray:
+        return self.column("h3_12")
+
+    def locations(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map-matched locations, or the raw fixes where matching failed, as
+        indexed by `h3_12`.
+        :return: Arrays of latitudes and longitudes
+        """
+        unmatched = np.isnan(self.match_lat) | np.isnan(self.match_lon)
+        lats = np.where(unmatched, self.lat, self.match_lat)
+        lons = np.where(unmatched, self.lon, self.match_lon)
+        return lats, lons
+
+    @property
+    def projection(self) -> LocalProjection:
+        """
+        Local planar frame of the trip, centered on its locations. It is built
+        on first use and kept with the signals in `TripDataCache`, so the
+        metric computations on a trip share one frame.
+        """
+        if self._projection is None:
+            self._projection = projection_for(*self.locations())
+        return self._projection
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TripSummary:
+    """
+    Precomputed per-trip statistics from the `trip_summary` table. The bounding
+    box covers both the GPS and the map-matched locations.
+    """
+
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    point_count: int
+    node_count: int
+    min_speed: float | None
+    max_speed: float | None
+    avg_speed: float | None
+    elevation_gain: float | None
+    start_lat: float
+    start_lon: float
+    end_lat: float
+    end_lon: float
+    h3_count: int
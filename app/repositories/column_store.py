@@ -0,0 +1,155 @@
+import functools
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from app.models.TripSignals import TripSignals
+from tools.config import load_config
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+class TripColumnStore(object):
+    """
+    Derived on-disk cache of trip signals with one `.npy` file per column and
+    trip. Warm trips are opened with `numpy.memmap`, so loading them is a
+    zero-copy page-cache hit shared by every server process.
+
+    Trips live in a generation folder named by the `current.json` pointer,
+    which is stamped with a format version and the source database's
+    modification time. Every access re-checks the pointer and the source, at
+    the cost of two `stat` calls, so a long-running process notices a rebuilt
+    database or a reset made by another process. A reset starts a new
+    generation and swaps the pointer atomically; old generations are pruned,
+    and arrays already mapped from them stay readable.
+    """
+
+    # Version 3 stores signals in time order
+    VERSION = 3
+    CURRENT = "current.json"
+
+    def __init__(self, folder: str, source: str):
+        self.folder = Path(folder)
+        self.source = source
+        self._key: Tuple | None = None
+        self._generation: Path | None = None
+
+    def _stamp(self) -> Dict:
+        return {
+            "version": self.VERSION,
+            "source": os.path.abspath(self.source),
+            "source_mtime_ns": os.stat(self.source).st_mtime_ns,
+            "columns": [[name, dtype.str] for name, dtype in TripSignals.COLUMNS],
+        }
+
+    def generation(self) -> Path | None:
+        """
+        Gets the folder of the current generation.
+        :return: Folder, or None when the store is empty or stale
+        """
+        try:
+            source = os.stat(self.source)
+            pointer = os.stat(self.folder / self.CURRENT)
+        except OSError:
+            return None
+        # The pointer is replaced, never rewritten, so its inode changes too
+        key = (source.st_mtime_ns, pointer.st_ino, pointer.st_mtime_ns)
+        if key != self._key:
+            self._key, self._generation = key, None
+            try:
+                current = json.loads(
+                    (self.folder / self.CURRENT).read_text(encoding="utf-8")
+                )
+            except (OSError, ValueError):
+                return None
+            if current.get("stamp") == self._stamp():
+                self._generation = self.folder / current["generation"]
+        return self._generation
+
+    def is_valid(self) -> bool:
+        return self.generation() is not None
+
+    def reset(self) -> None:
+        """
+        Starts an empty generation stamped for the current source, and prunes
+        the previous ones.
+        """
+        name = f"g{uuid.uuid4().hex}"
+        (self.folder / name).mkdir(parents=True)
+        staging = self.folder / f".{name}.json"
+        staging.write_text(
+            json.dumps({"stamp": self._stamp(), "generation": name}), encoding="utf-8"
+        )
+        os.replace(staging, self.folder / self.CURRENT)
+        for child in self.folder.iterdir():
+            if child.is_dir() and child.name.startswith("g") and child.name != name:
+                shutil.rmtree(child, ignore_errors=True)
+
+    def path(self, traj_id: int) -> Path | None:
+        generation = self.generation()
+        return None if generation is None else generation / str(traj_id)
+
+    def contains(self, traj_id: int) -> bool:
+        folder = self.path(traj_id)
+        return folder is not None and folder.is_dir()
+
+    def load(self, traj_id: int) -> TripSignals | None:
+        """
+        Opens the memory-mapped signals of a cached trip.
+        :param traj_id: Trajectory identifier
+        :return: Read-only, memory-mapped signals, or None if not cached
+        """
+        folder = self.path(traj_id)
+        if folder is None or not folder.is_dir():
+            return None
+        try:
+            return TripSignals(
+                **{
+                    name: np.load(folder / f"{name}.npy", mmap_mode="r")
+                    for name in TripSignals.names()
+                }
+            )
+        except (OSError, ValueError):
+            return None
+
+    def save(self, traj_id: int, signals: TripSignals) -> None:
+        """
+        Writes the signals of a trip. Columns go to a temporary folder that is
+        renamed into place, so readers never see a partially written trip.
+        """
+        generation = self.generation()
+        if generation is None:
+            self.reset()
+            generation = self.generation()
+
+        target = generation / str(traj_id)
+        staging = generation / f".{traj_id}-{uuid.uuid4().hex}"
+        try:
+            staging.mkdir()
+            for name in TripSignals.names():
+                np.save(staging / f"{name}.npy", signals.column(name))
+            os.replace(staging, target)
+        except OSError:
+            # Another process stored the same trip first, or pruned this
+            # generation
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+@functools.cache
+def get_column_store() -> TripColumnStore | None:
+    """
+    Gets the column store configured in the `[cache.columns]` section, or None
+    when it is disabled. A store whose stamp no longer matches the source
+    database is reset when the next trip is saved.
+    """
+    settings = load_config().get("cache", {}).get("columns", {})
+    if not settings.get("enabled", False):
+        return None
+
+    return TripColumnStore(
+        folder=settings.get("folder", "./data/columns"), source=EvedDb().db_name
+    )
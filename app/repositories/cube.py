@@ -0,0 +1,59 @@
+import pandas as pd
+
+from app.repositories.executor import run_in_executor
+from nicemvvm.controls.leaflet.types import GeoBounds
+from tools.database.sqlite.EvedDb import EvedDb
+
+CUBE_CELLS_SQL = """
+        select      h3_cell
+        ,           point_count
+        ,           trip_count
+        ,           speed_mean
+        ,           speed_p50
+        ,           speed_p85
+        ,           gradient_mean
+        from        h3_cube
+        where       resolution = ?
+        and         lat between ? and ?
+        and         lon between ? and ?
+        order by    point_count desc
+        limit       ?
+"""
+
+
+def has_h3_cube(db: EvedDb) -> bool:
+    """
+    Checks for the h3_cube table, built by `make h3-cube`.
+    """
+    return db.table_exists("h3_cube")
+
+
+def load_cube_cells(
+    resolution: int, bounds: GeoBounds, limit: int = 5000
+) -> pd.DataFrame:
+    """
+    Loads the aggregate cells of a resolution whose centers are in a map view.
+    :param resolution: H3 resolution, from 7 to 12
+    :param bounds: Map view bounds
+    :param limit: Maximum number of cells, the busiest first
+    :return: Cube rows, empty when the cube has not been built
+    """
+    db = EvedDb()
+    with db.connection():
+        if not has_h3_cube(db):
+            return pd.DataFrame(columns=["h3_cell"])
+        parameters = [
+            resolution,
+            bounds.sw.lat,
+            bounds.ne.lat,
+            bounds.sw.lng,
+            bounds.ne.lng,
+            limit,
+        ]
+        return db.query_df(CUBE_CELLS_SQL, parameters=parameters)
+
+
+async def load_cube_cells_async(
+    resolution: int, bounds: GeoBounds, limit: int = 5000
+) -> pd.DataFrame:
+    return await run_in_executor(load_cube_cells, resolution, bounds, limit)
@@ -0,0 +1,51 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from tools.config import load_config
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Gets the bounded thread pool that runs repository calls off the event loop.
+    The number of workers is set by `workers` in the `[database.executor]`
+    section and defaults to the connection pool size, so each worker can hold
+    its own pooled connection without waiting.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            database = load_config().get("database", {})
+            default_workers = database.get("pool", {}).get("size", 4)
+            workers = database.get("executor", {}).get("workers", default_workers)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="repository"
+            )
+        return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+async def run_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking repository function on the repository thread pool.
+    :param func: Blocking function
+    :return: The function's result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
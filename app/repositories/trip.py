@@ -1,38 +1,29 @@
+import json
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
-from app.models.MapNode import MapNode
-from app.models.Signal import Signal
+from app.models.TripNodes import TripNodes
+from app.models.TripSignals import TripSignals
+from app.repositories.column_store import get_column_store
+from app.repositories.executor import run_in_executor
+from nicemvvm.controls.leaflet.types import GeoBounds
 from tools.database.sqlite.EvedDb import EvedDb
+from tools.database.sqlite.IndexManager import IndexManager
+from tools.database.sqlite.Predicate import Condition, Predicate, where_clause
 
+# Keeps each IN list well below SQLite's bound parameter limit.
+MAX_IN_LIST = 500
 
-def load_all_trips() -> pd.DataFrame:
-    db = EvedDb()
-    sql = """
-        select      t.traj_id
-        ,           t.vehicle_id
-        ,           t.trip_id
-        ,           t.length_m
-        ,           t.dt_ini
-        ,           t.dt_end
-        ,           t.duration_s
-        ,           v.engine
-        ,           v.weight
-        from        trajectory t
-        inner join  vehicle v on v.vehicle_id = t.vehicle_id
-    """
-    return db.query_df(sql)
-
-
-def load_signals(traj_id: int) -> list[Signal]:
-    db = EvedDb()
-    sql = """
+SIGNAL_COLUMNS = """
         select      s.signal_id
         ,           s.day_num
         ,           s.time_stamp
         ,           s.vehicle_id
         ,           s.trip_id
         ,           s.latitude
-        ,           s.longitude   
+        ,           s.longitude
         ,           s.match_latitude
         ,           s.match_longitude
         ,           s.speed
@@ -40,51 +31,479 @@ def load_signals(traj_id: int) -> list[Signal]:
         ,           s.elevation_smooth
         ,           s.gradient
         ,           s.h3_12
-        from        signal s
-        inner join  trajectory t on s.vehicle_id = t.vehicle_id and s.trip_id = t.trip_id
-        where       t.traj_id = ?
-    """
-    rows = db.query(sql, parameters=[traj_id])
-    return [
-        Signal(
-            signal_id=int(row[0]),
-            day_num=float(row[1]),
-            timestamp=int(row[2]),
-            vehicle_id=int(row[3]),
-            trip_id=int(row[4]),
-            lat=float(row[5]),
-            lon=float(row[6]),
-            match_lat=float(row[7]),
-            match_lon=float(row[8]),
-            speed=float(row[9]),
-            elevation=float(row[10]),
-            elevation_smooth=float(row[11]),
-            gradient=row[12],
-            h3_12=int(row[13])
-        ) for row in rows
-    ]
-
-
-def load_nodes(traj_id: int) -> list[MapNode]:
-    db = EvedDb()
-    sql = """
+"""
+
+NODE_COLUMNS = """
         select      n.node_id
         ,           n.traj_id
         ,           n.latitude
         ,           n.longitude
         ,           n.h3_12
         ,           n.match_error
+"""
+
+SIGNALS_BY_TRAJ_SQL = f"""
+        {SIGNAL_COLUMNS}
+        from        signal s
+        inner join  trajectory t on s.vehicle_id = t.vehicle_id and s.trip_id = t.trip_id
+        where       t.traj_id = ?
+        order by    s.time_stamp
+"""
+
+TRIP_CATALOG_SQL = """
+        select      t.traj_id
+        ,           t.vehicle_id
+        ,           t.trip_id
+        ,           t.length_m
+        ,           t.dt_ini
+        ,           t.dt_end
+        ,           t.duration_s
+        ,           v.engine
+        ,           v.weight
+        from        trajectory t
+        inner join  vehicle v on v.vehicle_id = t.vehicle_id
+"""
+
+# Joined when the trip_summary table has been built
+TRIP_SUMMARY_SQL = """
+        select      t.traj_id
+        ,           t.vehicle_id
+        ,           t.trip_id
+        ,           t.length_m
+        ,           t.dt_ini
+        ,           t.dt_end
+        ,           t.duration_s
+        ,           v.engine
+        ,           v.weight
+        ,           ts.min_lat
+        ,           ts.min_lon
+        ,           ts.max_lat
+        ,           ts.max_lon
+        ,           ts.point_count
+        ,           ts.node_count
+        ,           ts.min_speed
+        ,           ts.max_speed
+        ,           ts.avg_speed
+        ,           ts.elevation_gain
+        ,           ts.start_lat
+        ,           ts.start_lon
+        ,           ts.end_lat
+        ,           ts.end_lon
+        ,           ts.h3_count
+        from        trajectory t
+        inner join  vehicle v on v.vehicle_id = t.vehicle_id
+        left join   trip_summary ts on ts.traj_id = t.traj_id
+"""
+
+# Catalog columns that filters and sort orders may reference
+CATALOG_COLUMNS = {
+    "traj_id": "t.traj_id",
+    "vehicle_id": "t.vehicle_id",
+    "trip_id": "t.trip_id",
+    "length_m": "t.length_m",
+    "duration_s": "t.duration_s",
+    "dt_ini": "t.dt_ini",
+    "dt_end": "t.dt_end",
+}
+
+# Keyset columns of each catalog sort order. Non-unique keys end with traj_id,
+# which the trajectory indexes carry as their rowid.
+CATALOG_SORT_KEYS = {
+    "traj_id": ("traj_id",),
+    "vehicle_id": ("vehicle_id", "trip_id", "traj_id"),
+    "length_m": ("length_m", "traj_id"),
+    "dt_ini": ("dt_ini", "traj_id"),
+    "dt_end": ("dt_end", "traj_id"),
+}
+
+# Trips with a segment box intersecting the query box, see build_trip_rtree
+TRIPS_IN_BOUNDS_SQL = """
+        where       t.traj_id in (
+                        select      r.traj_id
+                        from        trip_rtree r
+                        where       r.max_lat >= ? and r.min_lat <= ?
+                        and         r.max_lon >= ? and r.min_lon <= ?
+                    )
+        order by    t.traj_id
+        limit       ?
+"""
+
+# Trips with signals in any of the cell ranges, see build_trip_cells. Each
+# range is a scan of the trip_cell primary key.
+TRIPS_IN_CELL_RANGES_SQL = """
+        select      distinct c.traj_id
+        from        json_each(?) r
+        inner join  trip_cell c
+                on  c.h3_12 between json_extract(r.value, '$[0]')
+                                and json_extract(r.value, '$[1]')
+        order by    c.traj_id
+"""
+
+NODES_BY_TRAJ_SQL = f"""
+        {NODE_COLUMNS}
         from        node n
         where       n.traj_id = ?
+"""
+
+
+def _chunks(ids: List[int], size: int) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def _unique_ids(traj_ids: Iterable[int]) -> List[int]:
+    return list(dict.fromkeys(int(traj_id) for traj_id in traj_ids))
+
+
+def catalog_sql(summary: bool) -> str:
+    return TRIP_SUMMARY_SQL if summary else TRIP_CATALOG_SQL
+
+
+def has_trip_summary(db: EvedDb) -> bool:
+    """
+    Checks for the trip_summary table, built by `make trip-summary`.
+    """
+    return db.table_exists("trip_summary")
+
+
+def load_all_trips() -> pd.DataFrame:
+    db = EvedDb()
+    with db.connection():
+        return db.query_df(catalog_sql(has_trip_summary(db)))
+
+
+def load_trip(traj_id: int) -> pd.DataFrame:
+    db = EvedDb()
+    with db.connection():
+        sql = f"{catalog_sql(has_trip_summary(db))} where t.traj_id = ?"
+        return db.query_df(sql, parameters=[traj_id])
+
+
+def has_trip_rtree(db: EvedDb) -> bool:
+    """
+    Checks for the trip_rtree spatial index, built by `make trip-rtree`.
+    """
+    return db.table_exists("trip_rtree")
+
+
+def trips_in_bounds(bounds: GeoBounds, limit: int = 1000) -> pd.DataFrame:
+    """
+    Lists the trips that may pass through a map view, from the R*Tree of trip
+    segment boxes. Candidates may include trips that only cross the corners
+    of their boxes, but never miss a trip inside the bounds.
+    :param bounds: Map view bounds
+    :param limit: Maximum number of trips, in traj_id order
+    :return: Catalog rows, empty when the spatial index has not been built
     """
-    rows = db.query(sql, parameters=[traj_id])
-    return [
-        MapNode(
-            node_id=int(row[0]),
-            traj_id=int(row[1]),
-            lat=float(row[2]),
-            lon=float(row[3]),
-            h3_12=int(row[4]),
-            match_error=row[5]
-        ) for row in rows
-    ]
\ No newline at end of file
+    db = EvedDb()
+    with db.connection():
+        summary = has_trip_summary(db)
+        if not has_trip_rtree(db):
+            return db.query_df(f"{catalog_sql(summary)} where 0")
+        sql = f"{catalog_sql(summary)} {TRIPS_IN_BOUNDS_SQL}"
+        parameters = [bounds.sw.lat, bounds.ne.lat, bounds.sw.lng, bounds.ne.lng]
+        return db.query_df(sql, parameters=[*parameters, limit])
+
+
+def has_trip_cells(db: EvedDb) -> bool:
+    """
+    Checks for the trip_cell table, built by `make trip-cells`.
+    """
+    return db.table_exists("trip_cell")
+
+
+def trips_in_cell_ranges(ranges: np.ndarray) -> List[int]:
+    """
+    Lists the trips with signals in H3 cell ranges, see `cell_ranges`.
+    :param ranges: Array of inclusive (low, high) resolution 12 cell ranges
+    :return: Trip identifiers in ascending order, empty when the trip_cell
+        table has not been built
+    """
+    db = EvedDb()
+    with db.connection():
+        if not has_trip_cells(db) or len(ranges) == 0:
+            return []
+        parameters = [json.dumps(ranges.tolist())]
+        return [row[0] for row in db.query(TRIPS_IN_CELL_RANGES_SQL, parameters)]
+
+
+def count_trips(filters: Sequence[Predicate] = ()) -> int:
+    """
+    Counts the trips of the catalog that match the filters.
+    """
+    where, parameters = where_clause(filters, CATALOG_COLUMNS)
+    sql = f"""
+        select      count(*)
+        from        trajectory t
+        {where}
+    """
+    db = EvedDb()
+    return db.query_scalar(sql, parameters)
+
+
+def keyset_predicate(
+    keys: Sequence[str], values: Sequence, descending: bool = False
+) -> Tuple[str, List]:
+    """
+    Builds the predicate of the rows after a keyset position. SQLite sorts
+    NULL first in ascending order and last in descending order, and never
+    satisfies a comparison with NULL, so NULL keys get explicit branches. A
+    range on the first key is kept for the index seek.
+    :param keys: Sort key columns
+    :param values: Sort key of the row preceding the page, None for NULL
+    :param descending: Sort direction
+    :return: SQL predicate and its parameters
+    """
+    key, value = keys[0], values[0]
+    if len(keys) == 1:
+        if value is None:
+            return ("0", []) if descending else (f"{key} is not null", [])
+        if descending:
+            return f"({key} < ? or {key} is null)", [value]
+        return f"{key} > ?", [value]
+
+    tail, tail_parameters = keyset_predicate(keys[1:], values[1:], descending)
+    if value is None:
+        same = f"{key} is null and {tail}"
+        if descending:
+            return same, tail_parameters
+        return f"({key} is not null or ({same}))", tail_parameters
+    if descending:
+        sql = f"(({key} <= ? and ({key} < ? or {tail})) or {key} is null)"
+    else:
+        sql = f"{key} >= ? and ({key} > ? or {tail})"
+    return sql, [value, value, *tail_parameters]
+
+
+def catalog_page_query(
+    sort: str = "traj_id",
+    descending: bool = False,
+    after: Sequence | None = None,
+    offset: int = 0,
+    limit: int = 100,
+    filters: Sequence[Predicate] = (),
+    summary: bool = False,
+) -> Tuple[str, List]:
+    """
+    Builds the parameterized query of a catalog page, see `load_trip_page`.
+    """
+    if sort not in CATALOG_SORT_KEYS:
+        raise ValueError(f"Invalid catalog sort: {sort}")
+    keys = [CATALOG_COLUMNS[column] for column in CATALOG_SORT_KEYS[sort]]
+    direction = "desc" if descending else "asc"
+
+    where, parameters = where_clause(filters, CATALOG_COLUMNS)
+    if after is not None:
+        # NumPy scalars from DataFrame rows would otherwise bind as blobs
+        values = [
+            value.item() if isinstance(value, np.generic) else value for value in after
+        ]
+        values = [None if pd.isna(value) else value for value in values]
+        keyset, keyset_parameters = keyset_predicate(keys, values, descending)
+        where = f"{where} and {keyset}" if where else f"where {keyset}"
+        parameters.extend(keyset_parameters)
+
+    order = ", ".join(f"{key} {direction}" for key in keys)
+    sql = f"""
+        {catalog_sql(summary)}
+        {where}
+        order by    {order}
+        limit       ? offset ?
+    """
+    return sql, [*parameters, limit, offset]
+
+
+def load_trip_page(
+    sort: str = "traj_id",
+    descending: bool = False,
+    after: Sequence | None = None,
+    offset: int = 0,
+    limit: int = 100,
+    filters: Sequence[Predicate] = (),
+) -> pd.DataFrame:
+    """
+    Loads a page of the trip catalog with keyset pagination. The page starts
+    after the row whose sort key is `after`, skipping `offset` further rows,
+    so sequential pages never rescan the rows before them.
+    :param sort: Sort order, a key of CATALOG_SORT_KEYS
+    :param descending: Sort direction
+    :param after: Sort key of the row preceding the page, None for the start
+    :param offset: Rows to skip after the keyset position
+    :param limit: Maximum number of rows
+    :param filters: Predicates over CATALOG_COLUMNS, all of which must hold
+    :return: Catalog rows
+    """
+    db = EvedDb()
+    with db.connection():
+        sql, parameters = catalog_page_query(
+            sort, descending, after, offset, limit, filters, has_trip_summary(db)
+        )
+        return db.query_df(sql, parameters=parameters)
+
+
+def load_signals(traj_id: int) -> TripSignals:
+    """
+    Loads the signals of a trip, from the column store when it is enabled and
+    holds the trip, otherwise from the database.
+    :param traj_id: Trajectory identifier
+    :return: Columnar signals
+    """
+    store = get_column_store()
+    if store is not None:
+        signals = store.load(traj_id)
+        if signals is not None:
+            return signals
+
+    db = EvedDb()
+    with db.query_iterator(SIGNALS_BY_TRAJ_SQL, parameters=[traj_id]) as cursor:
+        signals = TripSignals.from_cursor(cursor)
+
+    if store is not None:
+        store.save(traj_id, signals)
+    return signals
+
+
+def load_signals_many(
+    traj_ids: Iterable[int], chunk_size: int = MAX_IN_LIST
+) -> Dict[int, TripSignals]:
+    """
+    Loads the signals of many trips with one query per chunk of trip ids.
+    Trips held by the column store are read from it instead.
+    :param traj_ids: Trajectory identifiers
+    :param chunk_size: Maximum number of trip ids per query
+    :return: Columnar signals keyed by traj_id, empty for trips without signals
+    """
+    ids = _unique_ids(traj_ids)
+    result: Dict[int, TripSignals] = {traj_id: TripSignals.empty() for traj_id in ids}
+
+    store = get_column_store()
+    if store is not None:
+        cached = {traj_id: store.load(traj_id) for traj_id in ids}
+        result.update({k: v for k, v in cached.items() if v is not None})
+        ids = [traj_id for traj_id, signals in cached.items() if signals is None]
+
+    db = EvedDb()
+    with db.connection():
+        for chunk in _chunks(ids, chunk_size):
+            sql = f"""
+                {SIGNAL_COLUMNS}
+                ,           t.traj_id
+                from        signal s
+                inner join  trajectory t
+                        on  s.vehicle_id = t.vehicle_id
+                        and s.trip_id = t.trip_id
+                where       t.traj_id in ({", ".join("?" * len(chunk))})
+                order by    t.traj_id, s.time_stamp
+            """
+            with db.query_iterator(sql, parameters=chunk) as cursor:
+                result.update(TripSignals.group_from_cursor(cursor))
+
+    if store is not None:
+        for traj_id in ids:
+            store.save(traj_id, result[traj_id])
+    return result
+
+
+def load_nodes(traj_id: int) -> TripNodes:
+    db = EvedDb()
+    with db.query_iterator(NODES_BY_TRAJ_SQL, parameters=[traj_id]) as cursor:
+        return TripNodes.from_cursor(cursor)
+
+
+def load_nodes_many(
+    traj_ids: Iterable[int], chunk_size: int = MAX_IN_LIST
+) -> Dict[int, TripNodes]:
+    """
+    Loads the map-matched nodes of many trips with one query per chunk of trip ids.
+    :param traj_ids: Trajectory identifiers
+    :param chunk_size: Maximum number of trip ids per query
+    :return: Columnar nodes keyed by traj_id, empty for trips without nodes
+    """
+    ids = _unique_ids(traj_ids)
+    result: Dict[int, TripNodes] = {traj_id: TripNodes.empty() for traj_id in ids}
+
+    db = EvedDb()
+    with db.connection():
+        for chunk in _chunks(ids, chunk_size):
+            sql = f"""
+                {NODE_COLUMNS}
+                ,           n.traj_id
+                from        node n
+                where       n.traj_id in ({", ".join("?" * len(chunk))})
+            """
+            with db.query_iterator(sql, parameters=chunk) as cursor:
+                result.update(TripNodes.group_from_cursor(cursor))
+    return result
+
+
+async def load_all_trips_async() -> pd.DataFrame:
+    return await run_in_executor(load_all_trips)
+
+
+async def load_trip_page_async(
+    sort: str = "traj_id",
+    descending: bool = False,
+    after: Sequence | None = None,
+    offset: int = 0,
+    limit: int = 100,
+    filters: Sequence[Predicate] = (),
+) -> pd.DataFrame:
+    return await run_in_executor(
+        load_trip_page, sort, descending, after, offset, limit, filters
+    )
+
+
+async def trips_in_bounds_async(bounds: GeoBounds, limit: int = 1000) -> pd.DataFrame:
+    return await run_in_executor(trips_in_bounds, bounds, limit)
+
+
+async def trips_in_cell_ranges_async(ranges: np.ndarray) -> List[int]:
+    return await run_in_executor(trips_in_cell_ranges, ranges)
+
+
+async def count_trips_async(filters: Sequence[Predicate] = ()) -> int:
+    return await run_in_executor(count_trips, filters)
+
+
+async def load_signals_async(traj_id: int) -> TripSignals:
+    return await run_in_executor(load_signals, traj_id)
+
+
+async def load_signals_many_async(
+    traj_ids: Iterable[int], chunk_size: int = MAX_IN_LIST
+) -> Dict[int, TripSignals]:
+    return await run_in_executor(load_signals_many, list(traj_ids), chunk_size)
+
+
+async def load_nodes_async(traj_id: int) -> TripNodes:
+    return await run_in_executor(load_nodes, traj_id)
+
+
+async def load_nodes_many_async(
+    traj_ids: Iterable[int], chunk_size: int = MAX_IN_LIST
+) -> Dict[int, TripNodes]:
+    return await run_in_executor(load_nodes_many, list(traj_ids), chunk_size)
+
+
+def register_queries(manager: IndexManager) -> None:
+    """
+    Registers this repository's hot queries for the startup index audit.
+    """
+    manager.register_query("load_signals", SIGNALS_BY_TRAJ_SQL, [0])
+    manager.register_query("load_nodes", NODES_BY_TRAJ_SQL, [0])
+    for sort in CATALOG_SORT_KEYS:
+        sql, parameters = catalog_page_query(
+            sort, after=[0] * len(CATALOG_SORT_KEYS[sort])
+        )
+        manager.register_query(f"load_trip_page_{sort}", sql, parameters)
+
+    # Analysts mostly filter by vehicle and date range
+    sql, parameters = catalog_page_query(
+        "dt_ini",
+        filters=[
+            Condition("vehicle_id", "=", 0),
+            Condition("dt_ini", ">=", ""),
+            Condition("dt_ini", "<", ""),
+        ],
+    )
+    manager.register_query("load_trip_page_vehicle_dates", sql, parameters)
@@ -0,0 +1,59 @@
+import math
+from typing import AsyncIterator, List
+
+import numpy as np
+
+from app.geo.geomath import circle_to_polygon
+from app.geo.hexagons import cell_ranges, polygon_to_cells
+from app.repositories.trip import load_signals_many_async, trips_in_cell_ranges_async
+from app.viewmodels.circle import CIRCLE_VERTICES, MapCircle
+from app.viewmodels.polygon import MapPolygon
+from app.viewmodels.shape import MapArea
+
+
+def shape_cells(shape: MapArea, resolution: int = 12) -> np.ndarray:
+    """
+    Covers a drawn polygon or circle with compacted H3 cells.
+    :param shape: Drawn shape
+    :param resolution: Finest H3 resolution
+    :return: Array of H3 cells of mixed resolutions
+    """
+    match shape:
+        case MapPolygon():
+            lats, lons = shape.vertices[:, 0], shape.vertices[:, 1]
+        case MapCircle():
+            # Circumscribed, so that the polygon covers the whole circle
+            radius = shape.radius / math.cos(math.pi / CIRCLE_VERTICES)
+            points = circle_to_polygon(
+                shape.center.lat, shape.center.lng, radius, CIRCLE_VERTICES
+            )
+            lats, lons = points[:, 0], points[:, 1]
+        case _:
+            raise TypeError(f"shape_cells - Unsupported shape: {shape!r}")
+    return polygon_to_cells(lats, lons, resolution)
+
+
+async def trips_crossing(
+    shape: MapArea, chunk_size: int = 50
+) -> AsyncIterator[List[int]]:
+    """
+    Finds the trips with signals inside a drawn shape. Candidates come from
+    the trip_cell table, through the compacted cell cover of the shape, and
+    are refined with an exact point-in-shape test on their signals.
+    :param shape: Drawn polygon or circle
+    :param chunk_size: Candidate trips refined per signal query
+    :return: Batches of crossing trip identifiers, as they are confirmed
+    """
+    ranges = cell_ranges(shape_cells(shape))
+    candidates = await trips_in_cell_ranges_async(ranges)
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start : start + chunk_size]
+        signals = await load_signals_many_async(chunk)
+        crossing = [
+            traj_id
+            for traj_id in chunk
+            if traj_id in signals
+            and shape.contains_many(*signals[traj_id].locations()).any()
+        ]
+        if crossing:
+            yield crossing
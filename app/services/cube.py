@@ -0,0 +1,220 @@
+from typing import Callable, Iterable, Iterator, Tuple
+
+import h3.api.numpy_int as h3
+import numpy as np
+
+from app.geo.hexagons import vec_cell_to_parent
+from tools.database.sqlite.BaseDb import BaseDb
+
+CUBE_RESOLUTIONS = range(7, 13)
+
+# Speed percentiles of each cell, as (column, quantile)
+SPEED_PERCENTILES = (("speed_p50", 0.50), ("speed_p85", 0.85))
+
+CUBE_SCHEMA_SQL = """
+    create table if not exists h3_cube (
+        resolution      integer not null,
+        h3_cell         integer not null,
+        lat             real,
+        lon             real,
+        point_count     integer,
+        trip_count      integer,
+        speed_mean      real,
+        speed_p50       real,
+        speed_p85       real,
+        gradient_mean   real,
+        primary key (resolution, h3_cell)
+    ) without rowid;
+    create index if not exists idx_h3_cube_resolution_lat
+        on h3_cube (resolution, lat, lon);
+"""
+
+CUBE_COLUMNS = (
+    "resolution",
+    "h3_cell",
+    "lat",
+    "lon",
+    "point_count",
+    "trip_count",
+    "speed_mean",
+    *(column for column, _ in SPEED_PERCENTILES),
+    "gradient_mean",
+)
+
+INSERT_CUBE_SQL = f"""
+    insert into h3_cube ({", ".join(CUBE_COLUMNS)})
+    values ({", ".join("?" for _ in CUBE_COLUMNS)})
+"""
+
+CUBE_SIGNALS_SQL = """
+    select      h3_12
+    ,           vehicle_id
+    ,           trip_id
+    ,           speed
+    ,           gradient
+    from        signal
+    where       h3_12 <> 0
+"""
+
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    # First position of each run of equal keys in a sorted array
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _grouped_quantile(
+    values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float
+) -> np.ndarray:
+    """
+    Linearly interpolated quantile of each group of a grouped array whose
+    values are sorted within each group, with NaNs last.
+    """
+    position = starts + q * np.maximum(counts - 1, 0)
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    fraction = position - low
+    result = values[low] * (1.0 - fraction) + values[high] * fraction
+    return np.where(counts > 0, result, np.nan)
+
+
+def aggregate_cells(
+    cells: np.ndarray,
+    trips: np.ndarray,
+    speed: np.ndarray,
+    gradient: np.ndarray,
+    resolution: int,
+) -> dict:
+    """
+    Aggregates signals into the cells of one resolution with sort-based
+    group-bys.
+    :param cells: Resolution 12 cells of the signals
+    :param trips: Trip key of the signals
+    :param speed: Speeds, NaN where missing
+    :param gradient: Gradients, NaN where missing
+    :param resolution: Cube resolution
+    :return: Cube columns, as arrays
+    """
+    parents = vec_cell_to_parent(cells, resolution)
+
+    # Sorting on (cell, speed) groups the cells and sorts their speeds, with
+    # the missing ones last, for the percentiles
+    order = np.lexsort((speed, parents))
+    keys = parents[order]
+    starts = _group_starts(keys)
+    sorted_speed = speed[order]
+    valid_speed = ~np.isnan(sorted_speed)
+    speed_count = np.add.reduceat(valid_speed, starts)
+    speed_sum = np.add.reduceat(np.where(valid_speed, sorted_speed, 0.0), starts)
+
+    sorted_gradient = gradient[order]
+    valid_gradient = ~np.isnan(sorted_gradient)
+    gradient_count = np.add.reduceat(valid_gradient, starts)
+    gradient_sum = np.add.reduceat(
+        np.where(valid_gradient, sorted_gradient, 0.0), starts
+    )
+
+    # Distinct trips are the distinct (cell, trip) pairs of each cell
+    pair_order = np.lexsort((trips, parents))
+    pair_cells, pair_trips = parents[pair_order], trips[pair_order]
+    first_pair = np.r_[
+        True,
+        (pair_cells[1:] != pair_cells[:-1]) | (pair_trips[1:] != pair_trips[:-1]),
+    ]
+    trip_count = np.add.reduceat(first_pair, _group_starts(pair_cells))
+
+    columns = {
+        "h3_cell": keys[starts],
+        "point_count": np.diff(np.r_[starts, len(keys)]),
+        "trip_count": trip_count,
+        "speed_mean": _mean(speed_sum, speed_count),
+        "gradient_mean": _mean(gradient_sum, gradient_count),
+    }
+    for column, q in SPEED_PERCENTILES:
+        columns[column] = _grouped_quantile(sorted_speed, starts, speed_count, q)
+    return columns
+
+
+def _cube_rows(resolution: int, columns: dict) -> Iterator[Tuple]:
+    # tolist() yields Python scalars, which sqlite3 binds natively, and NaN
+    # binds as NULL
+    lists = {name: values.tolist() for name, values in columns.items()}
+    for i, cell in enumerate(lists["h3_cell"]):
+        lat, lon = h3.cell_to_latlng(cell)
+        yield (
+            resolution,
+            cell,
+            lat,
+            lon,
+            *(lists[column][i] for column in CUBE_COLUMNS[4:]),
+        )
+
+
+def load_cube_signals(db: BaseDb, batch_size: int = 500_000) -> Tuple[np.ndarray, ...]:
+    """
+    Reads the columns the cube aggregates, streamed in batches into compact
+    arrays: 24 bytes per signal.
+    :return: Cells, trip keys, speeds and gradients
+    """
+    cells, trips, speeds, gradients = [], [], [], []
+    for rows in db.query_batches(CUBE_SIGNALS_SQL, batch_size=batch_size):
+        h3_12, vehicle_id, trip_id, speed, gradient = zip(*rows)
+        cells.append(np.array(h3_12, dtype=np.int64))
+        trips.append(
+            (np.array(vehicle_id, dtype=np.int64) << 32)
+            | np.array(trip_id, dtype=np.int64)
+        )
+        speeds.append(np.array(speed, dtype=np.float32))
+        gradients.append(np.array(gradient, dtype=np.float32))
+    if not cells:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, np.float32), np.empty(0, np.float32)
+    return (
+        np.concatenate(cells),
+        np.concatenate(trips),
+        np.concatenate(speeds),
+        np.concatenate(gradients),
+    )
+
+
+def build_h3_cube(
+    db: BaseDb,
+    resolutions: Iterable[int] = CUBE_RESOLUTIONS,
+    report: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Rebuilds the `h3_cube` aggregate table: per H3 cell and resolution, the
+    point count, distinct trips, mean and percentile speeds and mean
+    gradient, rolled up from `signal.h3_12`.
+    :param db: Database with the signal table
+    :param resolutions: Cube resolutions, 12 or coarser
+    :param report: Optional callback with the resolution and its cell count
+    :return: Number of cube cells
+    """
+    cells, trips, speed, gradient = load_cube_signals(db)
+    # Sorting as float64 keeps the percentiles exact
+    speed, gradient = speed.astype(np.float64), gradient.astype(np.float64)
+
+    conn = db.connect()
+    try:
+        conn.executescript(CUBE_SCHEMA_SQL)
+        total = 0
+        with conn:
+            conn.execute("delete from h3_cube")
+            for resolution in resolutions:
+                if len(cells) == 0:
+                    break
+                columns = aggregate_cells(cells, trips, speed, gradient, resolution)
+                conn.executemany(INSERT_CUBE_SQL, _cube_rows(resolution, columns))
+                count = len(columns["h3_cell"])
+                total += count
+                if report is not None:
+                    report(resolution, count)
+    finally:
+        conn.close()
+    db.pool.recycle()
+    return total
@@ -0,0 +1,36 @@
+from typing import List
+
+from app.repositories import trip
+from tools.config import load_config
+from tools.database.sqlite.EvedDb import EvedDb
+from tools.database.sqlite.IndexManager import QueryPlanReport
+
+
+def check_indexes() -> List[QueryPlanReport]:
+    """
+    Audits the indexes used by the repository queries at startup.
+    Full scans are reported and, when `provision` is set in the
+    `[database.indexes]` section of the configuration, the missing
+    indexes are created.
+    :return: Query plan reports after any provisioning
+    """
+    settings = load_config().get("database", {}).get("indexes", {})
+    if not settings.get("audit", True):
+        return []
+
+    db = EvedDb()
+    manager = db.index_manager()
+    trip.register_queries(manager)
+
+    for spec in manager.missing_indexes():
+        print(f"Missing index {spec.name} on {spec.table} {spec.columns}")
+
+    if settings.get("provision", False):
+        for spec in manager.provision():
+            print(f"Created index {spec.name}")
+
+    reports = manager.audit()
+    for report in reports:
+        for detail in report.full_scans:
+            print(f"Query {report.name} performs a full scan: {detail}")
+    return reports
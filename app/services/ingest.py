@@ -0,0 +1,324 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlite3 import Connection
+from typing import Callable, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from app.geo.geomath import vec_haversine
+from app.geo.hexagons import vec_latlng_to_cells
+from app.services.summary import build_trip_summaries
+from tools.database.sqlite.EvedDb import EVED_INDEXES, EvedDb
+
+# eVED CSV headers and the signal columns they load into. Columns missing
+# from a release, like the elevation of the original VED files, load as NULL.
+SIGNAL_CSV_COLUMNS = {
+    "DayNum": "day_num",
+    "VehId": "vehicle_id",
+    "Trip": "trip_id",
+    "Timestamp(ms)": "time_stamp",
+    "Latitude[deg]": "latitude",
+    "Longitude[deg]": "longitude",
+    "Vehicle Speed[km/h]": "speed",
+    "Matchted Latitude[deg]": "match_latitude",
+    "Matched Longitude[deg]": "match_longitude",
+    "Elevation Raw[m]": "elevation",
+    "Elevation Smoothed[m]": "elevation_smooth",
+    "Gradient": "gradient",
+}
+
+VEHICLE_CSV_COLUMNS = {
+    "VehId": "vehicle_id",
+    "Vehicle Type": "vehicle_type",
+    "Vehicle Class": "vehicle_class",
+    "Engine Configuration & Displacement": "engine",
+    "Generalized_Weight": "weight",
+}
+
+SIGNAL_COLUMNS = [*SIGNAL_CSV_COLUMNS.values(), "h3_12"]
+
+VEHICLE_COLUMNS = list(VEHICLE_CSV_COLUMNS.values())
+
+# DayNum 1 is the first day of the VED collection period
+DAY_ZERO = datetime(2017, 11, 1) - timedelta(days=1)
+
+SCHEMA_SQL = """
+    create table if not exists vehicle (
+        vehicle_id      integer primary key,
+        vehicle_type    text,
+        vehicle_class   text,
+        engine          text,
+        weight          real
+    );
+    create table if not exists signal (
+        signal_id       integer primary key,
+        day_num         real,
+        vehicle_id      integer,
+        trip_id         integer,
+        time_stamp      integer,
+        latitude        real,
+        longitude       real,
+        speed           real,
+        match_latitude  real,
+        match_longitude real,
+        elevation       real,
+        elevation_smooth real,
+        gradient        real,
+        h3_12           integer
+    );
+    create table if not exists trajectory (
+        traj_id         integer primary key,
+        vehicle_id      integer,
+        trip_id         integer,
+        length_m        real,
+        duration_s      real,
+        dt_ini          text,
+        dt_end          text
+    );
+    create unique index if not exists uq_trajectory_vehicle_trip
+        on trajectory (vehicle_id, trip_id);
+    create table if not exists ingest_file (
+        file_name       text primary key,
+        row_count       integer,
+        seconds         real,
+        loaded_at       text
+    );
+"""
+
+INSERT_SIGNAL_SQL = f"""
+    insert into signal ({", ".join(SIGNAL_COLUMNS)})
+    values ({", ".join("?" for _ in SIGNAL_COLUMNS)})
+"""
+
+INSERT_VEHICLE_SQL = f"""
+    insert or replace into vehicle ({", ".join(VEHICLE_COLUMNS)})
+    values ({", ".join("?" for _ in VEHICLE_COLUMNS)})
+"""
+
+# Trips keep their traj_id across runs, other tables and the column store
+# refer to it
+UPSERT_TRAJECTORY_SQL = """
+    insert into trajectory (vehicle_id, trip_id, length_m, duration_s, dt_ini, dt_end)
+    values (?, ?, ?, ?, ?, ?)
+    on conflict (vehicle_id, trip_id) do update set
+        length_m = excluded.length_m,
+        duration_s = excluded.duration_s,
+        dt_ini = excluded.dt_ini,
+        dt_end = excluded.dt_end
+"""
+
+TRIP_POINTS_SQL = """
+    select      day_num
+    ,           time_stamp
+    ,           latitude
+    ,           longitude
+    from        signal
+    where       vehicle_id = ? and trip_id = ?
+    order by    time_stamp
+"""
+
+
+@dataclass
+class IngestProgress:
+    file_name: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.file_name}: {self.rows:,} rows in {self.seconds:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+class EvedIngest(object):
+    """
+    Streaming loader for eVED CSV releases.
+
+    CSV files are read in batches of `batch_size` rows and each file is
+    inserted in a single transaction, together with a marker row in
+    `ingest_file`. An interrupted load therefore leaves no partial file behind
+    and a new run skips the files already loaded. Secondary indexes are
+    dropped before loading and rebuilt at the end, followed by the trajectory
+    table and its summaries.
+    """
+
+    def __init__(
+        self,
+        db: EvedDb,
+        batch_size: int = 100_000,
+        report: Callable[[IngestProgress], None] = print,
+    ):
+        if batch_size < 1:
+            raise ValueError(f"EvedIngest - Invalid batch size: {batch_size}")
+        self.db = db
+        self.batch_size = batch_size
+        self.report = report
+
+    def connect(self) -> Connection:
+        """
+        Opens the writer connection with durability relaxed for bulk loading.
+        With `synchronous=OFF`, a process crash only loses the current file,
+        but an operating system crash or power loss may corrupt the database.
+        """
+        conn = self.db.connect()
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.executescript(SCHEMA_SQL)
+        return conn
+
+    def run(
+        self, signal_files: Iterable[str | Path], vehicle_file: str | Path | None = None
+    ) -> List[IngestProgress]:
+        """
+        Loads a release: vehicles, then the signal files not loaded yet, then
+        the indexes, the trajectory table and the trip summaries.
+        :param signal_files: eVED signal CSV files
+        :param vehicle_file: Optional vehicle static data CSV file
+        :return: Progress of the signal files loaded by this run
+        """
+        conn = self.connect()
+        try:
+            if vehicle_file is not None:
+                self.load_vehicles(conn, vehicle_file)
+
+            pending = [
+                Path(file_name)
+                for file_name in signal_files
+                if not self.is_loaded(conn, Path(file_name).name)
+            ]
+            if pending:
+                self.drop_indexes(conn)
+            loaded = [self.load_signals(conn, file_name) for file_name in pending]
+        finally:
+            conn.close()
+
+        self.db.index_manager().provision()
+        if loaded or not self.db.query_scalar("select count(*) from trajectory"):
+            self.build_trajectories()
+            build_trip_summaries(self.db)
+        return loaded
+
+    @staticmethod
+    def is_loaded(conn: Connection, file_name: str) -> bool:
+        sql = "select 1 from ingest_file where file_name = ?"
+        return conn.execute(sql, [file_name]).fetchone() is not None
+
+    @staticmethod
+    def drop_indexes(conn: Connection) -> None:
+        for spec in EVED_INDEXES:
+            conn.execute(f"drop index if exists {spec.name}")
+
+    def load_vehicles(self, conn: Connection, file_name: str | Path) -> int:
+        df = self._read_frame(pd.read_csv(file_name), VEHICLE_CSV_COLUMNS)
+        with conn:
+            conn.executemany(INSERT_VEHICLE_SQL, self._rows(df, VEHICLE_COLUMNS))
+        return len(df)
+
+    def load_signals(self, conn: Connection, file_name: str | Path) -> IngestProgress:
+        """
+        Loads one signal CSV file in a single transaction.
+        """
+        path = Path(file_name)
+        start = time.perf_counter()
+        rows = 0
+        with conn:
+            reader = pd.read_csv(path, chunksize=self.batch_size)
+            for chunk in reader:
+                df = self._read_frame(chunk, SIGNAL_CSV_COLUMNS)
+                df["h3_12"] = self._signal_cells(df)
+                conn.executemany(INSERT_SIGNAL_SQL, self._rows(df, SIGNAL_COLUMNS))
+                rows += len(df)
+                self.report(
+                    IngestProgress(path.name, rows, time.perf_counter() - start)
+                )
+
+            progress = IngestProgress(path.name, rows, time.perf_counter() - start)
+            conn.execute(
+                "insert into ingest_file values (?, ?, ?, datetime('now'))",
+                [path.name, rows, progress.seconds],
+            )
+        return progress
+
+    def build_trajectories(self) -> int:
+        """
+        Updates the trajectory table from the loaded signals, one trip at a
+        time through the signal index. Known trips keep their traj_id and new
+        trips are appended.
+        :return: Number of trajectories
+        """
+        conn = self.connect()
+        try:
+            trips = conn.execute(
+                "select distinct vehicle_id, trip_id from signal "
+                "order by vehicle_id, trip_id"
+            ).fetchall()
+            with conn:
+                conn.executemany(
+                    UPSERT_TRAJECTORY_SQL,
+                    (
+                        (
+                            vehicle_id,
+                            trip_id,
+                            *self._trip_metrics(conn, vehicle_id, trip_id),
+                        )
+                        for vehicle_id, trip_id in trips
+                    ),
+                )
+                conn.execute("analyze")
+        finally:
+            conn.close()
+        self.db.pool.recycle()
+        return len(trips)
+
+    @staticmethod
+    def _trip_metrics(conn: Connection, vehicle_id: int, trip_id: int) -> tuple:
+        points = np.array(
+            conn.execute(TRIP_POINTS_SQL, [vehicle_id, trip_id]).fetchall(),
+            dtype=np.float64,
+        )
+        day_num, time_stamp, lat, lon = points.T
+        length_m = float(np.nansum(vec_haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])))
+        duration_s = float(time_stamp[-1] - time_stamp[0]) / 1000.0
+        dt_ini = DAY_ZERO + timedelta(days=float(day_num[0]))
+        dt_end = dt_ini + timedelta(seconds=duration_s)
+        return length_m, duration_s, _timestamp(dt_ini), _timestamp(dt_end)
+
+    @staticmethod
+    def _read_frame(chunk: pd.DataFrame, columns: dict) -> pd.DataFrame:
+        chunk = chunk.rename(columns=lambda name: name.strip())
+        return pd.DataFrame(
+            {
+                target: chunk[source] if source in chunk else np.nan
+                for source, target in columns.items()
+            },
+            index=chunk.index,
+        )
+
+    @staticmethod
+    def _signal_cells(df: pd.DataFrame) -> np.ndarray:
+        # Index the map-matched location, or the raw fix where matching failed
+        lats = df["match_latitude"].to_numpy(dtype=np.float64)
+        lons = df["match_longitude"].to_numpy(dtype=np.float64)
+        unmatched = np.isnan(lats) | np.isnan(lons)
+        lats = np.where(unmatched, df["latitude"].to_numpy(dtype=np.float64), lats)
+        lons = np.where(unmatched, df["longitude"].to_numpy(dtype=np.float64), lons)
+        return vec_latlng_to_cells(lats, lons, 12)
+
+    @staticmethod
+    def _rows(df: pd.DataFrame, columns: List[str]) -> Iterable[tuple]:
+        # tolist() yields Python scalars, which sqlite3 binds natively, and NaN
+        # binds as NULL
+        return zip(*(df[column].to_numpy().tolist() for column in columns))
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
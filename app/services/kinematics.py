@@ -0,0 +1,103 @@
+from typing import Dict
+
+import numpy as np
+
+from app.geo.geomath import vec_bearings, vec_haversine
+from app.models.TripKinematics import TripKinematics
+from app.models.TripSignals import TripSignals
+
+GRAVITY = 9.80665  # m/s²
+
+# Rolling resistance coefficient of the energy proxy, for car tires on asphalt
+ROLLING_RESISTANCE = 0.01
+
+
+def _rate(values: np.ndarray, dt: np.ndarray) -> np.ndarray:
+    # Change per second from the previous value, NaN without a time step
+    rate = np.full(len(values), np.nan)
+    if len(values) > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate[1:] = np.where(dt[1:] > 0.0, np.diff(values) / dt[1:], np.nan)
+    return rate
+
+
+def compute_kinematics(signals: TripSignals) -> TripKinematics:
+    """
+    Computes the kinematics of a trip in one vectorized pass over its signals.
+    Distances and headings use the map-matched locations, or the raw fixes
+    where matching failed.
+
+    The energy proxy is the positive tractive work per kilogram of vehicle
+    between consecutive signals: the change in kinetic energy, plus the climb
+    implied by the gradient and the rolling resistance, without aerodynamic
+    drag, which depends on the vehicle.
+    :param signals: Signals of the trip, in time order
+    :return: Kinematics aligned with the signals
+    """
+    n = len(signals)
+    lats, lons = signals.locations()
+    distance = np.zeros(n)
+    dt = np.zeros(n)
+    heading_change = np.full(n, np.nan)
+    if n > 1:
+        distance[1:] = vec_haversine(lats[:-1], lons[:-1], lats[1:], lons[1:])
+        dt[1:] = np.diff(signals.timestamp) / 1000.0
+
+        # Bearings of zero-length steps are undefined
+        bearings = np.where(distance[1:] > 0.0, vec_bearings(lats, lons), np.nan)
+        heading_change[1:-1] = (np.diff(bearings) + 180.0) % 360.0 - 180.0
+
+    speed = signals.speed.astype(np.float64) / 3.6
+    acceleration = _rate(speed, dt)
+    jerk = _rate(acceleration, dt)
+
+    gradient = np.nan_to_num(signals.gradient.astype(np.float64))
+    grade_distance = distance * gradient
+
+    kinetic = np.zeros(n)
+    kinetic[1:] = np.diff(speed * speed) / 2.0
+    work = kinetic + GRAVITY * (grade_distance + ROLLING_RESISTANCE * distance)
+    energy = np.maximum(np.nan_to_num(work), 0.0)
+
+    return TripKinematics(
+        distance=distance,
+        dt=dt,
+        speed=speed,
+        acceleration=acceleration,
+        jerk=jerk,
+        heading_change=heading_change,
+        grade_distance=grade_distance,
+        energy=energy,
+    )
+
+
+def kinematics_stats(kinematics: TripKinematics) -> Dict[str, float]:
+    """
+    Whole-trip statistics of the kinematics: distance, duration, speeds,
+    acceleration extremes, jerk, turning, climb and energy.
+    """
+    if len(kinematics) == 0:
+        return {}
+
+    def nan_stat(function, values: np.ndarray) -> float:
+        known = values[~np.isnan(values)]
+        return float(function(known)) if len(known) else float("nan")
+
+    distance = float(kinematics.distance.sum())
+    duration = float(kinematics.dt.sum())
+    grade_distance = kinematics.grade_distance
+    energy = float(kinematics.energy.sum())
+    return {
+        "distance_km": distance / 1000.0,
+        "duration_min": duration / 60.0,
+        "mean_speed_kmh": 3.6 * distance / duration if duration > 0 else 0.0,
+        "max_speed_kmh": 3.6 * nan_stat(np.max, kinematics.speed),
+        "max_acceleration": nan_stat(np.max, kinematics.acceleration),
+        "max_deceleration": -nan_stat(np.min, kinematics.acceleration),
+        "jerk_rms": nan_stat(lambda v: np.sqrt(np.mean(v * v)), kinematics.jerk),
+        "turning_deg": nan_stat(lambda v: np.abs(v).sum(), kinematics.heading_change),
+        "climb_m": float(grade_distance[grade_distance > 0.0].sum()),
+        "descent_m": float(-grade_distance[grade_distance < 0.0].sum()),
+        "energy_kj_per_kg": energy / 1000.0,
+        "energy_j_per_kg_km": energy / distance * 1000.0 if distance > 0 else 0.0,
+    }
@@ -0,0 +1,82 @@
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+
+from app.geo.geomath import vec_cross_track
+from app.geo.neighbors import NearestNeighbors
+from app.models.TripNodes import TripNodes
+from app.models.TripSignals import TripSignals
+
+# Offset percentiles of the quality summary, as (name, percentile)
+OFFSET_PERCENTILES = (("p50", 50.0), ("p90", 90.0), ("p95", 95.0))
+
+
+@dataclass(eq=False)
+class MatchErrors:
+    """
+    Map-matching error of a trip: the offset of each GPS fix from the matched
+    path and its position along that path, with a summary of the offsets.
+    Instances compare by identity, as they hold arrays.
+    """
+
+    path: str
+    offset: np.ndarray
+    along: np.ndarray
+    segment: np.ndarray
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def offset_stats(offsets: np.ndarray) -> Dict[str, float]:
+    """
+    Count, mean, percentiles and maximum of the known offsets.
+    """
+    known = offsets[~np.isnan(offsets)]
+    if len(known) == 0:
+        return {"count": 0}
+    values = np.percentile(known, [q for _, q in OFFSET_PERCENTILES])
+    return {
+        "count": len(known),
+        "mean": float(known.mean()),
+        **{name: float(v) for (name, _), v in zip(OFFSET_PERCENTILES, values)},
+        "max": float(known.max()),
+    }
+
+
+def match_errors(
+    signals: TripSignals, nodes: TripNodes | None = None, path: str = "match"
+) -> MatchErrors:
+    """
+    Projects the GPS fixes of a trip onto its matched path.
+    :param signals: Signals of the trip
+    :param nodes: Map nodes of the trip, for the node path
+    :param path: "match" for the map-matched locations of the signals, or
+        "nodes" for the map node path
+    :return: Per-signal errors and their summary
+    """
+    match path:
+        case "match":
+            path_lats, path_lons = signals.match_lat, signals.match_lon
+        case "nodes" if nodes is not None:
+            path_lats, path_lons = nodes.lat, nodes.lon
+        case _:
+            raise ValueError(f"match_errors - Invalid path: {path}")
+    offset, along, segment = vec_cross_track(
+        signals.lat, signals.lon, path_lats, path_lons, signals.projection
+    )
+    return MatchErrors(path, offset, along, segment, offset_stats(offset))
+
+
+def snap_to_nodes(
+    signals: TripSignals, nodes: TripNodes, max_distance: float = np.inf
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Snaps the GPS fixes of a trip to their nearest map node.
+    :param signals: Signals of the trip
+    :param nodes: Map nodes of the trip
+    :param max_distance: Snapping radius in meters
+    :return: Distances in meters and node row indices, NaN and -1 for fixes
+        without a node within the radius
+    """
+    index = NearestNeighbors(nodes.lat, nodes.lon, projection=signals.projection)
+    return index.query(signals.lat, signals.lon, max_distance)
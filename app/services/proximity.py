@@ -0,0 +1,28 @@
+from typing import Dict
+
+import numpy as np
+
+from app.geo.neighbors import NearestNeighbors
+from app.models.TripSignals import TripSignals
+from app.services.matching import offset_stats
+
+
+def trip_proximity(
+    trip: TripSignals, other: TripSignals, within: float = 25.0
+) -> Dict[str, float]:
+    """
+    Measures how closely one trip follows another: the distance from each
+    location of the trip to the nearest location of the other. The maximum is
+    the directed Hausdorff distance.
+    :param trip: Signals of the trip
+    :param other: Signals of the trip it is compared with
+    :param within: Distance in meters under which a location is shared
+    :return: Distance statistics, see `offset_stats`, and the fraction of the
+        trip's locations within `within` meters of the other trip
+    """
+    index = NearestNeighbors(*other.locations(), projection=other.projection)
+    distances, _ = index.query(*trip.locations())
+    stats = offset_stats(distances)
+    known = distances[~np.isnan(distances)]
+    stats["shared"] = float((known <= within).mean()) if len(known) else 0.0
+    return stats
@@ -0,0 +1,155 @@
+from typing import Callable, List
+
+from tools.database.sqlite.BaseDb import BaseDb
+
+# R*Tree of trip segment boxes. The auxiliary traj_id column is read back
+# with each match, without a join. R*Tree coordinates are 32-bit floats,
+# rounded outwards, so lookups return a superset of the exact matches.
+RTREE_SCHEMA_SQL = """
+    create virtual table if not exists trip_rtree using rtree (
+        segment_id,
+        min_lat, max_lat,
+        min_lon, max_lon,
+        +traj_id integer
+    );
+"""
+
+# Boxes of `segment_size` consecutive points of a chunk of trips. Each point
+# also contributes its successor, so a box covers the edge into the next
+# segment. Boxes cover both the GPS and the map-matched locations.
+SEGMENT_BOX_SQL = """
+    with points as (
+        select      t.traj_id
+        ,           coalesce(s.latitude, s.match_latitude) as lat
+        ,           coalesce(s.longitude, s.match_longitude) as lon
+        ,           coalesce(s.match_latitude, s.latitude) as match_lat
+        ,           coalesce(s.match_longitude, s.longitude) as match_lon
+        ,           row_number() over w as seq
+        from        signal s
+        inner join  trajectory t
+                on  s.vehicle_id = t.vehicle_id
+                and s.trip_id = t.trip_id
+        where       t.traj_id in ({markers})
+        window      w as (partition by t.traj_id order by s.time_stamp)
+    ),
+    edges as (
+        select      traj_id
+        ,           (seq - 1) / ? as segment
+        ,           min(lat, match_lat) as min_lat
+        ,           max(lat, match_lat) as max_lat
+        ,           min(lon, match_lon) as min_lon
+        ,           max(lon, match_lon) as max_lon
+        ,           lead(min(lat, match_lat)) over n as next_min_lat
+        ,           lead(max(lat, match_lat)) over n as next_max_lat
+        ,           lead(min(lon, match_lon)) over n as next_min_lon
+        ,           lead(max(lon, match_lon)) over n as next_max_lon
+        from        points
+        where       lat is not null and lon is not null
+        window      n as (partition by traj_id order by seq)
+    )
+    insert into trip_rtree (min_lat, max_lat, min_lon, max_lon, traj_id)
+    select      min(min(min_lat, coalesce(next_min_lat, min_lat)))
+    ,           max(max(max_lat, coalesce(next_max_lat, max_lat)))
+    ,           min(min(min_lon, coalesce(next_min_lon, min_lon)))
+    ,           max(max(max_lon, coalesce(next_max_lon, max_lon)))
+    ,           traj_id
+    from        edges
+    group by    traj_id, segment
+"""
+
+
+def build_trip_rtree(
+    db: BaseDb,
+    segment_size: int = 64,
+    chunk_size: int = 200,
+    report: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Rebuilds the `trip_rtree` spatial index, with one box per segment of
+    `segment_size` points of each trip. Shorter segments make tighter boxes,
+    and so fewer false candidates, at the cost of a larger index.
+    :param db: Database with the signal and trajectory tables
+    :param segment_size: Points per segment box
+    :param chunk_size: Trips per statement
+    :param report: Optional callback with the done and total trip counts
+    :return: Number of segment boxes
+    """
+    if segment_size < 1:
+        raise ValueError(f"build_trip_rtree - Invalid segment size: {segment_size}")
+    conn = db.connect()
+    try:
+        conn.executescript(RTREE_SCHEMA_SQL)
+        traj_ids: List[int] = [
+            row[0]
+            for row in conn.execute("select traj_id from trajectory order by traj_id")
+        ]
+        with conn:
+            conn.execute("delete from trip_rtree")
+            for start in range(0, len(traj_ids), chunk_size):
+                chunk = traj_ids[start : start + chunk_size]
+                sql = SEGMENT_BOX_SQL.format(markers=", ".join("?" * len(chunk)))
+                conn.execute(sql, [*chunk, segment_size])
+                if report is not None:
+                    report(start + len(chunk), len(traj_ids))
+        count = conn.execute("select count(*) from trip_rtree").fetchone()[0]
+    finally:
+        conn.close()
+    db.pool.recycle()
+    return count
+
+
+# Distinct H3 cells of each trip, for area queries by cell range
+CELL_SCHEMA_SQL = """
+    create table if not exists trip_cell (
+        h3_12           integer not null,
+        traj_id         integer not null,
+        primary key (h3_12, traj_id)
+    ) without rowid;
+"""
+
+TRIP_CELL_SQL = """
+    insert or ignore into trip_cell (h3_12, traj_id)
+    select      s.h3_12
+    ,           t.traj_id
+    from        signal s
+    inner join  trajectory t
+            on  s.vehicle_id = t.vehicle_id
+            and s.trip_id = t.trip_id
+    where       t.traj_id in ({markers})
+    and         s.h3_12 <> 0
+"""
+
+
+def build_trip_cells(
+    db: BaseDb,
+    chunk_size: int = 200,
+    report: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Rebuilds the `trip_cell` table, which maps each resolution 12 H3 cell to
+    the trips with signals in it.
+    :param db: Database with the signal and trajectory tables
+    :param chunk_size: Trips per statement
+    :param report: Optional callback with the done and total trip counts
+    :return: Number of (cell, trip) pairs
+    """
+    conn = db.connect()
+    try:
+        conn.executescript(CELL_SCHEMA_SQL)
+        traj_ids: List[int] = [
+            row[0]
+            for row in conn.execute("select traj_id from trajectory order by traj_id")
+        ]
+        with conn:
+            conn.execute("delete from trip_cell")
+            for start in range(0, len(traj_ids), chunk_size):
+                chunk = traj_ids[start : start + chunk_size]
+                sql = TRIP_CELL_SQL.format(markers=", ".join("?" * len(chunk)))
+                conn.execute(sql, chunk)
+                if report is not None:
+                    report(start + len(chunk), len(traj_ids))
+        count = conn.execute("select count(*) from trip_cell").fetchone()[0]
+    finally:
+        conn.close()
+    db.pool.recycle()
+    return count
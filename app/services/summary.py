@@ -0,0 +1,109 @@
+from typing import Callable, List
+
+from tools.database.sqlite.BaseDb import BaseDb
+
+SUMMARY_SCHEMA_SQL = """
+    create table if not exists trip_summary (
+        traj_id         integer primary key,
+        min_lat         real,
+        min_lon         real,
+        max_lat         real,
+        max_lon         real,
+        point_count     integer,
+        node_count      integer,
+        min_speed       real,
+        max_speed       real,
+        avg_speed       real,
+        elevation_gain  real,
+        start_lat       real,
+        start_lon       real,
+        end_lat         real,
+        end_lon         real,
+        h3_count        integer
+    );
+"""
+
+# Aggregates the signals of a chunk of trips in one pass. The window gives
+# each point its predecessor's elevation and its position from both ends.
+SUMMARY_SQL = """
+    with points as (
+        select      t.traj_id
+        ,           s.latitude
+        ,           s.longitude
+        ,           coalesce(s.match_latitude, s.latitude) as match_latitude
+        ,           coalesce(s.match_longitude, s.longitude) as match_longitude
+        ,           s.speed
+        ,           s.h3_12
+        ,           coalesce(s.elevation_smooth, s.elevation)
+                    - lag(coalesce(s.elevation_smooth, s.elevation)) over w as climb
+        ,           row_number() over w as first_seq
+        ,           row_number() over (
+                        partition by t.traj_id order by s.time_stamp desc
+                    ) as last_seq
+        from        signal s
+        inner join  trajectory t
+                on  s.vehicle_id = t.vehicle_id
+                and s.trip_id = t.trip_id
+        where       t.traj_id in ({markers})
+        window      w as (partition by t.traj_id order by s.time_stamp)
+    )
+    insert or replace into trip_summary
+    select      p.traj_id
+    ,           min(min(p.latitude), min(p.match_latitude))
+    ,           min(min(p.longitude), min(p.match_longitude))
+    ,           max(max(p.latitude), max(p.match_latitude))
+    ,           max(max(p.longitude), max(p.match_longitude))
+    ,           count(*)
+    ,           {node_count}
+    ,           min(p.speed)
+    ,           max(p.speed)
+    ,           avg(p.speed)
+    ,           total(max(p.climb, 0.0))
+    ,           max(case when p.first_seq = 1 then p.latitude end)
+    ,           max(case when p.first_seq = 1 then p.longitude end)
+    ,           max(case when p.last_seq = 1 then p.latitude end)
+    ,           max(case when p.last_seq = 1 then p.longitude end)
+    ,           count(distinct nullif(p.h3_12, 0))
+    from        points p
+    group by    p.traj_id
+"""
+
+NODE_COUNT_SQL = "(select count(*) from node n where n.traj_id = p.traj_id)"
+
+
+def build_trip_summaries(
+    db: BaseDb,
+    chunk_size: int = 200,
+    report: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Rebuilds the `trip_summary` table, one chunk of trips per statement, so
+    the window sorts stay small and use the signal index.
+    :param db: Database with the signal and trajectory tables
+    :param chunk_size: Trips per statement
+    :param report: Optional callback with the done and total trip counts
+    :return: Number of summarized trips
+    """
+    has_nodes = db.table_exists("node")
+    conn = db.connect()
+    try:
+        conn.executescript(SUMMARY_SCHEMA_SQL)
+        traj_ids: List[int] = [
+            row[0]
+            for row in conn.execute("select traj_id from trajectory order by traj_id")
+        ]
+        with conn:
+            conn.execute("delete from trip_summary")
+            for start in range(0, len(traj_ids), chunk_size):
+                chunk = traj_ids[start : start + chunk_size]
+                sql = SUMMARY_SQL.format(
+                    markers=", ".join("?" * len(chunk)),
+                    node_count=NODE_COUNT_SQL if has_nodes else "0",
+                )
+                conn.execute(sql, chunk)
+                if report is not None:
+                    report(start + len(chunk), len(traj_ids))
+    finally:
+        conn.close()
+    db.pool.recycle()
+    return len(traj_ids)
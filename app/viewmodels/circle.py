@@ -1,10 +1,19 @@
-from app.geo.geomath import delta_location, num_haversine
-from app.viewmodels.shape import MapShape
+import math
+
+import numpy as np
+from shapely.geometry.polygon import Polygon
+
+from app.geo.geomath import circle_to_polygon, num_haversine, vec_haversine
+from app.geo.projection import LocalProjection
+from app.viewmodels.shape import MapArea
 from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
 from nicemvvm.observables.observability import Observable, notify_change
 
+# Vertices of the polygon that approximates a circle
+CIRCLE_VERTICES = 90
+
 
-class MapCircle(MapShape, Observable):
+class MapCircle(MapArea, Observable):
     def __init__(
         self,
         shape_id: str,
@@ -32,12 +41,19 @@ class MapCircle(MapShape, Observable):
         )
         self._center = center
         self._radius = radius
-        self._bounds: GeoBounds | None = None
 
     def contains(self, latlng: LatLng) -> bool:
         d = num_haversine(self._center.lat, self._center.lng, latlng.lat, latlng.lng)
         return d <= self._radius
 
+    def contains_many(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Tests an array of locations against the circle.
+        :return: Boolean array, true for the locations inside the circle
+        """
+        center = self._center
+        return vec_haversine(center.lat, center.lng, lats, lons) <= self._radius
+
     @property
     def center(self) -> LatLng:
         return self._center
@@ -56,17 +72,26 @@ class MapCircle(MapShape, Observable):
     def radius(self, value: float):
         self._radius = value
 
-    def get_bounds(self) -> GeoBounds:
-        if not self._bounds:
-            lat = self._center.lat
-            lng = self._center.lng
-            radius = self._radius
-            n = delta_location(lat, lng, 0.0, radius)
-            e = delta_location(lat, lng, 90.0, radius)
-            s = delta_location(lat, lng, 180.0, radius)
-            w = delta_location(lat, lng, 270.0, radius)
-            self._bounds = GeoBounds(LatLng(s[0], w[1]), LatLng(n[0], e[1]))
-        return self._bounds
+    def _make_vertices(self) -> np.ndarray:
+        center = self._center
+        return circle_to_polygon(center.lat, center.lng, self._radius, CIRCLE_VERTICES)
+
+    def _make_geometry(self) -> Polygon:
+        return Polygon(self.vertices[:, ::-1])
+
+    def _make_area(self) -> float:
+        return math.pi * self._radius**2
+
+    def _make_projection(self) -> LocalProjection:
+        return LocalProjection(self._center.lat, self._center.lng)
+
+    def _make_bounds(self) -> GeoBounds:
+        radius = self._radius
+        lats, lngs = self.projection.inverse([-radius, radius], [-radius, radius])
+        return GeoBounds(
+            LatLng(float(lats[0]), float(lngs[0])),
+            LatLng(float(lats[1]), float(lngs[1])),
+        )
 
     def to_dict(self):
         return {
@@ -1,20 +1,83 @@
 import uuid
 from functools import reduce
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 import h3.api.numpy_int as h3
+import numpy as np
+import pandas as pd
 
 from app.converters.general import NotNoneValueConverter
+from app.geo.geomath import zoom_tolerance
+from app.models.TripCatalog import TripCatalog
 from app.models.TripModel import Trip, TripModel
+from app.models.TripSummary import TripSummary
+from app.repositories.cube import load_cube_cells_async
+from app.repositories.trip import trips_in_bounds_async
+from app.services.area import trips_crossing
+from app.services.cube import CUBE_RESOLUTIONS
+from app.services.kinematics import kinematics_stats
+from app.services.matching import MatchErrors, match_errors
 from app.viewmodels.circle import MapCircle
 from app.viewmodels.polygon import MapPolygon
 from app.viewmodels.polyline import MapPolyline
-from app.viewmodels.shape import MapShape
-from nicemvvm.command import Command, RelayCommand
+from app.viewmodels.shape import MapArea
+from app.viewmodels.shape_index import ShapeIndex, TraceIndex
+from nicemvvm.command import AsyncRelayCommand, Command, RelayCommand
 from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
 from nicemvvm.observables.collections import ObservableList
 from nicemvvm.observables.observability import Observable, Observer, notify_change
 from nicemvvm.ResourceLocator import ResourceLocator
+from nicemvvm.tasks import ManagedTasks
+
+# Distance from a trace, in screen pixels, within which a click selects it
+TRACE_HIT_PIXELS = 8.0
+
+# Largest edge of the density layer cells, in screen pixels
+DENSITY_CELL_PIXELS = 8.0
+
+
+def bounds_from_arrays(lats: np.ndarray, lons: np.ndarray) -> GeoBounds | None:
+    if len(lats) == 0:
+        return None
+    return GeoBounds(
+        LatLng(float(np.nanmin(lats)), float(np.nanmin(lons))),
+        LatLng(float(np.nanmax(lats)), float(np.nanmax(lons))),
+    )
+
+
+def resolution_for_zoom(zoom: float, lat: float = 0.0) -> int:
+    """
+    H3 resolution of the density layer at a map zoom level: the coarsest one
+    whose cell edges are at most `DENSITY_CELL_PIXELS` wide. Each zoom step
+    doubles the scale but each resolution step shrinks cells about 2.6 times,
+    so the resolution rises by one every one or two zoom levels.
+    :param zoom: Web Mercator zoom level
+    :param lat: Latitude of the view in degrees
+    :return: Resolution of the H3 cube
+    """
+    max_edge = zoom_tolerance(zoom, lat, pixels=DENSITY_CELL_PIXELS)
+    for resolution in CUBE_RESOLUTIONS:
+        if h3.average_hexagon_edge_length(resolution, unit="m") <= max_edge:
+            return resolution
+    return CUBE_RESOLUTIONS[-1]
+
+
+def padded(bounds: GeoBounds, fraction: float = 0.1) -> GeoBounds:
+    d_lat = (bounds.ne.lat - bounds.sw.lat) * fraction
+    d_lng = (bounds.ne.lng - bounds.sw.lng) * fraction
+    return GeoBounds(
+        LatLng(bounds.sw.lat - d_lat, bounds.sw.lng - d_lng),
+        LatLng(bounds.ne.lat + d_lat, bounds.ne.lng + d_lng),
+    )
+
+
+def summary_bounds(summary: TripSummary | None) -> GeoBounds | None:
+    if summary is None:
+        return None
+    return GeoBounds(
+        LatLng(summary.min_lat, summary.min_lon),
+        LatLng(summary.max_lat, summary.max_lon),
+    )
 
 
 class MapViewModel(Observable):
@@ -24,7 +87,7 @@ class MapViewModel(Observable):
         self._center: Tuple[float, float] = (0.0, 0.0)
         self._locator = ResourceLocator()
         self._trip_model: TripModel = self._locator["TripModel"]
-        self._trips: ObservableList[Trip] = ObservableList(self._trip_model.load())
+        self._trip_catalog = TripCatalog(self._trip_model)
         self._selected_trip: Trip | None = None
         self._selected_polyline: MapPolyline | None = None
         self._polylines: ObservableList[MapPolyline] = ObservableList()
@@ -32,10 +95,20 @@ class MapViewModel(Observable):
         self._polygons: ObservableList[MapPolygon] = ObservableList()
         self._selected_circle: MapCircle | None = None
         self._circles: ObservableList[MapCircle] = ObservableList()
-        self._selected_shape: MapShape | None = None
+        # Hit tests of drawn shapes, polygons first
+        self._shape_index = ShapeIndex(self._polygons, self._circles)
+        self._trace_index = TraceIndex(self._polylines)
+        self._selected_shape: MapArea | None = None
         self._bounds: GeoBounds | None = None
         self._content_bounds: GeoBounds | None = None
         self._context_location: LatLng | None = None
+        self._view_bounds: GeoBounds | None = None
+        self._trips_in_view: List[Trip] = []
+        self._area_shape: MapArea | None = None
+        self._density_visible: bool = False
+        self._density_cells: pd.DataFrame | None = None
+        self._match_errors: MatchErrors | None = None
+        self._trip_stats: Dict[str, float] | None = None
 
         self._polyline_map: dict[str, MapPolyline] = dict()
         self._polygon_map: dict[str, MapPolygon] = dict()
@@ -79,14 +152,17 @@ class MapViewModel(Observable):
         self._trace_cache[cache_key] = result
         return result
 
-    def find_shape(self, pt: LatLng) -> MapShape | None:
-        for polygon in self.polygons:
-            if polygon.contains(pt):
-                return polygon
-        for circle in self.circles:
-            if circle.contains(pt):
-                return circle
-        return None
+    def find_shape(self, pt: LatLng) -> MapArea | None:
+        return self._shape_index.find(pt)
+
+    def find_trace(self, pt: LatLng) -> MapPolyline | None:
+        """
+        Finds the trace drawn closest to a location, within a few screen
+        pixels at the current zoom.
+        """
+        tolerance = zoom_tolerance(self._zoom, pt.lat, pixels=TRACE_HIT_PIXELS)
+        trace, _ = self._trace_index.nearest(pt, tolerance)
+        return trace
 
     def select_polyline(self, layer_id: str) -> None:
         if layer_id in self._polyline_map:
@@ -117,6 +193,10 @@ class MapViewModel(Observable):
                 elif isinstance(shape, MapCircle):
                     self.selected_circle = shape
                     self.selected_polygon = None
+            else:
+                trace = self.find_trace(pt)
+                if trace is not None:
+                    self.select_polyline(trace.shape_id)
 
     def show_circle(self, circle: Dict) -> None:
         options = circle["options"]
@@ -161,17 +241,25 @@ class MapViewModel(Observable):
             match trace_name:
                 case "gps":
                     color = "#800000"  # Dark Red
-                    locations = [LatLng(p.lat, p.lon) for p in trip.signals]
+                    lats, lons = trip.signals.lat, trip.signals.lon
                 case "match":
                     color = "#000080"  # Dark Purple / Indigo
-                    locations = [LatLng(p.match_lat, p.match_lon) for p in trip.signals]
+                    lats, lons = trip.signals.match_lat, trip.signals.match_lon
                 case "nodes":
                     color = "#004225"  # Dark Green
-                    locations = [LatLng(n.lat, n.lon) for n in trip.nodes]
+                    lats, lons = trip.nodes.lat, trip.nodes.lon
                 case _:
-                    locations = []
+                    lats = lons = np.empty(0, dtype=np.float64)
                     color = "#000000"
 
+            locations = [
+                LatLng(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())
+            ]
+            # The summary box covers the GPS and map-matched locations only
+            bounds = projection = None
+            if trace_name in ("gps", "match"):
+                bounds = summary_bounds(trip.summary)
+                projection = trip.signals.projection
             poly = MapPolyline(
                 shape_id=f"{trip.traj_id}_{trace_name}",
                 traj_id=trip.traj_id,
@@ -182,11 +270,142 @@ class MapViewModel(Observable):
                 trace_name=trace_name,
                 locations=locations,
                 km=trip.km,
+                bounds=bounds or bounds_from_arrays(lats, lons),
+                projection=projection,
             )
             self._polylines.append(poly)
             self._polyline_map[poly.shape_id] = poly
             # self.selected_polyline = poly
-            self.bounds = poly.get_bounds()
+            if len(locations) > 0:
+                self.bounds = poly.get_bounds()
+
+    async def fit_trip(self, trip: Trip | None) -> None:
+        """
+        Fits the map to a trip, from its summary when available, so that no
+        signals are read.
+        """
+        if trip is None:
+            return
+        bounds = summary_bounds(trip.summary)
+        if bounds is None:
+            await trip.load_signals_async()
+            bounds = bounds_from_arrays(trip.signals.lat, trip.signals.lon)
+        if bounds is not None:
+            self.bounds = bounds
+
+    @property
+    def fit_trip_command(self) -> Command:
+        return AsyncRelayCommand(lambda _: self.fit_trip(self.selected_trip))
+
+    async def find_trips_in_view(self, bounds: GeoBounds) -> None:
+        """
+        Lists the candidate trips of a map view from the spatial index. The
+        result is dropped when the view has moved on while it was loading.
+        """
+        raw_trips = await trips_in_bounds_async(bounds)
+        if bounds is self._view_bounds:
+            self.trips_in_view = self._trip_model.add_frame(raw_trips)
+
+    async def update_density(self, bounds: GeoBounds | None) -> None:
+        """
+        Loads the density cells of a map view, at the resolution of the
+        current zoom, from the H3 aggregate cube.
+        """
+        if bounds is None or not self._density_visible:
+            return
+        lat = (bounds.sw.lat + bounds.ne.lat) / 2.0
+        cells = await load_cube_cells_async(
+            resolution_for_zoom(self._zoom, lat), padded(bounds)
+        )
+        if bounds is self._view_bounds and self._density_visible:
+            self.density_cells = cells
+
+    def _set_view_bounds(self, bounds: GeoBounds) -> None:
+        self.view_bounds = bounds
+        ManagedTasks().create(self.find_trips_in_view(bounds))
+        ManagedTasks().create(self.update_density(bounds))
+
+    def _toggle_density(self) -> None:
+        self._density_visible = not self._density_visible
+        if self._density_visible:
+            ManagedTasks().create(self.update_density(self._view_bounds))
+        else:
+            self.density_cells = None
+
+    @property
+    def toggle_density_command(self) -> Command:
+        return RelayCommand(lambda _: self._toggle_density())
+
+    @property
+    def view_bounds_command(self) -> Command:
+        return RelayCommand(self._set_view_bounds)
+
+    async def find_trips_crossing(self, shape: MapArea | None) -> None:
+        """
+        Restricts the trip grid to the trips crossing a drawn shape. Trips are
+        added to the grid in batches, as the area query confirms them.
+        """
+        if shape is None:
+            return
+        self.area_shape = shape
+        found: List[int] = []
+        self._trip_catalog.restrict(found)
+        async for traj_ids in trips_crossing(shape):
+            if self._area_shape is not shape:
+                return
+            found.extend(traj_ids)
+            self._trip_catalog.restrict(found)
+
+    @property
+    def find_trips_crossing_command(self) -> Command:
+        return AsyncRelayCommand(
+            lambda _: self.find_trips_crossing(self.selected_shape)
+        )
+
+    async def review_match(self, trip: Trip | None, path: str = "match") -> None:
+        """
+        Measures how far the GPS fixes of a trip lie from its matched path.
+        The result is dropped when another trip was selected meanwhile.
+        """
+        if trip is None:
+            return
+        await trip.load_signals_async()
+        nodes = None
+        if path == "nodes":
+            await trip.load_nodes_async()
+            nodes = trip.nodes
+        errors = match_errors(trip.signals, nodes, path)
+        if trip is self._selected_trip:
+            self.match_errors = errors
+
+    @property
+    def review_match_command(self) -> Command:
+        return AsyncRelayCommand(lambda _: self.review_match(self.selected_trip))
+
+    async def show_trip_stats(self, trip: Trip | None) -> None:
+        """
+        Shows the kinematics statistics of a trip, computed once per trip and
+        kept in the trip data cache. The result is dropped when another trip
+        was selected meanwhile.
+        """
+        if trip is None:
+            return
+        await trip.load_kinematics_async()
+        stats = kinematics_stats(trip.kinematics)
+        if trip is self._selected_trip:
+            self.trip_stats = stats
+
+    @property
+    def trip_stats_command(self) -> Command:
+        return AsyncRelayCommand(lambda _: self.show_trip_stats(self.selected_trip))
+
+    def _show_all_trips(self) -> None:
+        self.area_shape = None
+        self._trip_catalog.restrict(None)
+
+    @property
+    def show_all_trips_command(self) -> Command:
+        return RelayCommand(lambda _: self._show_all_trips())
 
     def _fit_content(self) -> Any:
         def merge(a: GeoBounds, b: GeoBounds) -> GeoBounds:
@@ -359,8 +578,60 @@ class MapViewModel(Observable):
         self.geo_select_shape(value)
 
     @property
-    def trips(self) -> ObservableList[Trip]:
-        return self._trips
+    def view_bounds(self) -> GeoBounds | None:
+        return self._view_bounds
+
+    @view_bounds.setter
+    @notify_change
+    def view_bounds(self, value: GeoBounds | None) -> None:
+        self._view_bounds = value
+
+    @property
+    def trips_in_view(self) -> List[Trip]:
+        return self._trips_in_view
+
+    @trips_in_view.setter
+    @notify_change
+    def trips_in_view(self, trips: List[Trip]) -> None:
+        self._trips_in_view = trips
+
+    @property
+    def density_cells(self) -> pd.DataFrame | None:
+        """
+        Aggregate cells shown by the density layer, None when it is hidden.
+        """
+        return self._density_cells
+
+    @density_cells.setter
+    def density_cells(self, cells: pd.DataFrame | None) -> None:
+        # Compared by identity, as data frames have no truth value
+        old_cells = self._density_cells
+        if cells is old_cells:
+            return
+        self.notify(
+            action="property_changing",
+            name="density_cells",
+            new_value=cells,
+            old_value=old_cells,
+        )
+        self._density_cells = cells
+        self.notify(action="property_changed", name="density_cells", value=cells)
+
+    @property
+    def area_shape(self) -> MapArea | None:
+        """
+        Shape whose crossing trips the trip grid is restricted to.
+        """
+        return self._area_shape
+
+    @area_shape.setter
+    @notify_change
+    def area_shape(self, shape: MapArea | None) -> None:
+        self._area_shape = shape
+
+    @property
+    def trip_catalog(self) -> TripCatalog:
+        return self._trip_catalog
 
     @property
     def selected_trip(self) -> Trip | None:
@@ -370,6 +641,32 @@ class MapViewModel(Observable):
     @notify_change
     def selected_trip(self, trip: Trip | None) -> None:
         self._selected_trip = trip
+        self.match_errors = None
+        self.trip_stats = None
+
+    @property
+    def trip_stats(self) -> Dict[str, float] | None:
+        """
+        Kinematics statistics of the selected trip, see `kinematics_stats`.
+        """
+        return self._trip_stats
+
+    @trip_stats.setter
+    @notify_change
+    def trip_stats(self, stats: Dict[str, float] | None) -> None:
+        self._trip_stats = stats
+
+    @property
+    def match_errors(self) -> MatchErrors | None:
+        """
+        Map-matching errors of the selected trip, once reviewed.
+        """
+        return self._match_errors
+
+    @match_errors.setter
+    @notify_change
+    def match_errors(self, errors: MatchErrors | None) -> None:
+        self._match_errors = errors
 
     @property
     def polylines(self) -> ObservableList[MapPolyline]:
@@ -419,12 +716,12 @@ class MapViewModel(Observable):
             circle.dash_array = "8 8"
 
     @property
-    def selected_shape(self) -> MapShape | None:
+    def selected_shape(self) -> MapArea | None:
         return self._selected_shape
 
     @selected_shape.setter
     @notify_change
-    def selected_shape(self, shape: MapShape | None):
+    def selected_shape(self, shape: MapArea | None):
         self._selected_shape = shape
 
     @property
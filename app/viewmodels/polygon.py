@@ -1,14 +1,16 @@
 from typing import List
 
-from shapely.geometry.point import Point
+import numpy as np
+import shapely
 from shapely.geometry.polygon import Polygon
 
-from app.viewmodels.shape import MapShape
-from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
+from app.geo.geomath import polygon_area
+from app.viewmodels.shape import MapArea
+from nicemvvm.controls.leaflet.types import LatLng
 from nicemvvm.observables.observability import notify_change
 
 
-class MapPolygon(MapShape):
+class MapPolygon(MapArea):
     def __init__(
         self,
         shape_id: str,
@@ -34,12 +36,16 @@ class MapPolygon(MapShape):
             dash_offset=dash_offset,
         )
         self._locations = locations
-        self._bounds: GeoBounds | None = None
 
     def contains(self, latlng: LatLng) -> bool:
-        point = Point(latlng.lng, latlng.lat)
-        polygon = Polygon([ll.lng, ll.lat] for ll in self._locations)
-        return polygon.contains(point)
+        return bool(shapely.contains_xy(self.geometry, latlng.lng, latlng.lat))
+
+    def contains_many(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Tests an array of locations against the polygon.
+        :return: Boolean array, true for the locations inside the polygon
+        """
+        return shapely.contains_xy(self.geometry, lons, lats)
 
     @property
     def locations(self) -> List[LatLng]:
@@ -50,19 +56,17 @@ class MapPolygon(MapShape):
     def locations(self, value: List[LatLng]):
         self._locations = value
 
-    def get_bounds(self) -> GeoBounds:
-        if not self._bounds:
-            self._bounds = GeoBounds(
-                LatLng(
-                    min((p.lat for p in self._locations)),
-                    min((p.lng for p in self._locations)),
-                ),
-                LatLng(
-                    max((p.lat for p in self._locations)),
-                    max((p.lng for p in self._locations)),
-                ),
-            )
-        return self._bounds
+    def _make_vertices(self) -> np.ndarray:
+        return np.array(
+            [(ll.lat, ll.lng) for ll in self._locations], dtype=np.float64
+        ).reshape(-1, 2)
+
+    def _make_geometry(self) -> Polygon:
+        return Polygon(self.vertices[:, ::-1])
+
+    def _make_area(self) -> float:
+        vertices = self.vertices
+        return polygon_area(vertices[:, 0], vertices[:, 1], self.projection)
 
     def to_dict(self):
         return {
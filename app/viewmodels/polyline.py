@@ -1,7 +1,16 @@
-from typing import List
+from typing import Dict, List
 
+import numpy as np
+from shapely.geometry.linestring import LineString
+
+from app.geo.geomath import (
+    encode_polyline,
+    simplification_importance,
+    zoom_tolerance,
+)
+from app.geo.projection import LocalProjection
 from app.viewmodels.shape import MapShape
-from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
+from nicemvvm.controls.leaflet.types import EncodedPath, GeoBounds, LatLng
 from nicemvvm.observables.observability import notify_change
 
 
@@ -19,6 +28,8 @@ class MapPolyline(MapShape):
         locations: List[LatLng],
         dash_array: str = "",
         dash_offset: str = "",
+        bounds: GeoBounds | None = None,
+        projection: LocalProjection | None = None,
     ):
         super().__init__(
             shape_id,
@@ -36,7 +47,10 @@ class MapPolyline(MapShape):
         self._km = km
         self._trace_name = trace_name
         self._locations = locations
-        self._bounds: GeoBounds | None = None
+        if bounds is not None:
+            self._geometry_cache["bounds"] = bounds
+        if projection is not None:
+            self._geometry_cache["projection"] = projection
 
     @property
     def traj_id(self) -> int:
@@ -68,19 +82,58 @@ class MapPolyline(MapShape):
     def locations(self, value: List[LatLng]):
         self._locations = value
 
-    def get_bounds(self) -> GeoBounds:
-        if not self._bounds:
-            self._bounds = GeoBounds(
-                LatLng(
-                    min((p.lat for p in self._locations)),
-                    min((p.lng for p in self._locations)),
-                ),
-                LatLng(
-                    max((p.lat for p in self._locations)),
-                    max((p.lng for p in self._locations)),
-                ),
-            )
-        return self._bounds
+    def _make_vertices(self) -> np.ndarray:
+        return np.array(
+            [(p.lat, p.lng) for p in self._locations], dtype=np.float64
+        ).reshape(-1, 2)
+
+    def _make_geometry(self) -> LineString:
+        return LineString(self.vertices[:, ::-1])
+
+    def _make_importance(self) -> np.ndarray:
+        vertices = self.vertices
+        return simplification_importance(
+            vertices[:, 0], vertices[:, 1], self.projection
+        )
+
+    @property
+    def importance(self) -> np.ndarray:
+        """
+        Simplification importance of each location in meters, computed once
+        per trace, see `simplification_importance`.
+        """
+        return self._cached("importance", self._make_importance)
+
+    def _kept_at_zoom(self, zoom: int) -> np.ndarray | None:
+        # Indices of the locations drawn at a zoom level, None for all of them
+        if len(self._locations) < 3:
+            return None
+        bounds = self.get_bounds()
+        tolerance = zoom_tolerance(zoom, (bounds.sw.lat + bounds.ne.lat) / 2.0)
+        keep = np.flatnonzero(self.importance >= tolerance)
+        return None if len(keep) == len(self._locations) else keep
+
+    def locations_at_zoom(self, zoom: int) -> List[LatLng]:
+        """
+        Locations simplified to half a screen pixel at a map zoom level, so
+        that the size of a trace follows the screen, not the sampling rate.
+        """
+        keep = self._kept_at_zoom(zoom)
+        if keep is None:
+            return self._locations
+        return [self._locations[i] for i in keep.tolist()]
+
+    def encoded_at_zoom(self, zoom: int) -> EncodedPath:
+        """
+        Locations at a zoom level, see `locations_at_zoom`, in the encoded
+        polyline format. Encoded paths are cached per zoom level.
+        """
+        paths: Dict[int, EncodedPath] = self._cached("encoded", dict)
+        if zoom not in paths:
+            keep = self._kept_at_zoom(zoom)
+            points = self.vertices if keep is None else self.vertices[keep]
+            paths[zoom] = EncodedPath(encode_polyline(points[:, 0], points[:, 1]), 6)
+        return paths[zoom]
 
     def to_dict(self):
         return {
@@ -1,7 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Mapping
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+from app.geo.projection import LocalProjection, projection_for
+from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
 from nicemvvm.observables.observability import Observable, notify_change
 
+# Shape properties that move or resize a shape
+GEOMETRY_PROPERTIES = frozenset(("locations", "center", "radius"))
+
+
+class MapShape(Observable, ABC):
+    """
+    Base of the shapes drawn on the map. Derived geometry, like the vertex
+    array, bounds, planar frame, prepared shapely geometry and area, is built
+    on first use and cached until a geometry property changes, so hit tests,
+    fits and area queries share one copy per version of the shape.
+    """
 
-class MapShape(Observable):
     def __init__(
         self,
         shape_id: str,
@@ -24,6 +43,74 @@ class MapShape(Observable):
         self._fill = fill
         self._fill_color = fill_color
         self._fill_opacity = fill_opacity
+        self._geometry_cache: Dict[str, Any] = {}
+        self.register(self._on_geometry_change)
+
+    def _on_geometry_change(self, action: str, args: Mapping[str, Any]) -> None:
+        if action == "property_changed" and args["name"] in GEOMETRY_PROPERTIES:
+            self._geometry_cache.clear()
+
+    def _cached(self, key: str, build: Callable[[], Any]) -> Any:
+        if key not in self._geometry_cache:
+            self._geometry_cache[key] = build()
+        return self._geometry_cache[key]
+
+    @property
+    def vertices(self) -> np.ndarray:
+        """
+        Vertices as an (n, 2) array of latitudes and longitudes.
+        """
+        return self._cached("vertices", self._make_vertices)
+
+    @property
+    def geometry(self) -> BaseGeometry:
+        """
+        Prepared shapely geometry in (lng, lat) coordinates.
+        """
+        return self._cached("geometry", self._make_prepared_geometry)
+
+    @property
+    def projection(self) -> LocalProjection:
+        """
+        Local planar frame of the shape, for metric computations on it.
+        """
+        return self._cached("projection", self._make_projection)
+
+    @property
+    def area(self) -> float:
+        """
+        Area in square meters.
+        """
+        return self._cached("area", self._make_area)
+
+    def get_bounds(self) -> GeoBounds:
+        return self._cached("bounds", self._make_bounds)
+
+    @abstractmethod
+    def _make_vertices(self) -> np.ndarray: ...
+
+    @abstractmethod
+    def _make_geometry(self) -> BaseGeometry: ...
+
+    def _make_prepared_geometry(self) -> BaseGeometry:
+        geometry = self._make_geometry()
+        shapely.prepare(geometry)
+        return geometry
+
+    def _make_projection(self) -> LocalProjection:
+        vertices = self.vertices
+        return projection_for(vertices[:, 0], vertices[:, 1])
+
+    def _make_area(self) -> float:
+        return 0.0
+
+    def _make_bounds(self) -> GeoBounds:
+        vertices = self.vertices
+        low, high = vertices.min(axis=0), vertices.max(axis=0)
+        return GeoBounds(
+            LatLng(float(low[0]), float(low[1])),
+            LatLng(float(high[0]), float(high[1])),
+        )
 
     @property
     def shape_id(self) -> str:
@@ -100,3 +187,19 @@ class MapShape(Observable):
     @notify_change
     def dash_offset(self, value: str):
         self._dash_offset = value
+
+
+class MapArea(MapShape):
+    """
+    Base of the shapes that enclose an area, which trips can be tested against.
+    """
+
+    @abstractmethod
+    def contains(self, latlng: LatLng) -> bool: ...
+
+    @abstractmethod
+    def contains_many(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Tests an array of locations against the shape.
+        :return: Boolean array, true for the locations inside the shape
+        """
@@ -0,0 +1,167 @@
+from abc import ABC, abstractmethod
+from typing import Any, Generic, List, Mapping, Tuple, TypeVar
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from app.geo.projection import LocalProjection, projection_for
+from app.viewmodels.polyline import MapPolyline
+from app.viewmodels.shape import GEOMETRY_PROPERTIES, MapArea, MapShape
+from nicemvvm.controls.leaflet.types import LatLng
+from nicemvvm.observables.collections import ObservableList
+
+S = TypeVar("S", bound=MapShape)
+
+
+class CollectionIndex(ABC, Generic[S]):
+    """
+    Base of the spatial indexes over collections of drawn shapes.
+
+    Membership follows the notifications of the shape collections, and the
+    shapes' own geometry changes. Changes only mark the index stale, and the
+    next query rebuilds it in bulk.
+    """
+
+    def __init__(self, *collections: ObservableList[S]):
+        self._collections = collections
+        self._shapes: List[S] = []
+        self._stale = True
+        for collection in collections:
+            collection.register(self._on_collection_change)
+            for shape in collection:
+                shape.register(self._on_shape_change)
+
+    def _on_collection_change(self, action: str, args: Mapping[str, Any]) -> None:
+        added: List[S] = []
+        removed: List[S] = []
+        match action:
+            case "append" | "insert":
+                added.append(args["value"])
+            case "extend" | "iadd":
+                added.extend(args["values"])
+            case "remove" | "pop" | "delete_item":
+                removed.append(args["value"])
+            case "delete_slice":
+                removed.extend(args["removed_items"])
+            case "clear":
+                removed.extend(args["old_items"])
+            case "set_item":
+                removed.append(args["old_value"])
+                added.append(args["new_value"])
+            case "set_slice":
+                removed.extend(args["old_values"])
+                added.extend(args["new_values"])
+            case _:
+                return
+        for shape in removed:
+            shape.unregister(self._on_shape_change)
+        for shape in added:
+            shape.register(self._on_shape_change)
+        self._stale = True
+
+    def _on_shape_change(self, action: str, args: Mapping[str, Any]) -> None:
+        if action == "property_changed" and args["name"] in GEOMETRY_PROPERTIES:
+            self._stale = True
+
+    def _refresh(self) -> None:
+        if self._stale:
+            self._shapes = [shape for shapes in self._collections for shape in shapes]
+            self._build()
+            self._stale = False
+
+    @abstractmethod
+    def _build(self) -> None: ...
+
+
+class ShapeIndex(CollectionIndex[MapArea]):
+    """
+    Spatial index of drawn areas for point hit tests: an STRtree over the
+    shape bounds, with the exact test only on the shapes whose bounds hold
+    the point. An STRtree cannot be modified, so it is rebuilt whole.
+    Collections earlier in the list take precedence, and so do shapes
+    earlier in their collection.
+    """
+
+    def __init__(self, *collections: ObservableList[MapArea]):
+        self._tree: STRtree | None = None
+        super().__init__(*collections)
+
+    def _build(self) -> None:
+        boxes = np.array(
+            [
+                (b.sw.lng, b.sw.lat, b.ne.lng, b.ne.lat)
+                for b in (shape.get_bounds() for shape in self._shapes)
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        self._tree = STRtree(shapely.box(*boxes.T))
+
+    def find(self, pt: LatLng) -> MapArea | None:
+        """
+        Finds the first shape that contains a location.
+        :param pt: Location
+        :return: Shape, or None when no shape contains the location
+        """
+        self._refresh()
+        candidates = self._tree.query(shapely.Point(pt.lng, pt.lat))
+        for i in np.sort(candidates).tolist():
+            shape = self._shapes[i]
+            if shape.contains(pt):
+                return shape
+        return None
+
+
+class TraceIndex(CollectionIndex[MapPolyline]):
+    """
+    Index of polylines, to find the trace closest to a click: an STRtree of
+    the traces on one local planar frame. Distances are measured to the
+    trace segments, not to their vertices, which can be far apart on sparse
+    traces like the map nodes.
+    """
+
+    def __init__(self, *collections: ObservableList[MapPolyline]):
+        self._tree: STRtree | None = None
+        self._projection = LocalProjection(0.0, 0.0)
+        # Shape of every geometry in the tree, as polylines may have none
+        self._owners = np.empty(0, dtype=np.int64)
+        super().__init__(*collections)
+
+    def _build(self) -> None:
+        vertices = [shape.vertices for shape in self._shapes]
+        stacked = np.concatenate(vertices) if vertices else np.empty((0, 2))
+        self._projection = projection_for(stacked[:, 0], stacked[:, 1])
+        geometries, owners = [], []
+        for owner, points in enumerate(vertices):
+            points = points[np.isfinite(points).all(axis=1)]
+            if len(points) == 0:
+                continue
+            x, y = self._projection.forward(points[:, 0], points[:, 1])
+            if len(points) == 1:
+                geometries.append(shapely.points(x[0], y[0]))
+            else:
+                geometries.append(shapely.linestrings(x, y))
+            owners.append(owner)
+        self._tree = STRtree(geometries)
+        self._owners = np.array(owners, dtype=np.int64)
+
+    def nearest(
+        self, pt: LatLng, max_distance: float
+    ) -> Tuple[MapPolyline | None, float]:
+        """
+        Finds the polyline closest to a location.
+        :param pt: Location
+        :param max_distance: Search radius in meters
+        :return: Polyline and distance in meters, or None and NaN when no
+            polyline lies within the search radius
+        """
+        self._refresh()
+        x, y = self._projection.forward(np.array([pt.lat]), np.array([pt.lng]))
+        indices, distances = self._tree.query_nearest(
+            shapely.points(x[0], y[0]), max_distance=max_distance, return_distance=True
+        )
+        if len(indices) == 0:
+            return None, float("nan")
+        # Ties go to the first polyline
+        best = int(np.argmin(indices))
+        return self._shapes[self._owners[indices[best]]], float(distances[best])
@@ -5,9 +5,10 @@ from nicegui import ui
 from app.converters.general import NotNoneValueConverter
 from app.viewmodels.map import MapViewModel
 from app.views.map import MapView
+from app.views.stats import TripStatsView
 from app.views.trip import TripView
 from nicemvvm import nm
-from nicemvvm.command import RelayCommand
+from nicemvvm.command import AsyncRelayCommand
 from nicemvvm.converter import ValueConverter
 
 
@@ -16,6 +17,22 @@ class LatLngTextConverter(ValueConverter):
         return f"({v[0]}, {v[1]})"
 
 
+class TripsInViewTextConverter(ValueConverter):
+    def convert(self, v: Any) -> Any:
+        return f"{len(v)} trips in view" if v else ""
+
+
+class MatchErrorsTextConverter(ValueConverter):
+    def convert(self, v: Any) -> Any:
+        if v is None or not v.stats.get("count"):
+            return ""
+        stats = v.stats
+        return (
+            f"Match offset p50 {stats['p50']:.1f} m, "
+            f"p95 {stats['p95']:.1f} m, max {stats['max']:.1f} m"
+        )
+
+
 class MainView:
     def __init__(self):
         self._view_model = MapViewModel()
@@ -25,7 +42,9 @@ class MainView:
                 TripView(self._view_model)
 
                 with ui.row():
-                    gps_cmd = RelayCommand(lambda arg: self._add_route_to_map("gps"))
+                    gps_cmd = AsyncRelayCommand(
+                        lambda arg: self._add_route_to_map("gps")
+                    )
                     gps_cmd.bind(
                         self._view_model,
                         property_name="selected_trip",
@@ -36,7 +55,7 @@ class MainView:
                         "size=sm no-caps"
                     ).disable()
 
-                    match_cmd = RelayCommand(
+                    match_cmd = AsyncRelayCommand(
                         lambda arg: self._add_route_to_map("match")
                     )
                     match_cmd.bind(
@@ -49,7 +68,9 @@ class MainView:
                         "size=sm no-caps"
                     ).disable()
 
-                    node_cmd = RelayCommand(lambda arg: self._add_route_to_map("nodes"))
+                    node_cmd = AsyncRelayCommand(
+                        lambda arg: self._add_route_to_map("nodes")
+                    )
                     node_cmd.bind(
                         self._view_model,
                         property_name="selected_trip",
@@ -60,14 +81,61 @@ class MainView:
                         "size=sm no-caps"
                     ).disable()
 
+                    zoom_cmd = self._view_model.fit_trip_command
+                    zoom_cmd.bind(
+                        self._view_model,
+                        property_name="selected_trip",
+                        local_name="is_enabled",
+                        converter=NotNoneValueConverter(),
+                    )
+                    nm.button(text="Zoom", command=zoom_cmd).props(
+                        "size=sm no-caps"
+                    ).disable()
+
+                    match_error_cmd = self._view_model.review_match_command
+                    match_error_cmd.bind(
+                        self._view_model,
+                        property_name="selected_trip",
+                        local_name="is_enabled",
+                        converter=NotNoneValueConverter(),
+                    )
+                    nm.button(text="Match Error", command=match_error_cmd).props(
+                        "size=sm no-caps"
+                    ).disable()
+
+                    stats_cmd = self._view_model.trip_stats_command
+                    stats_cmd.bind(
+                        self._view_model,
+                        property_name="selected_trip",
+                        local_name="is_enabled",
+                        converter=NotNoneValueConverter(),
+                    )
+                    nm.button(text="Stats", command=stats_cmd).props(
+                        "size=sm no-caps"
+                    ).disable()
+
+                    nm.label().classes("self-center text-sm").bind(
+                        self._view_model,
+                        property_name="match_errors",
+                        local_name="text",
+                        converter=MatchErrorsTextConverter(),
+                    )
+
+                    nm.label().classes("self-center text-sm").bind(
+                        self._view_model,
+                        property_name="trips_in_view",
+                        local_name="text",
+                        converter=TripsInViewTextConverter(),
+                    )
+
+                TripStatsView(self._view_model)
+
             with splitter.after:
                 MapView(self._view_model)
 
-    def _add_route_to_map(self, trace_name: str) -> None:
+    async def _add_route_to_map(self, trace_name: str) -> None:
         trip = self._view_model.selected_trip
         if trip is not None:
-            if len(trip.signals) == 0:
-                trip.load_signals()
-            if len(trip.nodes) == 0:
-                trip.load_nodes()
+            await trip.load_signals_async()
+            await trip.load_nodes_async()
             self._view_model.show_polyline(trip, trace_name)
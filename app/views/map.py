@@ -5,6 +5,7 @@ from nicegui.events import GenericEventArguments
 
 from app.converters.general import NotNoneValueConverter
 from app.converters.map import (
+    DensityGeoJsonConverter,
     MapCircleGridConverter,
     MapCircleMapConverter,
     MapPolygonGridConverter,
@@ -206,6 +207,10 @@ def create_map(view_model: Observable) -> LeafletMap:
         .bind(view_model, "select_polygon_command", "polygon_contextmenu_command")
         .bind(view_model, "select_circle_command", "circle_click_command")
         .bind(view_model, "select_circle_command", "circle_contextmenu_command")
+        .bind(view_model, "view_bounds_command", "view_bounds_command")
+        .bind(
+            view_model, "density_cells", "overlay", converter=DensityGeoJsonConverter()
+        )
     )
     ManagedTasks().create(setup_map(m))
     return m
@@ -328,6 +333,9 @@ class MapView(ui.column, Observer):
             MenuItem("Fit to Content").bind(
                 view_model, property_name="fit_content_command", local_name="command"
             )
+            MenuItem("Toggle Speed Density").bind(
+                view_model, property_name="toggle_density_command", local_name="command"
+            )
             ui.separator()
             # MenuItem("Show LatLng", on_click=lambda _: ui.notify(self._ctx_latlng))
             MenuItem(
@@ -353,6 +361,21 @@ class MapView(ui.column, Observer):
                 command_binder=LocalBinder(view_model, "convert_area_to_h3_command"),
             )
 
+            MenuItem(
+                text="Find Trips Crossing This Area",
+                visible_binder=LocalBinder(
+                    view_model, "selected_shape", converter=NotNoneValueConverter()
+                ),
+                command_binder=LocalBinder(view_model, "find_trips_crossing_command"),
+            )
+            MenuItem(
+                text="Show All Trips",
+                visible_binder=LocalBinder(
+                    view_model, "area_shape", converter=NotNoneValueConverter()
+                ),
+                command_binder=LocalBinder(view_model, "show_all_trips_command"),
+            )
+
             MenuItem(
                 text="Remove Circle",
                 visible_binder=LocalBinder(
@@ -0,0 +1,53 @@
+import math
+from typing import Any
+
+from nicegui import ui
+
+from nicemvvm import nm
+from nicemvvm.converter import ValueConverter
+from nicemvvm.observables.observability import Observable
+
+# Panel rows, as (statistic, caption, format)
+STATS = (
+    ("distance_km", "Distance", "{:.2f} km"),
+    ("duration_min", "Duration", "{:.1f} min"),
+    ("mean_speed_kmh", "Mean speed", "{:.1f} km/h"),
+    ("max_speed_kmh", "Max speed", "{:.1f} km/h"),
+    ("max_acceleration", "Max acceleration", "{:.2f} m/s²"),
+    ("max_deceleration", "Max deceleration", "{:.2f} m/s²"),
+    ("jerk_rms", "RMS jerk", "{:.2f} m/s³"),
+    ("turning_deg", "Turning", "{:.0f}°"),
+    ("climb_m", "Climb", "{:.0f} m"),
+    ("descent_m", "Descent", "{:.0f} m"),
+    ("energy_j_per_kg_km", "Energy", "{:.0f} J/kg/km"),
+)
+
+
+class StatTextConverter(ValueConverter):
+    def __init__(self, name: str, caption: str, fmt: str):
+        self._name = name
+        self._caption = caption
+        self._fmt = fmt
+
+    def convert(self, v: Any) -> Any:
+        value = (v or {}).get(self._name)
+        if value is None or math.isnan(value):
+            return f"{self._caption}: -"
+        return f"{self._caption}: {self._fmt.format(value)}"
+
+
+class TripStatsView(ui.column):
+    """
+    Kinematics statistics of the selected trip, from the trip data cache.
+    """
+
+    def __init__(self, view_model: Observable):
+        super().__init__()
+        with self.classes("gap-0 text-sm"):
+            for name, caption, fmt in STATS:
+                nm.label().bind(
+                    view_model,
+                    property_name="trip_stats",
+                    local_name="text",
+                    converter=StatTextConverter(name, caption, fmt),
+                )
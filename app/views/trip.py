@@ -9,28 +9,40 @@ class TripView(ui.column):
     def __init__(self, view_model: Observable):
         super().__init__()
 
+        # Shared, so selected rows resolve to the trips served to the grid
+        converter = TripToDictConverter()
         self._grid = (
             nm.gridview(supress_auto_size=True)
             .bind(
                 view_model,
-                property_name="trips",
-                local_name="items",
-                converter=TripToDictConverter(),
+                property_name="trip_catalog",
+                local_name="datasource",
+                converter=converter,
             )
             .bind(
                 view_model,
                 property_name="selected_trip",
                 local_name="selected_item",
-                converter=TripToDictConverter(),
+                converter=converter,
             )
         )
+        # Filters and sort orders run in SQL, see TripCatalog
+        number, day = "agNumberColumnFilter", "agDateColumnFilter"
         self._grid.columns = [
-            nm.gridview_col(header="Trip", field="traj_id", filter=True, width=70),
+            nm.gridview_col(header="Trip", field="traj_id", filter=number, width=70),
             nm.gridview_col(
-                header="Vehicle", field="vehicle_id", filter=True, width=75
+                header="Vehicle", field="vehicle_id", filter=number, width=75
+            ),
+            nm.gridview_col(header="km", field="km", filter=number, width=60),
+            nm.gridview_col(header="Start", field="start", filter=day, width=100),
+            nm.gridview_col(header="End", field="end", filter=day),
+            # From the trip summary, for display only
+            nm.gridview_col(header="Points", field="points", sortable=False, width=70),
+            nm.gridview_col(
+                header="Avg km/h", field="avg_speed", sortable=False, width=80
+            ),
+            nm.gridview_col(
+                header="Max km/h", field="max_speed", sortable=False, width=80
             ),
-            nm.gridview_col(header="km", field="km", filter=True, width=60),
-            nm.gridview_col(header="Start", field="start", filter=True, width=100),
-            nm.gridview_col(header="End", field="end", filter=True),
         ]
         self._grid.row_id = "traj_id"
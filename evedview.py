@@ -1,6 +1,8 @@
-from nicegui import context, ui
+from nicegui import app, context, ui
 
 from app.models.TripModel import TripModel
+from app.repositories.executor import shutdown_executor
+from app.services.database import check_indexes
 from app.views.main import MainView
 from nicemvvm.ResourceLocator import ResourceLocator
 
@@ -28,8 +30,10 @@ async def index():
 
 
 def setup_app():
+    check_indexes()
     locator = ResourceLocator()
     locator["TripModel"] = TripModel()
+    app.on_shutdown(lambda: shutdown_executor(wait=False))
 
 
 setup_app()
@@ -1,12 +1,15 @@
-from typing import Any, Callable
+import asyncio
+from typing import Any, Awaitable, Callable
 
 from nicemvvm.observables.observability import Observable, Observer, notify_change
+from nicemvvm.tasks import ManagedTasks
 
 
 class Command(Observable):
     def __init__(self, is_async: bool = False, is_enabled: bool = True, **kwargs):
         self._is_enabled: bool = is_enabled
         self._is_async: bool = is_async
+        self._is_busy: bool = False
         super().__init__(**kwargs)
 
     @property
@@ -22,6 +25,15 @@ class Command(Observable):
     def is_async(self) -> bool:
         return self._is_async
 
+    @property
+    def is_busy(self) -> bool:
+        return self._is_busy
+
+    @is_busy.setter
+    @notify_change
+    def is_busy(self, value: bool):
+        self._is_busy = value
+
     def execute(self, arg: Any = None) -> Any:
         return None
 
@@ -29,6 +41,30 @@ class Command(Observable):
         return None
 
 
+class AsyncCommand(Command):
+    """
+    Command whose work is a coroutine. Calling `execute` schedules
+    `async_execute` as a managed task and keeps `is_busy` set while it runs,
+    so bound controls can show progress. Executions requested while the
+    command is busy are ignored.
+    """
+
+    def __init__(self, is_enabled: bool = True, **kwargs):
+        super().__init__(is_async=True, is_enabled=is_enabled, **kwargs)
+
+    def execute(self, arg: Any = None) -> asyncio.Task | None:
+        if self.is_busy:
+            return None
+        self.is_busy = True
+        return ManagedTasks().create(self._run(arg))
+
+    async def _run(self, arg: Any) -> Any:
+        try:
+            return await self.async_execute(arg)
+        finally:
+            self.is_busy = False
+
+
 class RelayCommand(Command, Observer):
     def __init__(
         self,
@@ -41,3 +77,17 @@ class RelayCommand(Command, Observer):
 
     def execute(self, arg: Any = None) -> Any:
         return self._action(arg)
+
+
+class AsyncRelayCommand(AsyncCommand, Observer):
+    def __init__(
+        self,
+        action: Callable[[Any], Awaitable[Any]],
+        is_enabled: bool = True,
+        **kwargs,
+    ):
+        super().__init__(is_enabled=is_enabled, **kwargs)
+        self._action = action
+
+    async def async_execute(self, arg: Any = None) -> Any:
+        return await self._action(arg)
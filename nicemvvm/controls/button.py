@@ -23,12 +23,21 @@ class Button(ui.button, Observer):
 
     def _command_handler(self, action: str, args: Mapping[str, Any]) -> None:
         if action == "property_changed":
-            if args["name"] == "is_enabled":
-                enabled = args["value"]
-                if enabled:
-                    self.enable()
-                else:
-                    self.disable()
+            match args["name"]:
+                case "is_enabled":
+                    enabled = args["value"]
+                    if enabled and not self._command.is_busy:
+                        self.enable()
+                    else:
+                        self.disable()
+                case "is_busy":
+                    if args["value"]:
+                        self.props("loading")
+                        self.disable()
+                    else:
+                        self.props(remove="loading")
+                        if self._command.is_enabled:
+                            self.enable()
 
     @property
     def command(self) -> Command | None:
@@ -5,6 +5,13 @@ from nicegui import events
 from nicegui.elements.aggrid import AgGrid as NiceGUIAgGrid
 
 from nicemvvm.converter import ValueConverter
+from nicemvvm.datasource import (
+    DataSource,
+    FilterCondition,
+    FilterSpec,
+    RowRequest,
+    SortSpec,
+)
 from nicemvvm.observables.collections import ObservableList
 from nicemvvm.observables.observability import (
     Observable,
@@ -19,7 +26,7 @@ class GridViewColumn:
     header: str
     field: str
     type: str | List[str] | None = None  # "rightAligned", "numericColumn"
-    filter: bool = False
+    filter: bool | str = False  # Or a filter name, like "agNumberColumnFilter"
     sortable: bool = True
     selection: bool = False
     width: int | None = None
@@ -36,6 +43,57 @@ class GridViewColumn:
         }
 
 
+# Client-side AG Grid datasource: each block request is parked on the grid
+# component and forwarded to the server as a "rowsRequested" event.
+DATASOURCE_JS = """{
+    getRows: (params) => {
+        const grid = getElement(%d);
+        grid.rowRequests = grid.rowRequests || {};
+        grid.nextRowRequest = (grid.nextRowRequest || 0) + 1;
+        grid.rowRequests[grid.nextRowRequest] = params;
+        grid.$emit("rowsRequested", {
+            requestId: grid.nextRowRequest,
+            startRow: params.startRow,
+            endRow: params.endRow,
+            sortModel: params.sortModel,
+            filterModel: params.filterModel,
+        });
+    }
+}"""
+
+# Completes a parked block request, run through `run_method`
+RESOLVE_ROWS_JS = (
+    "(grid, requestId, rows, lastRow) => {"
+    " const params = grid.rowRequests[requestId];"
+    " delete grid.rowRequests[requestId];"
+    " if (rows === null) { params?.failCallback(); }"
+    " else { params?.successCallback(rows, lastRow); } }"
+)
+
+
+def _filter_condition(model: Dict[str, Any]) -> FilterCondition:
+    if model.get("filterType") == "date":
+        return FilterCondition(
+            model["type"], model.get("dateFrom"), model.get("dateTo")
+        )
+    return FilterCondition(model["type"], model.get("filter"), model.get("filterTo"))
+
+
+def parse_filter_model(filter_model: Dict[str, Any]) -> List[FilterSpec]:
+    """
+    Converts an AG Grid filter model into filter specs, ordered by field.
+    """
+    specs = []
+    for field, model in sorted(filter_model.items()):
+        kind = model.get("filterType", "text")
+        if "conditions" in model:
+            conditions = tuple(_filter_condition(c) for c in model["conditions"])
+            specs.append(FilterSpec(field, kind, conditions, model["operator"] == "OR"))
+        else:
+            specs.append(FilterSpec(field, kind, (_filter_condition(model),)))
+    return specs
+
+
 def to_dict(item: Any) -> Dict[str, Any]:
     if is_dataclass(item):
         return asdict(item)
@@ -56,6 +114,7 @@ class GridView(NiceGUIAgGrid, Observer):
         self._selected_items: List[Dict[str, Any]] = []
         self._row_id: str = ""
         self._item_converter: ValueConverter | None = None
+        self._datasource: DataSource | None = None
         self._tasks = set()
 
         self._options = {
@@ -150,6 +209,10 @@ class GridView(NiceGUIAgGrid, Observer):
                 )
                 self.update()
 
+            case "datasource":
+                self._item_converter = converter
+                self._set_datasource(getattr(source, property_name))
+
             case _:
                 raise ValueError(f"GridView.bind - Invalid local name: {local_name}")
 
@@ -178,8 +241,62 @@ class GridView(NiceGUIAgGrid, Observer):
             source: ObservableList = items
             source.register(self._items_handler)
 
+    def _set_datasource(self, datasource: DataSource) -> None:
+        """
+        Switches the grid to the AG Grid infinite row model. Rows are fetched
+        from the data source one block at a time as they scroll into view and
+        only the most recent blocks are kept on the client.
+        """
+        self._datasource = datasource
+        datasource.register(self._datasource_handler)
+        self.on("rowsRequested", self._rows_requested_handler)
+
+        self._options.pop("rowData", None)
+        self._options.setdefault("cacheBlockSize", 100)
+        self._options.setdefault("maxBlocksInCache", 10)
+        self._options["rowModelType"] = "infinite"
+        self._options[":datasource"] = DATASOURCE_JS % self.id
+        self.update()
+
+    def _datasource_handler(self, action: str, args: Mapping[str, Any]) -> None:
+        if action == "refresh":
+            self.run_grid_method("purgeInfiniteCache")
+
+    def _rows_requested_handler(self, event: events.GenericEventArguments) -> None:
+        ManagedTasks().create(self._load_rows(event.args))
+
+    async def _load_rows(self, args: Dict[str, Any]) -> None:
+        request = RowRequest(
+            start=args["startRow"],
+            end=args["endRow"],
+            sort=[
+                SortSpec(sort["colId"], sort["sort"] == "desc")
+                for sort in args.get("sortModel") or []
+            ],
+            filters=parse_filter_model(args.get("filterModel") or {}),
+        )
+        try:
+            block = await self._datasource.get_rows(request)
+        except Exception:
+            self.run_method(RESOLVE_ROWS_JS, args["requestId"], None, None)
+            raise
+
+        converter = self._item_converter
+        rows = [
+            item if converter is None else converter.convert(item)
+            for item in block.rows
+        ]
+        last_row = -1 if block.last_row is None else block.last_row
+        self.run_method(RESOLVE_ROWS_JS, args["requestId"], rows, last_row)
+
     async def _find_selected_row(self, column: str) -> None:
         row = await self.get_selected_row()
+        if self._datasource is not None:
+            # Rows of a data source live on the client only
+            self._selected_item = row
+            self.propagate("selected_item", row)
+            return
+
         for item in self._items:
             if item[column] == row[column]:
                 self._selected_item = item
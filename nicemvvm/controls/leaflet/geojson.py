@@ -0,0 +1,33 @@
+from typing import Any, Dict
+
+from nicegui import ui
+from nicegui.elements.leaflet_layers import GenericLayer
+
+# Each feature carries its own Leaflet path options
+STYLE_JS = "(feature) => feature.properties.style"
+
+
+class GeoJsonLayer:
+    """
+    GeoJSON overlay layer, styled per feature from `properties.style`. Its
+    features are replaced in place, so the layer keeps its position in the
+    map's layer order.
+    """
+
+    def __init__(self, interactive: bool = False):
+        self._layer: GenericLayer | None = None
+        self._options = {"interactive": interactive}
+
+    def show(self, leaflet: ui.leaflet, data: Dict[str, Any]) -> None:
+        if self._layer is None:
+            self._layer = leaflet.generic_layer(
+                name="geoJSON", args=[data, self._options]
+            )
+        else:
+            self._layer.run_method("clearLayers", None)
+            self._layer.run_method("addData", data)
+        self._layer.run_method(":setStyle", STYLE_JS)
+
+    def clear(self) -> None:
+        if self._layer is not None:
+            self._layer.run_method("clearLayers", None)
@@ -5,6 +5,7 @@ from nicegui.events import GenericEventArguments
 
 from nicemvvm.command import Command
 from nicemvvm.controls.leaflet.circle import Circle
+from nicemvvm.controls.leaflet.geojson import GeoJsonLayer
 from nicemvvm.controls.leaflet.path import Path
 from nicemvvm.controls.leaflet.polygon import Polygon
 from nicemvvm.controls.leaflet.polyline import Polyline
@@ -42,6 +43,12 @@ class LeafletMap(ui.leaflet, Observer):
         self._polygon_converter: ValueConverter | None = None
         self._circles: Dict[str, Circle] = {}
         self._circle_converter: ValueConverter | None = None
+        self._overlay = GeoJsonLayer()
+        # Polylines swap their level of detail as the zoom changes. Layers
+        # replayed on init, or added before it, get their detail again.
+        self.on("map-zoomend", self._on_detail_zoom)
+        self.on("init", self._on_detail_init)
+        self._overlay_data: Dict | None = None
 
         self.click_command: Command | None = None
         self.polyline_click_command: Command | None = None
@@ -55,6 +62,7 @@ class LeafletMap(ui.leaflet, Observer):
         self.circle_contextmenu_command: Command | None = None
         self.double_click_command: Command | None = None
         self.contextmenu_command: Command | None = None
+        self.view_bounds_command: Command | None = None
 
     def _on_click(self, e: GenericEventArguments):
         if self.click_command is not None:
@@ -108,10 +116,27 @@ class LeafletMap(ui.leaflet, Observer):
         center = e.args["center"]
         self.propagate("center", center)
 
+    def _on_detail_zoom(self, e: GenericEventArguments):
+        for polyline in self._polylines.values():
+            polyline.set_zoom(e.args["zoom"])
+
+    def _on_detail_init(self, e: GenericEventArguments):
+        for polyline in self._polylines.values():
+            polyline.refresh_detail()
+
     def _on_map_zoom(self, e: GenericEventArguments):
         zoom = e.args["zoom"]
         self.propagate("zoom", zoom)
 
+    async def _on_view_change(self, e: GenericEventArguments):
+        if self.view_bounds_command is not None:
+            # Leaflet serializes LatLngBounds with its private corner fields
+            bounds = await self.run_map_method("getBounds")
+            sw, ne = bounds["_southWest"], bounds["_northEast"]
+            self.view_bounds_command.execute(
+                GeoBounds(LatLng(sw["lat"], sw["lng"]), LatLng(ne["lat"], ne["lng"]))
+            )
+
     def _shape_handler(
         self,
         action: str,
@@ -237,9 +262,29 @@ class LeafletMap(ui.leaflet, Observer):
                 ui.on("circle-contextmenu", self._on_circle_contextmenu)
                 handler = self._inbound_handler
 
+            case "view_bounds_command":
+                # Zooming ends with a moveend too
+                self.on("map-moveend", self._on_view_change)
+                handler = self._inbound_handler
+
         Observer.bind(self, source, property_name, local_name, handler, converter)
         return self
 
+    @property
+    def overlay(self) -> Dict | None:
+        """
+        GeoJSON data shown in the overlay layer, None to clear it.
+        """
+        return self._overlay_data
+
+    @overlay.setter
+    def overlay(self, data: Dict | None) -> None:
+        self._overlay_data = data
+        if data:
+            self._overlay.show(self, data)
+        else:
+            self._overlay.clear()
+
     def invalidate_size(self, animate: bool = False) -> Self:
         self.run_map_method("invalidateSize", animate)
         return self
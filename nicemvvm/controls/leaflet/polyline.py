@@ -1,10 +1,31 @@
-from typing import List
+import json
+from typing import Callable, List
 
 from nicegui import ui
 from nicegui.elements.leaflet_layers import GenericLayer
 
 from nicemvvm.controls.leaflet.path import Path
-from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
+from nicemvvm.controls.leaflet.types import EncodedPath, GeoBounds, LatLng
+
+# Decodes an encoded polyline into [lat, lng] pairs in the browser
+DECODE_JS = """((s, p) => {
+    const f = Math.pow(10, -p), pts = [];
+    let i = 0, lat = 0, lng = 0;
+    while (i < s.length) {
+        for (let k = 0; k < 2; k++) {
+            let r = 0, sh = 0, b;
+            do {
+                b = s.charCodeAt(i++) - 63;
+                r |= (b & 31) << sh;
+                sh += 5;
+            } while (b >= 32);
+            const d = r & 1 ? ~(r >> 1) : r >> 1;
+            if (k === 0) lat += d; else lng += d;
+        }
+        pts.push([lat * f, lng * f]);
+    }
+    return pts;
+})"""
 
 
 class Polyline(Path):
@@ -26,6 +47,7 @@ class Polyline(Path):
         fill_color: str = "#3388ff",
         fill_opacity: float = 0.2,
         fill_rule: str = "evenodd",
+        detail: Callable[[int], List[LatLng] | EncodedPath] | None = None,
     ):
         Path.__init__(
             self,
@@ -46,6 +68,10 @@ class Polyline(Path):
         self._options["noClipping"] = no_clipping
         self._options["smoothFactor"] = smooth_factor
         self._points: List[LatLng] = points
+        # Level of detail: the points to draw at a zoom level, which may be
+        # encoded to cut the size of the message to the browser
+        self._detail = detail
+        self._zoom: int | None = None
 
     @property
     def smooth_factor(self) -> float:
@@ -73,7 +99,37 @@ class Polyline(Path):
     def points(self, points: List[LatLng]):
         self._points = points
         if self._layer is not None:
-            self._layer.run_method("setLatLngs", self._points)
+            self._set_lat_lngs(self.points_at_zoom(self._zoom))
+
+    def points_at_zoom(self, zoom: int | None) -> List[LatLng] | EncodedPath:
+        if self._detail is None or zoom is None:
+            return self._points
+        return self._detail(zoom)
+
+    def set_zoom(self, zoom: int) -> None:
+        """
+        Swaps in the level of detail of a zoom level.
+        """
+        if self._detail is None or zoom == self._zoom:
+            return
+        self._zoom = zoom
+        if self._layer is not None:
+            self._set_lat_lngs(self.points_at_zoom(zoom))
+
+    def refresh_detail(self) -> None:
+        """
+        Re-sends the level of detail, for a browser that rebuilt the layer from
+        its creation arguments, which hold no points for encoded paths.
+        """
+        if self._layer is not None and self._detail is not None:
+            self._set_lat_lngs(self.points_at_zoom(self._zoom))
+
+    def _set_lat_lngs(self, points: List[LatLng] | EncodedPath) -> None:
+        if isinstance(points, EncodedPath):
+            decode = f"{DECODE_JS}({json.dumps(points.encoded)}, {points.precision})"
+            self._layer.run_method(":setLatLngs", decode)
+        else:
+            self._layer.run_method("setLatLngs", points)
 
     @property
     async def center(self) -> LatLng | None:
@@ -92,8 +148,16 @@ class Polyline(Path):
 
     def add_to(self, leaflet: ui.leaflet) -> GenericLayer:
         self.remove()
-        self._layer = leaflet.generic_layer(
-            name="polyline", args=[self._points, self._options]
-        )
+        self._zoom = leaflet.zoom
+        points = self.points_at_zoom(self._zoom)
+        if isinstance(points, EncodedPath):
+            self._layer = leaflet.generic_layer(
+                name="polyline", args=[[], self._options]
+            )
+            self._set_lat_lngs(points)
+        else:
+            self._layer = leaflet.generic_layer(
+                name="polyline", args=[points, self._options]
+            )
         self._wire_js_events("polyline")
         return self._layer
@@ -16,6 +16,17 @@ class LatLng:
         return {"lat": self.lat, "lng": self.lng}
 
 
+@dataclass(frozen=True)
+class EncodedPath:
+    """
+    Path in the encoded polyline format, sent to the browser as a string and
+    decoded there, instead of as a list of coordinate objects.
+    """
+
+    encoded: str
+    precision: int = 6
+
+
 class ControlPosition(Enum):
     TOPLEFT = "topleft"
     TOPRIGHT = "topright"
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+from nicemvvm.observables.observability import Observable
+
+
+@dataclass
+class SortSpec:
+    field: str
+    descending: bool = False
+
+
+@dataclass(frozen=True)
+class FilterCondition:
+    # AG Grid filter option, like "equals", "lessThan", "inRange" or "blank"
+    type: str
+    value: Any = None
+    value_to: Any = None
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """
+    Filter of one field. Its conditions must all hold, or any of them when
+    `any` is set. Specs are hashable, so they can key cached results.
+    """
+
+    field: str
+    kind: str  # "text", "number" or "date"
+    conditions: Tuple[FilterCondition, ...]
+    any: bool = False
+
+
+@dataclass
+class RowRequest:
+    start: int
+    end: int
+    sort: List[SortSpec] = field(default_factory=list)
+    filters: List[FilterSpec] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+@dataclass
+class RowBlock:
+    rows: List[Any]
+    last_row: int | None = None  # Total row count, when known
+
+
+class DataSource(Observable, ABC):
+    """
+    Paged source of rows for virtualized controls. Controls request blocks of
+    rows as they scroll into view, so only visible rows are ever loaded and
+    sent to the client. Calling `refresh` tells bound controls to discard
+    their cached blocks and request them again.
+    """
+
+    @abstractmethod
+    async def get_rows(self, request: RowRequest) -> RowBlock: ...
+
+    def refresh(self) -> None:
+        self.notify(action="refresh")
@@ -1,9 +1,16 @@
+import threading
+
+
 def singleton(cls):
     instances = {}
+    lock = threading.Lock()
 
     def get_instance(*args, **kwargs):
         if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
+            # Executor threads may race to create the first instance
+            with lock:
+                if cls not in instances:
+                    instances[cls] = cls(*args, **kwargs)
         return instances[cls]
 
     return get_instance
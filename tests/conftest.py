@@ -0,0 +1,198 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.geo.hexagons import vec_latlng_to_cells
+from app.models.TripModel import TripModel
+from app.viewmodels.circle import MapCircle
+from app.viewmodels.map import MapViewModel
+from app.viewmodels.polygon import MapPolygon
+from nicemvvm.controls.leaflet.types import LatLng
+from nicemvvm.ResourceLocator import ResourceLocator
+from tools.database.sqlite.ConnectionPool import ConnectionPool
+from tools.database.sqlite.EvedDb import EvedDb
+
+SCHEMA = """
+CREATE TABLE vehicle (
+    vehicle_id      INTEGER PRIMARY KEY,
+    vehicle_type    TEXT,
+    vehicle_class   TEXT,
+    engine          TEXT,
+    weight          REAL
+);
+CREATE TABLE trajectory (
+    traj_id         INTEGER PRIMARY KEY,
+    vehicle_id      INTEGER,
+    trip_id         INTEGER,
+    length_m        REAL,
+    duration_s      REAL,
+    dt_ini          TEXT,
+    dt_end          TEXT
+);
+CREATE TABLE signal (
+    signal_id       INTEGER PRIMARY KEY,
+    day_num         REAL,
+    vehicle_id      INTEGER,
+    trip_id         INTEGER,
+    time_stamp      INTEGER,
+    latitude        REAL,
+    longitude       REAL,
+    speed           REAL,
+    match_latitude  REAL,
+    match_longitude REAL,
+    elevation       REAL,
+    elevation_smooth REAL,
+    gradient        REAL,
+    h3_12           INTEGER
+);
+CREATE TABLE node (
+    node_id         INTEGER,
+    traj_id         INTEGER,
+    latitude        REAL,
+    longitude       REAL,
+    h3_12           INTEGER,
+    match_error     TEXT
+);
+"""
+
+# Three trips: (traj_id, vehicle_id, trip_id, number of signals, base latitude)
+TRIPS = [(1, 10, 100, 5, 42.20), (2, 10, 101, 3, 42.25), (3, 11, 100, 4, 42.30)]
+
+
+def _populate(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO vehicle VALUES (?, ?, ?, ?, ?)",
+        [(10, "car", "ICE", "1.6L", 1500.0), (11, "car", "EV", "electric", 1800.0)],
+    )
+    signal_id = 1
+    for traj_id, vehicle_id, trip_id, count, lat in TRIPS:
+        conn.execute(
+            "INSERT INTO trajectory VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                traj_id,
+                vehicle_id,
+                trip_id,
+                1000.0 * traj_id,
+                60.0 * count,
+                f"2017-11-0{traj_id} 08:00:00.000",
+                f"2017-11-0{traj_id} 08:30:00.000",
+            ),
+        )
+        for i in range(count):
+            conn.execute(
+                "INSERT INTO signal VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (
+                    signal_id,
+                    1.0 + traj_id,
+                    vehicle_id,
+                    trip_id,
+                    1000 * i,
+                    lat + 0.001 * i,
+                    -83.7 + 0.001 * i,
+                    10.0 * i,
+                    lat + 0.001 * i + 0.0001,
+                    -83.7 + 0.001 * i + 0.0001,
+                    250.0 + i,
+                    250.0 + i,
+                    None if i == 0 else 0.5,
+                    600000000000000000 + signal_id,
+                ),
+            )
+            conn.execute(
+                "INSERT INTO node VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    signal_id,
+                    traj_id,
+                    lat + 0.001 * i,
+                    -83.7 + 0.001 * i,
+                    600000000000000000 + signal_id,
+                    None,
+                ),
+            )
+            signal_id += 1
+    conn.commit()
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    """
+    Database file with a single `item` table of three rows.
+    """
+    filename = str(tmp_path / "test.db")
+    conn = sqlite3.connect(filename)
+    conn.execute("CREATE TABLE item (item_id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany(
+        "INSERT INTO item (item_id, name) VALUES (?, ?)",
+        [(1, "one"), (2, "two"), (3, "three")],
+    )
+    conn.commit()
+    conn.close()
+    yield filename
+    ConnectionPool.close_all()
+
+
+@pytest.fixture
+def eved_db(tmp_path, monkeypatch):
+    """
+    Small eVED-like database. Repositories constructing `EvedDb()` are
+    redirected to it.
+    """
+    filename = str(tmp_path / "eved.db")
+    conn = sqlite3.connect(filename)
+    _populate(conn)
+    conn.close()
+
+    for module in ("app.repositories.trip", "app.repositories.cube"):
+        monkeypatch.setattr(
+            f"{module}.EvedDb", lambda *args, **kwargs: EvedDb(filename)
+        )
+    yield EvedDb(filename)
+    ConnectionPool.close_all()
+
+
+@pytest.fixture
+def h3_db(eved_db):
+    """
+    `eved_db` with the signals indexed by the real H3 cells of their
+    map-matched locations.
+    """
+    rows = eved_db.query(
+        "SELECT signal_id, match_latitude, match_longitude FROM signal"
+    )
+    ids, lats, lons = (np.array(column) for column in zip(*rows))
+    cells = vec_latlng_to_cells(lats.astype(float), lons.astype(float))
+    eved_db.execute_sql(
+        "UPDATE signal SET h3_12 = ? WHERE signal_id = ?",
+        list(zip(cells.tolist(), ids.tolist())),
+        many=True,
+    )
+    return eved_db
+
+
+@pytest.fixture
+def map_view_model(monkeypatch):
+    """
+    Map view model over a fresh `TripModel`, registered in the resource
+    locator for the duration of the test only.
+    """
+    monkeypatch.setitem(ResourceLocator()._resources, "TripModel", TripModel())
+    return MapViewModel()
+
+
+def rectangle(south, west, north, east, shape_id="area") -> MapPolygon:
+    corners = [(south, west), (north, west), (north, east), (south, east)]
+    return MapPolygon(
+        shape_id, "#000", 1.0, 1.0, [LatLng(lat, lng) for lat, lng in corners]
+    )
+
+
+def square(lat, lng, size=0.01, shape_id="area") -> MapPolygon:
+    return rectangle(lat, lng, lat + size, lng + size, shape_id=shape_id)
+
+
+def circle(lat, lng, radius, shape_id="circle") -> MapCircle:
+    return MapCircle(
+        shape_id, "#000", 1.0, 1.0, LatLng(lat, lng), radius, True, "", 0.2
+    )
@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.models.TripCatalog import TripCatalog
+from app.models.TripModel import TripModel
+from app.repositories.trip import trips_in_cell_ranges
+from app.services.area import shape_cells, trips_crossing
+from app.services.spatial import build_trip_cells
+from nicemvvm.controls.leaflet.types import LatLng
+from nicemvvm.datasource import RowRequest
+from tests.conftest import circle, rectangle
+
+
+@pytest.fixture
+def cell_db(h3_db):
+    build_trip_cells(h3_db)
+    return h3_db
+
+
+def crossing(shape):
+    async def collect():
+        return [
+            traj_id async for batch in trips_crossing(shape, 1) for traj_id in batch
+        ]
+
+    return asyncio.run(collect())
+
+
+class TestContainsMany:
+    @pytest.fixture
+    def points(self):
+        rng = np.random.default_rng(5)
+        return rng.uniform(42.2, 42.3, 2000), rng.uniform(-83.75, -83.65, 2000)
+
+    def test_polygon_matches_scalar(self, points):
+        polygon = rectangle(42.22, -83.72, 42.28, -83.68)
+        inside = polygon.contains_many(*points)
+        assert 0 < inside.sum() < len(inside)
+        expected = [polygon.contains(LatLng(lat, lng)) for lat, lng in zip(*points)]
+        assert inside.tolist() == expected
+
+    def test_circle_matches_scalar(self, points):
+        shape = circle(42.25, -83.7, 2000.0)
+        inside = shape.contains_many(*points)
+        assert 0 < inside.sum() < len(inside)
+        expected = [shape.contains(LatLng(lat, lng)) for lat, lng in zip(*points)]
+        assert inside.tolist() == expected
+
+    def test_geometry_follows_locations(self):
+        polygon = rectangle(42.22, -83.72, 42.28, -83.68)
+        geometry = polygon.geometry
+        assert polygon.geometry is geometry
+        assert polygon.contains(LatLng(42.25, -83.7))
+
+        polygon.locations = rectangle(42.0, -84.0, 42.1, -83.9).locations
+        assert polygon.geometry is not geometry
+        assert not polygon.contains(LatLng(42.25, -83.7))
+
+
+class TestAreaQuery:
+    def test_cells_are_compacted(self):
+        cells = shape_cells(rectangle(42.19, -83.71, 42.32, -83.69))
+        resolutions = {int(cell) >> 52 & 0xF for cell in cells}
+        assert len(resolutions) > 1
+        assert max(resolutions) <= 12
+
+    def test_candidates(self, cell_db):
+        ranges = np.array([[0, np.iinfo(np.int64).max]], dtype=np.int64)
+        assert trips_in_cell_ranges(ranges) == [1, 2, 3]
+        assert trips_in_cell_ranges(ranges[:0]) == []
+
+    def test_polygon(self, cell_db):
+        assert crossing(rectangle(42.19, -83.71, 42.32, -83.69)) == [1, 2, 3]
+        assert crossing(rectangle(42.245, -83.705, 42.26, -83.69)) == [2]
+        assert crossing(rectangle(42.0, -84.0, 42.1, -83.9)) == []
+
+    def test_circle(self, cell_db):
+        # Around the last point of trip 3, about 180 m from the first one
+        assert crossing(circle(42.3031, -83.6969, 50.0)) == [3]
+
+    def test_without_cell_table(self, eved_db):
+        assert crossing(rectangle(42.19, -83.71, 42.32, -83.69)) == []
+
+    def test_catalog_restriction(self, eved_db):
+        catalog = TripCatalog(TripModel())
+        catalog.restrict([3, 1])
+        block = asyncio.run(catalog.get_rows(RowRequest(0, 10)))
+        assert [trip.traj_id for trip in block.rows] == [1, 3]
+
+        catalog.restrict(None)
+        block = asyncio.run(catalog.get_rows(RowRequest(0, 10)))
+        assert [trip.traj_id for trip in block.rows] == [1, 2, 3]
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.repositories import trip as trip_repository
+from app.repositories.column_store import TripColumnStore
+from app.repositories.trip import load_signals, load_signals_many
+
+
+def is_memory_mapped(array: np.ndarray) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+@pytest.fixture
+def store(eved_db, tmp_path, monkeypatch):
+    store = TripColumnStore(str(tmp_path / "columns"), eved_db.db_name)
+    monkeypatch.setattr(trip_repository, "get_column_store", lambda: store)
+    return store
+
+
+class TestTripColumnStore:
+    def test_round_trip_is_memory_mapped(self, store):
+        signals = load_signals(1)
+        assert store.contains(1)
+
+        cached = store.load(1)
+        assert len(cached) == len(signals) == 5
+        for name in signals.names():
+            np.testing.assert_array_equal(cached.column(name), signals.column(name))
+        assert is_memory_mapped(cached.lat)
+        assert not cached.lat.flags.writeable
+
+    def test_load_signals_prefers_store(self, store):
+        load_signals(2)
+        assert is_memory_mapped(load_signals(2).speed)
+
+    def test_missing_trip(self, store):
+        assert store.load(42) is None
+        assert len(load_signals(42)) == 0
+
+    def test_load_many_fills_store(self, store):
+        store.save(1, load_signals(1))
+        result = load_signals_many([1, 2, 3])
+        assert [len(result[i]) for i in (1, 2, 3)] == [5, 3, 4]
+        assert all(store.contains(i) for i in (1, 2, 3))
+
+    def test_source_change_invalidates(self, store, eved_db):
+        load_signals(1)
+        assert store.is_valid()
+
+        stat = os.stat(eved_db.db_name)
+        os.utime(eved_db.db_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert not store.is_valid()
+
+        store.save(2, load_signals(2))
+        assert store.is_valid()
+        assert not store.contains(1)
+
+    def test_reset_is_seen_by_other_processes(self, store, eved_db):
+        other = TripColumnStore(str(store.folder), eved_db.db_name)
+        store.save(1, load_signals(1))
+        mapped = other.load(1)
+        assert mapped is not None
+
+        # A rebuild starts a new generation instead of deleting in place
+        store.reset()
+        assert not other.contains(1) and other.load(1) is None
+        assert len(list(store.folder.iterdir())) == 2
+        assert mapped.lat[0] == load_signals(1).lat[0]
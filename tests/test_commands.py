@@ -0,0 +1,49 @@
+import asyncio
+
+from nicemvvm.command import AsyncRelayCommand
+
+
+class TestAsyncRelayCommand:
+    def test_busy_while_running(self):
+        started = []
+        busy_changes = []
+
+        async def action(arg):
+            started.append(arg)
+            await asyncio.sleep(0)
+            return arg * 2
+
+        command = AsyncRelayCommand(action)
+        command.register(
+            lambda action, args: (
+                busy_changes.append(args["value"])
+                if action == "property_changed" and args["name"] == "is_busy"
+                else None
+            )
+        )
+
+        async def run():
+            task = command.execute(21)
+            assert command.is_busy
+            assert command.execute(1) is None  # ignored while busy
+            return await task
+
+        assert asyncio.run(run()) == 42
+        assert started == [21]
+        assert busy_changes == [True, False]
+        assert not command.is_busy
+
+    def test_not_busy_after_failure(self):
+        async def action(arg):
+            raise RuntimeError("boom")
+
+        command = AsyncRelayCommand(action)
+
+        async def run():
+            try:
+                await command.execute()
+            except RuntimeError:
+                pass
+
+        asyncio.run(run())
+        assert not command.is_busy
@@ -0,0 +1,103 @@
+import sqlite3
+import threading
+
+import pytest
+
+from tools.database.sqlite.BaseDb import BaseDb
+from tools.database.sqlite.ConnectionPool import ConnectionPool
+
+
+class TestConnectionPool:
+    def test_reuses_connection(self, db_file):
+        pool = ConnectionPool(db_file, size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        assert first is second
+        assert pool.stats()["created"] == 1
+
+    def test_nested_acquire_in_same_thread(self, db_file):
+        pool = ConnectionPool(db_file, size=1, timeout=0.1)
+        with pool.connection() as outer:
+            with pool.connection() as inner:
+                assert inner is outer
+        assert pool.stats()["in_use"] == 0
+
+    def test_timeout_when_exhausted(self, db_file):
+        pool = ConnectionPool(db_file, size=1, timeout=0.05)
+        held = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            with pool.connection():
+                held.set()
+                done.wait(1.0)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        held.wait(1.0)
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+        done.set()
+        thread.join()
+
+    def test_threads_get_distinct_connections(self, db_file):
+        pool = ConnectionPool(db_file, size=4)
+        barrier = threading.Barrier(3)
+        seen = []
+
+        def work():
+            with pool.connection() as conn:
+                barrier.wait(1.0)
+                seen.append(conn)
+
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(id(conn) for conn in seen)) == 3
+        assert pool.stats()["created"] == 3
+
+    def test_replaces_broken_connection(self, db_file):
+        pool = ConnectionPool(db_file, size=1, check_interval=0.0)
+        with pool.connection() as conn:
+            broken = conn
+        broken.close()
+
+        with pool.connection() as conn:
+            assert conn is not broken
+            assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 3
+
+    def test_recycle_closes_connections_in_use(self, db_file):
+        pool = ConnectionPool(db_file, size=2)
+        with pool.dedicated() as first, pool.dedicated() as second:
+            pass
+        with pool.connection() as held:
+            idle = first if held is second else second
+            pool.recycle()
+            assert held.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 3
+        with pytest.raises(sqlite3.ProgrammingError):
+            held.execute("SELECT 1")
+        with pytest.raises(sqlite3.ProgrammingError):
+            idle.execute("SELECT 1")
+
+        with pool.connection() as conn:
+            assert conn is not held
+        assert pool.stats() == {"size": 2, "created": 1, "idle": 1, "in_use": 0}
+
+    def test_shared_pool_per_database(self, db_file):
+        assert ConnectionPool.get(db_file) is ConnectionPool.get(db_file)
+
+
+class TestBaseDbPooling:
+    def test_queries_share_pool(self, db_file):
+        db = BaseDb(db_file)
+        assert db.query_scalar("SELECT name FROM item WHERE item_id = ?", [2]) == "two"
+        assert len(db.query("SELECT * FROM item")) == 3
+        assert len(db.query_df("SELECT * FROM item")) == 3
+        assert db.table_exists("item")
+        assert db.pool.stats()["created"] == 1
+        assert db.pool is BaseDb(db_file).pool
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from tools.database.sqlite.BaseDb import BaseDb
+from tools.database.sqlite.ConnectionProfile import ConnectionProfile
+
+READ_PROFILE = ConnectionProfile(
+    read_only=True,
+    mmap_size=1 << 20,
+    cache_size=-2048,
+    temp_store="memory",
+    query_only=True,
+)
+
+
+class TestConnectionProfile:
+    def test_from_config(self):
+        profile = ConnectionProfile.from_config(
+            {"read_only": True, "mmap_size": 4096, "temp_store": "memory"}
+        )
+        assert profile.read_only
+        assert profile.mmap_size == 4096
+        assert profile.cache_size is None
+        assert profile.reader_pragmas() == [
+            "PRAGMA mmap_size = 4096",
+            "PRAGMA temp_store = MEMORY",
+        ]
+
+    def test_reader_applies_pragmas(self, db_file):
+        conn = READ_PROFILE.connect_reader(db_file)
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 1 << 20
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2048
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 3
+        conn.close()
+
+    @pytest.mark.parametrize("immutable", [False, True])
+    def test_reader_rejects_writes(self, db_file, immutable):
+        profile = ConnectionProfile(read_only=True, immutable=immutable)
+        conn = profile.connect_reader(db_file)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO item (item_id) VALUES (4)")
+        conn.close()
+
+    def test_invalid_temp_store(self):
+        with pytest.raises(ValueError):
+            ConnectionProfile(temp_store="disk").reader_pragmas()
+
+    def test_writer_wal(self, db_file):
+        conn = ConnectionProfile(wal=True).connect_writer(db_file)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_base_db_reads_with_profile_and_writes(self, db_file):
+        db = BaseDb(db_file, profile=READ_PROFILE)
+        db.execute_sql("INSERT INTO item (item_id) VALUES (4)")
+        assert db.query_scalar("SELECT COUNT(*) FROM item") == 4
+        with pytest.raises(sqlite3.OperationalError):
+            db.query("DELETE FROM item")
@@ -0,0 +1,124 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.converters.map import DensityGeoJsonConverter
+from app.geo.hexagons import vec_cell_to_parent, vec_latlng_to_cells
+from app.repositories.cube import load_cube_cells
+from app.services.cube import aggregate_cells, build_h3_cube
+from app.viewmodels.map import resolution_for_zoom
+from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
+
+WORLD = GeoBounds(LatLng(-90.0, -180.0), LatLng(90.0, 180.0))
+
+
+@pytest.fixture
+def cube_db(h3_db):
+    build_h3_cube(h3_db)
+    return h3_db
+
+
+def random_signals(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    cells = vec_latlng_to_cells(
+        rng.uniform(42.20, 42.22, n), rng.uniform(-83.72, -83.70, n)
+    )
+    trips = rng.integers(0, 20, n).astype(np.int64)
+    speed = rng.uniform(0.0, 90.0, n)
+    speed[rng.random(n) < 0.1] = np.nan
+    gradient = rng.normal(0.0, 2.0, n)
+    gradient[rng.random(n) < 0.1] = np.nan
+    return cells, trips, speed, gradient
+
+
+class TestAggregateCells:
+    @pytest.mark.parametrize("resolution", [7, 9, 12])
+    def test_matches_pandas(self, resolution):
+        cells, trips, speed, gradient = random_signals()
+        columns = aggregate_cells(cells, trips, speed, gradient, resolution)
+
+        df = pd.DataFrame(
+            {
+                "cell": vec_cell_to_parent(cells, resolution),
+                "trip": trips,
+                "speed": speed,
+                "gradient": gradient,
+            }
+        )
+        expected = df.groupby("cell").agg(
+            point_count=("trip", "size"),
+            trip_count=("trip", "nunique"),
+            speed_mean=("speed", "mean"),
+            speed_p50=("speed", "median"),
+            speed_p85=("speed", lambda s: s.quantile(0.85)),
+            gradient_mean=("gradient", "mean"),
+        )
+        assert columns["h3_cell"].tolist() == expected.index.tolist()
+        for name in expected.columns:
+            np.testing.assert_allclose(columns[name], expected[name].to_numpy())
+
+
+class TestH3Cube:
+    def test_build(self, cube_db):
+        counts = cube_db.query_df(
+            "select resolution, sum(point_count) as points, max(trip_count) as trips"
+            " from h3_cube group by resolution"
+        )
+        assert counts["resolution"].tolist() == list(range(7, 13))
+        assert set(counts["points"]) == {12}
+
+        finest = load_cube_cells(12, WORLD)
+        assert len(finest) == 12
+        assert finest["trip_count"].max() == 1
+
+    def test_load_in_bounds(self, cube_db):
+        # Trip 2 only, its centers are all within 300 m
+        view = GeoBounds(LatLng(42.245, -83.705), LatLng(42.26, -83.69))
+        cells = load_cube_cells(12, view)
+        assert cells["point_count"].sum() == 3
+        assert load_cube_cells(12, WORLD, limit=2).shape[0] == 2
+
+    def test_without_cube(self, eved_db):
+        assert load_cube_cells(12, WORLD).empty
+
+    def test_geojson(self, cube_db):
+        cells = load_cube_cells(12, WORLD)
+        data = DensityGeoJsonConverter().convert(cells)
+        assert len(data["features"]) == 12
+        ring = data["features"][0]["geometry"]["coordinates"][0]
+        assert ring[0] == ring[-1]
+        assert DensityGeoJsonConverter().convert(None) is None
+
+    def test_resolution_for_zoom(self):
+        # Around Ann Arbor, clamped to the cube resolutions
+        pairs = {5: 7, 9: 7, 10: 8, 12: 9, 13: 10, 15: 12, 19: 12}
+        assert {zoom: resolution_for_zoom(zoom, 42.28) for zoom in pairs} == pairs
+        resolutions = [resolution_for_zoom(zoom, 42.28) for zoom in range(5, 20)]
+        assert resolutions == sorted(resolutions)
+
+    def test_density_layer(self, cube_db, map_view_model):
+        changes = []
+        map_view_model.register(
+            lambda action, args: (
+                action == "property_changed" and changes.append(args["name"])
+            )
+        )
+        map_view_model.view_bounds = WORLD
+
+        async def show():
+            map_view_model.toggle_density_command.execute()
+            await map_view_model.update_density(WORLD)
+
+        asyncio.run(show())
+        cells = map_view_model.density_cells
+        assert cells["point_count"].sum() == 12
+        assert changes.count("density_cells") >= 1
+
+        changes.clear()
+        map_view_model.density_cells = cells
+        assert changes == []
+        map_view_model.toggle_density_command.execute()
+        assert map_view_model.density_cells is None
+        assert changes == ["density_cells"]
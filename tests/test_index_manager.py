@@ -0,0 +1,33 @@
+from app.repositories.trip import register_queries
+from tools.database.sqlite.IndexManager import IndexSpec
+
+
+class TestIndexManager:
+    def test_audit_reports_full_scans(self, eved_db):
+        manager = eved_db.index_manager()
+        register_queries(manager)
+
+        reports = {report.name: report for report in manager.audit()}
+        assert not reports["load_signals"].ok
+        assert not reports["load_nodes"].ok
+
+    def test_provision_creates_missing_indexes(self, eved_db):
+        manager = eved_db.index_manager()
+        register_queries(manager)
+
+        missing = manager.missing_indexes()
+        assert {spec.name for spec in missing} == {
+            spec.name for spec in manager.indexes
+        }
+
+        created = manager.provision()
+        assert len(created) == len(missing)
+        assert manager.missing_indexes() == []
+        assert all(report.ok for report in manager.audit())
+        assert manager.provision() == []
+
+    def test_existing_index_with_same_prefix_satisfies_spec(self, eved_db):
+        eved_db.execute_sql("CREATE INDEX custom_node_idx ON node (traj_id, node_id)")
+        manager = eved_db.index_manager()
+        spec = IndexSpec("idx_node_traj", "node", ("traj_id",))
+        assert manager.is_satisfied(spec)
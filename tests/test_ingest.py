@@ -0,0 +1,132 @@
+import h3.api.numpy_int as h3
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.geo.hexagons import vec_latlng_to_cells
+from app.services.ingest import EvedIngest
+from tools.database.sqlite.ConnectionPool import ConnectionPool
+from tools.database.sqlite.EvedDb import EvedDb
+
+
+def write_signals(path, vehicle_id, trips):
+    rows = []
+    for trip_id, count in trips:
+        for i in range(count):
+            rows.append(
+                {
+                    "DayNum": 1.5,
+                    "VehId": vehicle_id,
+                    "Trip": trip_id,
+                    "Timestamp(ms)": 1000 * i,
+                    "Latitude[deg]": 42.2 + 0.001 * i,
+                    "Longitude[deg]": -83.7,
+                    "Vehicle Speed[km/h]": 30.0,
+                    "Matchted Latitude[deg]": np.nan if i == 0 else 42.2 + 0.001 * i,
+                    "Matched Longitude[deg]": np.nan if i == 0 else -83.7,
+                    "Gradient": 0.1,
+                }
+            )
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+@pytest.fixture
+def release(tmp_path):
+    folder = tmp_path / "release"
+    folder.mkdir()
+    write_signals(folder / "week_1.csv", 10, [(100, 5), (101, 3)])
+    write_signals(folder / "week_2.csv", 11, [(100, 4)])
+    pd.DataFrame(
+        {
+            "VehId": [10, 11],
+            "Vehicle Type": ["ICE", "EV"],
+            "Vehicle Class": ["Car", "Car"],
+            "Engine Configuration & Displacement": ["1.6L", "NO DATA"],
+            "Generalized_Weight": [3000, 3500],
+        }
+    ).to_csv(tmp_path / "vehicles.csv", index=False)
+    yield folder, tmp_path / "vehicles.csv"
+    ConnectionPool.close_all()
+
+
+class TestEvedIngest:
+    def test_loads_release(self, release, tmp_path):
+        folder, vehicles = release
+        db = EvedDb(str(tmp_path / "eved.db"))
+        reports = []
+        ingest = EvedIngest(db, batch_size=2, report=reports.append)
+
+        loaded = ingest.run(sorted(folder.glob("*.csv")), vehicle_file=vehicles)
+
+        assert [progress.rows for progress in loaded] == [8, 4]
+        assert reports[-1].rows == 4
+        assert db.query_scalar("select count(*) from signal") == 12
+        assert db.query_scalar("select engine from vehicle where vehicle_id = 11")
+        assert db.query_scalar("select count(*) from signal where elevation is null")
+
+        trips = db.query_df(
+            "select vehicle_id, trip_id, length_m, duration_s, dt_ini "
+            "from trajectory order by traj_id"
+        )
+        assert trips[["vehicle_id", "trip_id"]].values.tolist() == [
+            [10, 100],
+            [10, 101],
+            [11, 100],
+        ]
+        assert trips["duration_s"].tolist() == [4.0, 2.0, 3.0]
+        assert trips["length_m"].iloc[0] == pytest.approx(445, rel=0.01)
+        assert trips["dt_ini"].iloc[0] == "2017-11-01 12:00:00.000"
+        assert db.index_manager().missing_indexes() == []
+
+    def test_resumes(self, release, tmp_path):
+        folder, _ = release
+        db = EvedDb(str(tmp_path / "eved.db"))
+        ingest = EvedIngest(db, report=lambda progress: None)
+        ingest.run([folder / "week_1.csv"])
+
+        loaded = ingest.run(sorted(folder.glob("*.csv")))
+
+        assert [progress.file_name for progress in loaded] == ["week_2.csv"]
+        assert db.query_scalar("select count(*) from signal") == 12
+        assert db.query_scalar("select count(*) from trajectory") == 3
+
+    def test_traj_ids_are_stable_across_runs(self, release, tmp_path):
+        folder, _ = release
+        db = EvedDb(str(tmp_path / "eved.db"))
+        ingest = EvedIngest(db, report=lambda progress: None)
+        ingest.run([folder / "week_2.csv"])
+        before = db.query("select traj_id, vehicle_id, trip_id from trajectory")
+
+        # Vehicle 10 sorts before vehicle 11, whose trip keeps its id
+        ingest.run(sorted(folder.glob("*.csv")))
+        after = db.query(
+            "select traj_id, vehicle_id, trip_id from trajectory order by traj_id"
+        )
+        assert before == [(1, 11, 100)]
+        assert after == [(1, 11, 100), (2, 10, 100), (3, 10, 101)]
+
+    def test_h3_uses_matched_location(self, release, tmp_path):
+        folder, _ = release
+        db = EvedDb(str(tmp_path / "eved.db"))
+        EvedIngest(db, report=lambda progress: None).run([folder / "week_2.csv"])
+
+        rows = db.query(
+            "select latitude, longitude, match_latitude, h3_12 from signal "
+            "order by signal_id"
+        )
+        assert rows[0][2] is None
+        assert rows[0][3] == h3.latlng_to_cell(rows[0][0], rows[0][1], 12)
+        assert all(row[3] == h3.latlng_to_cell(row[2], -83.7, 12) for row in rows[1:])
+
+
+def test_vec_latlng_to_cells():
+    lats = np.array([42.2, 42.3, 42.2, np.nan])
+    lons = np.array([-83.7, -83.6, -83.7, -83.7])
+
+    cells = vec_latlng_to_cells(lats, lons, 12)
+
+    assert cells.dtype == np.int64
+    assert cells[0] == cells[2] == h3.latlng_to_cell(42.2, -83.7, 12)
+    assert cells[1] == h3.latlng_to_cell(42.3, -83.6, 12)
+    assert cells[3] == 0
+    assert len(vec_latlng_to_cells(np.array([]), np.array([]))) == 0
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from app.geo.geomath import num_bearing, num_haversine
+from app.models.Trip import Trip
+from app.models.TripDataCache import TripDataCache
+from app.models.TripSignals import TripSignals
+from app.repositories.trip import load_signals, load_signals_many
+from app.services.kinematics import (
+    GRAVITY,
+    ROLLING_RESISTANCE,
+    compute_kinematics,
+    kinematics_stats,
+)
+
+
+def make_signals(n=50, seed=8):
+    rng = np.random.default_rng(seed)
+    lats = 42.2 + np.cumsum(rng.normal(0.0, 1e-4, n))
+    lons = -83.7 + np.cumsum(rng.normal(0.0, 1e-4, n))
+    match_lats = lats.copy()
+    match_lats[3:4] = np.nan  # Falls back to the raw fix
+    gradient = rng.normal(0.0, 0.02, n).astype(np.float32)
+    gradient[0] = np.nan
+    return TripSignals(
+        signal_id=np.arange(n),
+        timestamp=np.arange(n, dtype=np.int64) * 1000 + rng.integers(0, 2, n) * 500,
+        lat=lats,
+        lon=lons,
+        match_lat=match_lats,
+        match_lon=lons,
+        speed=rng.uniform(0.0, 80.0, n).astype(np.float32),
+        gradient=gradient,
+    )
+
+
+def reference(signals):
+    """
+    Kinematics computed one signal at a time.
+    """
+    n = len(signals)
+    lats, lons, speeds = signals.lat, signals.lon, signals.speed.astype(float) / 3.6
+    rows = []
+    for i in range(n):
+        distance = (
+            num_haversine(lats[i - 1], lons[i - 1], lats[i], lons[i]) if i else 0.0
+        )
+        dt = (signals.timestamp[i] - signals.timestamp[i - 1]) / 1000.0 if i else 0.0
+        acceleration = (speeds[i] - speeds[i - 1]) / dt if i else np.nan
+        jerk = (acceleration - rows[i - 1][2]) / dt if i > 1 else np.nan
+        if 0 < i < n - 1:
+            turn = num_bearing(
+                lats[i], lons[i], lats[i + 1], lons[i + 1]
+            ) - num_bearing(lats[i - 1], lons[i - 1], lats[i], lons[i])
+            turn = (turn + 180.0) % 360.0 - 180.0
+        else:
+            turn = np.nan
+        gradient = 0.0 if np.isnan(signals.gradient[i]) else float(signals.gradient[i])
+        work = (speeds[i] ** 2 - speeds[i - 1] ** 2) / 2.0 if i else 0.0
+        work += GRAVITY * distance * (gradient + ROLLING_RESISTANCE)
+        rows.append(
+            (
+                distance,
+                dt,
+                acceleration,
+                jerk,
+                turn,
+                distance * gradient,
+                max(work, 0.0),
+            )
+        )
+    return np.array(rows)
+
+
+class TestKinematics:
+    def test_matches_reference(self):
+        signals = make_signals()
+        kinematics = compute_kinematics(signals)
+        columns = (
+            "distance",
+            "dt",
+            "acceleration",
+            "jerk",
+            "heading_change",
+            "grade_distance",
+            "energy",
+        )
+        expected = reference(signals)
+        for i, name in enumerate(columns):
+            assert kinematics.column(name) == pytest.approx(
+                expected[:, i], nan_ok=True, abs=1e-6
+            ), name
+
+    def test_stats(self):
+        kinematics = compute_kinematics(make_signals())
+        stats = kinematics_stats(kinematics)
+        assert stats["distance_km"] == pytest.approx(kinematics.distance.sum() / 1000)
+        assert stats["max_deceleration"] > 0.0 and stats["max_acceleration"] > 0.0
+        assert stats["climb_m"] >= 0.0 and stats["descent_m"] >= 0.0
+        assert kinematics_stats(compute_kinematics(TripSignals())) == {}
+
+    def test_single_signal(self):
+        kinematics = compute_kinematics(make_signals(1))
+        assert kinematics.distance.tolist() == [0.0]
+        assert np.isnan(kinematics.acceleration[0])
+
+    def test_cached_per_trip(self, eved_db):
+        cache = TripDataCache()
+        cache.clear()
+        trip = Trip(1, 10, 100, 1.0, 300.0, "", 0.0, "", "")
+        kinematics = trip.kinematics
+        assert len(kinematics) == len(trip.signals) == 5
+        assert trip.kinematics is kinematics
+        assert cache.peek("kinematics", 1) is kinematics
+
+        cache.invalidate(1)
+        assert cache.peek("kinematics", 1) is None
+        cache.clear()
+        assert cache.stats().hits == 0
+
+    def test_signals_stored_out_of_order(self, eved_db):
+        # Trip 1 stored newest first: its speed now falls 10 km/h per second
+        eved_db.execute_sql(
+            "UPDATE signal SET time_stamp = 4000 - time_stamp"
+            " WHERE vehicle_id = 10 AND trip_id = 100"
+        )
+        for signals in (load_signals(1), load_signals_many([1, 2])[1]):
+            assert (np.diff(signals.timestamp) > 0).all()
+            kinematics = compute_kinematics(signals)
+            assert kinematics.acceleration[1:] == pytest.approx(-10.0 / 3.6)
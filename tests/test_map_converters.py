@@ -192,6 +192,7 @@ class TestMapPolylineMapConverter:
             color="#FF0000",
             weight=3.0,
             opacity=0.8,
+            detail=sample_polyline.encoded_at_zoom,
         )
 
         # Verify bindings were set up
@@ -199,9 +200,10 @@ class TestMapPolylineMapConverter:
             (sample_polyline, "color", "color"),
             (sample_polyline, "weight", "weight"),
             (sample_polyline, "opacity", "opacity"),
+            (sample_polyline, "dash_array", "dash_array"),
         ]
 
-        assert mock_polyline.bind.call_count == 3
+        assert mock_polyline.bind.call_count == 4
         for expected_call in expected_bind_calls:
             mock_polyline.bind.assert_any_call(*expected_call)
 
@@ -239,9 +241,10 @@ class TestMapPolygonMapConverter:
             (sample_polygon, "fill", "fill"),
             (sample_polygon, "fill_color", "fill_color"),
             (sample_polygon, "fill_opacity", "fill_opacity"),
+            (sample_polygon, "dash_array", "dash_array"),
         ]
 
-        assert mock_polygon.bind.call_count == 6
+        assert mock_polygon.bind.call_count == 7
         for expected_call in expected_bind_calls:
             mock_polygon.bind.assert_any_call(*expected_call)
 
@@ -280,9 +283,10 @@ class TestMapCircleMapConverter:
             (sample_circle, "fill", "fill"),
             (sample_circle, "fill_color", "fill_color"),
             (sample_circle, "fill_opacity", "fill_opacity"),
+            (sample_circle, "dash_array", "dash_array"),
         ]
 
-        assert mock_circle.bind.call_count == 6
+        assert mock_circle.bind.call_count == 7
         for expected_call in expected_bind_calls:
             mock_circle.bind.assert_any_call(*expected_call)
 
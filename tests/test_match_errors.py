@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app.geo.geomath import vec_cross_track
+from app.repositories.trip import load_nodes, load_signals
+from app.services.matching import match_errors, offset_stats
+
+
+def brute_force(lats, lons, path_lats, path_lons):
+    """
+    Nearest segment of every point by exhaustive search, on the same
+    projection as `vec_cross_track`.
+    """
+    radius = 6378137.0
+    lat0, lon0 = np.radians(path_lats.mean()), np.radians(path_lons.mean())
+    px = (np.radians(path_lons) - lon0) * radius * np.cos(lat0)
+    py = (np.radians(path_lats) - lat0) * radius
+    x = (np.radians(lons) - lon0) * radius * np.cos(lat0)
+    y = (np.radians(lats) - lat0) * radius
+    dx, dy = np.diff(px), np.diff(py)
+    bx, by = x[:, None] - px[:-1], y[:, None] - py[:-1]
+    t = np.clip((bx * dx + by * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+    return np.hypot(bx - t * dx, by - t * dy).min(axis=1)
+
+
+class TestCrossTrack:
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(4)
+        path_lats = 42.2 + np.cumsum(rng.normal(0.0, 1e-4, 300))
+        path_lons = -83.7 + np.cumsum(rng.normal(0.0, 1e-4, 300))
+        lats = np.repeat(path_lats, 3) + rng.normal(0.0, 5e-5, 900)
+        lons = np.repeat(path_lons, 3) + rng.normal(0.0, 5e-5, 900)
+        offsets, along, segments = vec_cross_track(lats, lons, path_lats, path_lons)
+        assert offsets == pytest.approx(brute_force(lats, lons, path_lats, path_lons))
+        assert (segments >= 0).all() and (along >= 0.0).all()
+
+    def test_along_track(self):
+        # An L-shaped path: 0.01 degrees east, then 0.01 degrees north
+        path_lats = np.array([42.0, 42.0, 42.01])
+        path_lons = np.array([-84.0, -83.99, -83.99])
+        offsets, along, segments = vec_cross_track(
+            np.array([42.001, np.nan, 42.005]),
+            np.array([-83.995, -83.995, -83.989]),
+            path_lats,
+            path_lons,
+        )
+        east = 0.01 * np.radians(1.0) * 6378137.0 * np.cos(np.radians(42.0033333))
+        north = 0.001 * np.radians(1.0) * 6378137.0
+        assert offsets[0] == pytest.approx(north)
+        assert along[0] == pytest.approx(east / 2)
+        assert along[2] == pytest.approx(east + 5 * north)
+        assert np.isnan(offsets[1]) and segments.tolist() == [0, -1, 1]
+
+    def test_degenerate_paths(self):
+        point = np.array([42.001]), np.array([-84.0])
+        offsets, _, _ = vec_cross_track(*point, np.array([42.0]), np.array([-84.0]))
+        assert offsets[0] == pytest.approx(0.001 * np.radians(1.0) * 6378137.0)
+        offsets, _, segments = vec_cross_track(*point, np.array([]), np.array([]))
+        assert np.isnan(offsets[0]) and segments[0] == -1
+
+
+class TestMatchErrors:
+    @pytest.fixture
+    def signals(self, eved_db):
+        return load_signals(1)
+
+    def test_node_path(self, signals):
+        errors = match_errors(signals, load_nodes(1), "nodes")
+        assert errors.stats["count"] == 5
+        assert errors.stats["max"] == pytest.approx(0.0, abs=1e-6)
+
+    def test_match_path(self, signals):
+        errors = match_errors(signals)
+        assert errors.path == "match" and len(errors.offset) == 5
+        assert 0.0 < errors.stats["p50"] <= errors.stats["p95"] <= errors.stats["max"]
+        assert np.all(np.diff(errors.along) >= 0.0)
+
+    def test_invalid_path(self, signals):
+        with pytest.raises(ValueError):
+            match_errors(signals, path="route")
+        with pytest.raises(ValueError):
+            match_errors(signals, path="nodes")
+
+    def test_empty_stats(self):
+        assert offset_stats(np.array([np.nan])) == {"count": 0}
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from app.geo.geomath import vec_haversine
+from app.geo.neighbors import NearestNeighbors
+from app.models.TripModel import TripModel
+from app.repositories.trip import load_all_trips, load_nodes, load_signals
+from app.services.matching import snap_to_nodes
+from app.services.proximity import trip_proximity
+from nicemvvm.controls.leaflet.types import LatLng
+
+
+def random_walk(n, seed, step=1e-4):
+    rng = np.random.default_rng(seed)
+    return (
+        42.2 + np.cumsum(rng.normal(0.0, step, n)),
+        -83.7 + np.cumsum(rng.normal(0.0, step, n)),
+    )
+
+
+def brute_force(index, lats, lons, points_lats, points_lons):
+    x, y = index.project(points_lats, points_lons)
+    qx, qy = index.project(lats, lons)
+    return np.argmin((qx[:, None] - x) ** 2 + (qy[:, None] - y) ** 2, axis=1)
+
+
+class TestNearestNeighbors:
+    @pytest.mark.parametrize("max_pairs", [64, 1 << 18])
+    def test_matches_brute_force(self, max_pairs):
+        lats, lons = random_walk(2000, 1)
+        rng = np.random.default_rng(2)
+        q_lats = np.repeat(lats, 2) + rng.normal(0.0, 2e-4, 4000)
+        q_lons = np.repeat(lons, 2) + rng.normal(0.0, 2e-4, 4000)
+        index = NearestNeighbors(lats, lons, max_pairs=max_pairs)
+        distances, indices = index.query(q_lats, q_lons)
+        assert (indices == brute_force(index, q_lats, q_lons, lats, lons)).all()
+        exact = vec_haversine(q_lats, q_lons, lats[indices], lons[indices])
+        assert distances == pytest.approx(exact)
+
+    def test_far_and_missing_queries(self):
+        lats, lons = random_walk(500, 3)
+        index = NearestNeighbors(lats, lons, max_rings=2)
+        q_lats, q_lons = (
+            np.array([45.0, np.nan, lats[10]]),
+            np.array([-80.0, 0.0, lons[10]]),
+        )
+        distances, indices = index.query(q_lats, q_lons)
+        assert indices[0] == brute_force(index, q_lats[:1], q_lons[:1], lats, lons)[0]
+        assert indices[1] == -1 and np.isnan(distances[1])
+        assert indices[2] == 10 and distances[2] == pytest.approx(0.0)
+
+    def test_max_distance(self):
+        lats, lons = random_walk(500, 4)
+        q_lats, q_lons = random_walk(500, 5)
+        unbounded, nearest = NearestNeighbors(lats, lons).query(q_lats, q_lons)
+        distances, indices = NearestNeighbors(lats, lons).query(q_lats, q_lons, 100.0)
+        inside = unbounded <= 100.0
+        assert 0 < inside.sum() < len(inside)
+        assert (indices[inside] == nearest[inside]).all()
+        assert (indices[~inside] == -1).all() and np.isnan(distances[~inside]).all()
+
+    def test_skips_missing_points(self):
+        lats, lons = np.array([np.nan, 42.0, 42.1]), np.array([0.0, -84.0, -84.0])
+        _, indices = NearestNeighbors(lats, lons).query(
+            np.array([42.01]), np.array([-84.0])
+        )
+        assert indices.tolist() == [1]
+        empty = NearestNeighbors(np.array([np.nan]), np.array([np.nan]))
+        assert len(empty) == 0
+        assert empty.query(np.array([42.0]), np.array([-84.0]))[1].tolist() == [-1]
+
+
+class TestNeighborUses:
+    def test_snap_to_nodes(self, eved_db):
+        signals, nodes = load_signals(1), load_nodes(1)
+        distances, indices = snap_to_nodes(signals, nodes)
+        assert indices.tolist() == list(range(5))
+        assert distances == pytest.approx(np.zeros(5), abs=1e-6)
+
+    def test_trip_proximity(self, eved_db):
+        one, two = load_signals(1), load_signals(2)
+        assert trip_proximity(one, one)["shared"] == 1.0
+        stats = trip_proximity(two, one)
+        assert stats["count"] == 3 and stats["shared"] == 0.0
+        assert stats["max"] > 1000.0
+
+    def test_click_selects_nearest_trace(self, eved_db, map_view_model):
+        map_view_model.zoom = 16
+        for trip in TripModel().add_frame(load_all_trips()):
+            map_view_model.show_polyline(trip, "gps")
+
+        # Trip 2 starts at (42.25, -83.7)
+        map_view_model.context_location = LatLng(42.25001, -83.70)
+        assert map_view_model.selected_polyline.traj_id == 2
+        # A hundred meters away is more than a few pixels at zoom 16
+        assert map_view_model.find_trace(LatLng(42.2518, -83.70)) is None
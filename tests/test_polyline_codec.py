@@ -0,0 +1,140 @@
+import json
+import shutil
+import subprocess
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from app.geo.geomath import decode_polyline, encode_polyline, vec_decode_polyline
+from app.viewmodels.polyline import MapPolyline
+from nicemvvm.controls.leaflet.map import LeafletMap
+from nicemvvm.controls.leaflet.polyline import DECODE_JS, Polyline
+from nicemvvm.controls.leaflet.types import EncodedPath, LatLng
+
+# Reference example of the Google polyline format documentation
+GOOGLE_ENCODED = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+GOOGLE_LATS = np.array([38.5, 40.7, 43.252])
+GOOGLE_LONS = np.array([-120.2, -120.95, -126.453])
+
+
+def random_trace(n=5000, seed=7):
+    rng = np.random.default_rng(seed)
+    lats = 42.2 + np.cumsum(rng.normal(0.0, 1e-4, n))
+    lons = -83.7 + np.cumsum(rng.normal(0.0, 1e-4, n))
+    return lats, lons
+
+
+class TestPolylineCodec:
+    def test_google_example(self):
+        assert encode_polyline(GOOGLE_LATS, GOOGLE_LONS, precision=5) == GOOGLE_ENCODED
+        lats, lons = vec_decode_polyline(GOOGLE_ENCODED, precision=5)
+        assert np.allclose(lats, GOOGLE_LATS) and np.allclose(lons, GOOGLE_LONS)
+
+    @pytest.mark.parametrize("precision", [5, 6])
+    def test_round_trip(self, precision):
+        lats, lons = random_trace()
+        lats = np.r_[lats, -89.999999, 89.999999, 0.0]
+        lons = np.r_[lons, 179.999999, -179.999999, 0.0]
+        decoded = vec_decode_polyline(encode_polyline(lats, lons, precision), precision)
+        half_step = 0.5 * 10.0**-precision + 1e-12
+        assert np.abs(decoded[0] - lats).max() <= half_step
+        assert np.abs(decoded[1] - lons).max() <= half_step
+
+    def test_coordinate_order(self):
+        encoded = encode_polyline(GOOGLE_LATS, GOOGLE_LONS)
+        assert decode_polyline(encoded)[0] == pytest.approx([-120.2, 38.5])
+        assert decode_polyline(encoded, "latlon")[0] == pytest.approx([38.5, -120.2])
+
+    def test_missing_locations_are_dropped(self):
+        lats = np.array([42.0, np.nan, 42.1, 42.2])
+        lons = np.array([-83.0, -83.05, np.inf, -83.2])
+        decoded = vec_decode_polyline(encode_polyline(lats, lons))
+        assert np.allclose(decoded, [[42.0, 42.2], [-83.0, -83.2]])
+        assert encode_polyline(np.array([np.nan]), np.array([0.0])) == ""
+
+    def test_empty_and_invalid(self):
+        assert encode_polyline(np.array([]), np.array([])) == ""
+        assert decode_polyline("") == []
+        with pytest.raises(ValueError):
+            vec_decode_polyline("_p~iF")  # A latitude without its longitude
+        with pytest.raises(ValueError):
+            vec_decode_polyline("_p~iF~ps|")  # Truncated value
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="Needs node")
+    def test_browser_decoder(self):
+        lats, lons = random_trace(500)
+        encoded = encode_polyline(lats, lons)
+        script = f"console.log(JSON.stringify({DECODE_JS}({json.dumps(encoded)}, 6)))"
+        output = subprocess.run(
+            ["node", "-e", script], capture_output=True, text=True, check=True
+        )
+        points = np.array(json.loads(output.stdout))
+        assert np.abs(points[:, 0] - lats).max() <= 5e-7
+        assert np.abs(points[:, 1] - lons).max() <= 5e-7
+
+
+class TestEncodedTransport:
+    @pytest.fixture
+    def map_polyline(self):
+        lats, lons = random_trace()
+        return MapPolyline(
+            shape_id="1_gps",
+            traj_id=1,
+            vehicle_id=10,
+            km=1.0,
+            color="#800000",
+            weight=3.0,
+            opacity=0.6,
+            trace_name="gps",
+            locations=[LatLng(lat, lon) for lat, lon in zip(lats, lons)],
+        )
+
+    def test_encoded_matches_detail(self, map_polyline):
+        path = map_polyline.encoded_at_zoom(14)
+        lats, lons = vec_decode_polyline(path.encoded, path.precision)
+        expected = map_polyline.locations_at_zoom(14)
+        assert len(lats) == len(expected)
+        assert np.allclose(lats, [p.lat for p in expected], atol=5e-7)
+        assert np.allclose(lons, [p.lng for p in expected], atol=5e-7)
+        assert map_polyline.encoded_at_zoom(14) is path
+
+        map_polyline.locations = map_polyline.locations[:100]
+        assert map_polyline.encoded_at_zoom(14) is not path
+
+    def test_polyline_sends_encoded_path(self, map_polyline):
+        leaflet = Mock()
+        leaflet.zoom = 12
+        polyline = Polyline(
+            "1_gps", map_polyline.locations, detail=map_polyline.encoded_at_zoom
+        )
+        polyline.add_to(leaflet)
+        points, _ = leaflet.generic_layer.call_args.kwargs["args"]
+        assert points == []
+
+        layer = leaflet.generic_layer.return_value
+        (decode,) = [
+            call.args[1]
+            for call in layer.run_method.call_args_list
+            if call.args[0] == ":setLatLngs"
+        ]
+        assert json.dumps(map_polyline.encoded_at_zoom(12).encoded) in decode
+
+        polyline.points = [LatLng(42.0, -83.0)]
+        assert isinstance(polyline.points_at_zoom(12), EncodedPath)
+
+    def test_map_init_resends_encoded_path(self, map_polyline):
+        leaflet = Mock()
+        leaflet.zoom = 12
+        polyline = Polyline(
+            "1_gps", map_polyline.locations, detail=map_polyline.encoded_at_zoom
+        )
+        polyline.add_to(leaflet)
+        layer = leaflet.generic_layer.return_value
+        layer.run_method.reset_mock()
+
+        # The browser rebuilt the layer from its empty creation arguments
+        LeafletMap._on_detail_init(Mock(_polylines={"1_gps": polyline}), None)
+        (call,) = layer.run_method.call_args_list
+        assert call.args[0] == ":setLatLngs"
+        assert json.dumps(map_polyline.encoded_at_zoom(12).encoded) in call.args[1]
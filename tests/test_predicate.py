@@ -0,0 +1,47 @@
+import pytest
+
+from tools.database.sqlite.Predicate import (
+    AllOf,
+    AnyOf,
+    Condition,
+    to_sql,
+    where_clause,
+)
+
+COLUMNS = {"a": "t.a", "b": "t.b"}
+
+
+class TestPredicate:
+    def test_renders_nested_predicates(self):
+        predicate = AllOf(
+            (
+                Condition("a", ">=", 1),
+                AnyOf((Condition("b", "is null"), Condition("b", "<", 5))),
+            )
+        )
+        sql, parameters = to_sql(predicate, COLUMNS)
+        assert sql == "(t.a >= ?) and ((t.b is null) or (t.b < ?))"
+        assert parameters == [1, 5]
+
+    def test_where_clause(self):
+        assert where_clause([], COLUMNS) == ("", [])
+        sql, parameters = where_clause([Condition("a", "=", 2)], COLUMNS)
+        assert sql == "where (t.a = ?)"
+        assert parameters == [2]
+
+    def test_empty_groups(self):
+        assert to_sql(AllOf(()), COLUMNS)[0] == "1 = 1"
+        assert to_sql(AnyOf(()), COLUMNS)[0] == "1 = 0"
+
+    def test_in_binds_one_array(self):
+        sql, parameters = to_sql(Condition("a", "in", (3, 1, 2)), COLUMNS)
+        assert sql == "t.a in (select value from json_each(?))"
+        assert parameters == ["[3, 1, 2]"]
+
+    @pytest.mark.parametrize(
+        "predicate",
+        [Condition("c", "=", 1), Condition("a", "like", "%"), "a = 1"],
+    )
+    def test_rejects_unsafe_input(self, predicate):
+        with pytest.raises((ValueError, TypeError)):
+            to_sql(predicate, COLUMNS)
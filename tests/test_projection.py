@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from app.geo.geomath import (
+    delta_location,
+    vec_haversine,
+    x_meters_to_degrees,
+    y_meters_to_degrees,
+)
+from app.geo.projection import LocalProjection, projection_for
+from app.models.Trip import Trip
+from app.models.TripDataCache import TripDataCache
+from app.repositories.trip import load_nodes, load_signals
+from app.services.matching import match_errors, snap_to_nodes
+from app.services.proximity import trip_proximity
+from app.viewmodels.circle import MapCircle
+from nicemvvm.controls.leaflet.types import LatLng
+
+
+def random_pairs(projection, extent, n=20000, seed=5):
+    """
+    Random pairs of planar points within `extent` meters of the origin.
+    """
+    rng = np.random.default_rng(seed)
+    radius = extent * np.sqrt(rng.uniform(0.0, 1.0, (n, 2)))
+    angle = rng.uniform(0.0, 2.0 * np.pi, (n, 2))
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+class TestLocalProjection:
+    def test_round_trip(self):
+        projection = LocalProjection(42.28, -83.74)
+        lats = np.array([42.2, 42.3, np.nan])
+        lons = np.array([-83.8, -83.6, -83.7])
+        back_lats, back_lons = projection.inverse(*projection.forward(lats, lons))
+        assert back_lats[:2] == pytest.approx(lats[:2], abs=1e-12)
+        assert back_lons[:2] == pytest.approx(lons[:2], abs=1e-12)
+        assert np.isnan(back_lats[2])
+
+    @pytest.mark.parametrize("lat0", [0.0, 42.28, 60.0, 75.0])
+    @pytest.mark.parametrize("extent", [1e3, 1e4, 1e5])
+    def test_distance_error_bound(self, lat0, extent):
+        projection = LocalProjection(lat0, -83.74)
+        x, y = random_pairs(projection, extent)
+        lats, lons = projection.inverse(x, y)
+        exact = vec_haversine(lats[:, 0], lons[:, 0], lats[:, 1], lons[:, 1])
+        planar = np.hypot(x[:, 0] - x[:, 1], y[:, 0] - y[:, 1])
+        error = np.abs(planar - exact) / exact
+        assert error.max() <= projection.distance_error(extent)
+
+    def test_ann_arbor_trip(self):
+        # A 10 km trip around Ann Arbor is measured to 0.14%, or 1.4 m per km
+        assert LocalProjection(42.28, -83.74).distance_error(1e4) < 1.45e-3
+
+    def test_projection_for(self):
+        projection = projection_for(
+            np.array([42.0, np.nan, 42.2]), np.array([-84.0, -80.0, -83.8])
+        )
+        assert (projection.lat0, projection.lon0) == pytest.approx((42.1, -83.9))
+        empty = projection_for(np.array([np.nan]), np.array([np.nan]))
+        assert (empty.lat0, empty.lon0) == (0.0, 0.0)
+
+
+class TestProjectedGeometry:
+    def test_meters_to_degrees(self):
+        lat, lon = 42.28, -83.74
+        north, east = (
+            delta_location(lat, lon, 0.0, 500.0),
+            delta_location(lat, lon, 90.0, 500.0),
+        )
+        assert y_meters_to_degrees(500.0, lat, lon) == pytest.approx(north[0] - lat)
+        assert x_meters_to_degrees(500.0, lat, lon) == pytest.approx(
+            east[1] - lon, rel=1e-6
+        )
+
+    def test_circle_frame(self):
+        circle = MapCircle(
+            "circle", "#000", 1.0, 1.0, LatLng(42.28, -83.74), 800.0, True, "", 0.2
+        )
+        projection = circle.projection
+        assert (projection.lat0, projection.lon0) == (42.28, -83.74)
+        bounds = circle.get_bounds()
+        assert bounds.ne.lat == pytest.approx(
+            delta_location(42.28, -83.74, 0.0, 800.0)[0]
+        )
+        assert bounds.sw.lng == pytest.approx(
+            delta_location(42.28, -83.74, 270.0, 800.0)[1]
+        )
+
+        circle.center = LatLng(42.3, -83.7)
+        assert circle.projection is not projection
+        assert circle.projection.lat0 == 42.3
+
+
+class TestTripFrame:
+    def test_cached_with_trip_data(self, eved_db):
+        TripDataCache().clear()
+        trip = Trip(1, 10, 100, 1.0, 300.0, "", 0.0, "", "")
+        projection = trip.signals.projection
+        assert trip.signals.projection is projection
+        lats, lons = trip.signals.locations()
+        assert (projection.lat0, projection.lon0) == pytest.approx(
+            (lats.mean(), lons.mean())
+        )
+        TripDataCache().clear()
+
+    def test_shared_by_trip_computations(self, eved_db, monkeypatch):
+        signals, other, nodes = load_signals(1), load_signals(2), load_nodes(1)
+        # Built once, before the computations that reuse them
+        assert signals.projection is not other.projection
+
+        def rebuilt(*args):
+            raise AssertionError("Trip frame rebuilt")
+
+        monkeypatch.setattr("app.geo.geomath.projection_for", rebuilt)
+        monkeypatch.setattr("app.geo.neighbors.projection_for", rebuilt)
+        assert match_errors(signals).stats["count"] == 5
+        assert match_errors(signals, nodes, "nodes").stats["count"] == 5
+        assert snap_to_nodes(signals, nodes)[1].tolist() == list(range(5))
+        assert trip_proximity(signals, other)["count"] == 5
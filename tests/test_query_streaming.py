@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+
+import pytest
+
+from tools.database.sqlite.BaseDb import BaseDb
+from tools.database.sqlite.ConnectionPool import ConnectionPool
+
+
+@pytest.fixture
+def db(tmp_path):
+    filename = str(tmp_path / "stream.db")
+    conn = sqlite3.connect(filename)
+    conn.execute("CREATE TABLE item (item_id INTEGER PRIMARY KEY, value REAL)")
+    conn.executemany(
+        "INSERT INTO item VALUES (?, ?)", [(i, i * 0.5) for i in range(1, 1001)]
+    )
+    conn.commit()
+    conn.close()
+    yield BaseDb(filename, pool_size=1, pool_timeout=0.1)
+    ConnectionPool.close_all()
+
+
+class TestQueryStreaming:
+    def test_batches_are_bounded(self, db):
+        batches = list(db.query_batches("SELECT * FROM item", batch_size=300))
+        assert [len(batch) for batch in batches] == [300, 300, 300, 100]
+        assert batches[-1][-1] == (1000, 500.0)
+        assert db.pool.stats()["in_use"] == 0
+
+    def test_df_chunks(self, db):
+        chunks = list(
+            db.query_df_chunks(
+                "SELECT item_id, value FROM item WHERE item_id > ?", [900], 40
+            )
+        )
+        assert [len(chunk) for chunk in chunks] == [40, 40, 20]
+        assert list(chunks[0].columns) == ["item_id", "value"]
+        assert chunks[2]["item_id"].iloc[-1] == 1000
+
+    def test_empty_result(self, db):
+        assert list(db.query_df_chunks("SELECT * FROM item WHERE 0")) == []
+
+    def test_releases_connection_when_closed_early(self, db):
+        stream = db.query_batches("SELECT * FROM item", batch_size=10)
+        next(stream)
+        assert db.pool.stats()["in_use"] == 1
+
+        stream.close()
+        assert db.pool.stats()["in_use"] == 0
+        assert db.query_scalar("SELECT COUNT(*) FROM item") == 1000
+
+    def test_cancel_between_batches(self, db):
+        cancel = threading.Event()
+        seen = 0
+        for batch in db.query_batches(
+            "SELECT * FROM item", batch_size=100, cancel=cancel
+        ):
+            seen += len(batch)
+            cancel.set()
+        assert seen == 100
+        assert db.pool.stats()["in_use"] == 0
+
+    def test_cancel_interrupts_running_statement(self, db):
+        cancel = threading.Event()
+        cancel.set()
+        sql = """
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+            SELECT SUM(i) FROM (SELECT i FROM n LIMIT 100000000)
+        """
+        assert list(db.query_batches(sql, cancel=cancel)) == []
+
+        # The connection is reusable without the progress handler
+        assert db.query_scalar("SELECT COUNT(*) FROM item") == 1000
+
+    def test_invalid_batch_size(self, db):
+        with pytest.raises(ValueError):
+            next(db.query_batches("SELECT * FROM item", batch_size=0))
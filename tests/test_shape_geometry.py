@@ -0,0 +1,88 @@
+import math
+
+import pytest
+
+from app.geo.geomath import num_haversine
+from app.viewmodels.polyline import MapPolyline
+from app.viewmodels.shape_index import ShapeIndex
+from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
+from nicemvvm.observables.collections import ObservableList
+from tests.conftest import circle as make_circle
+from tests.conftest import square
+
+
+@pytest.fixture
+def polygon():
+    return square(42.0, -84.0)
+
+
+@pytest.fixture
+def circle():
+    return make_circle(42.0, -84.0, 1000.0)
+
+
+class TestGeometryCache:
+    def test_geometry_is_reused(self, polygon):
+        geometry, vertices = polygon.geometry, polygon.vertices
+        assert polygon.contains(LatLng(42.005, -83.995))
+        assert polygon.geometry is geometry and polygon.vertices is vertices
+
+        polygon.color = "#fff"
+        assert polygon.geometry is geometry
+
+    def test_polygon_follows_locations(self, polygon):
+        geometry = polygon.geometry
+        polygon.locations = square(43.0, -83.0).locations
+        assert polygon.geometry is not geometry
+        assert polygon.get_bounds().sw == LatLng(43.0, -83.0)
+        assert not polygon.contains(LatLng(42.005, -83.995))
+
+    def test_circle_follows_radius_and_center(self, circle):
+        north = circle.get_bounds().ne.lat
+        circle.radius = 2000.0
+        assert circle.get_bounds().ne.lat > north
+        assert circle.area == pytest.approx(math.pi * 2000.0**2)
+
+        circle.center = LatLng(43.0, -83.0)
+        bounds = circle.get_bounds()
+        assert bounds.sw.lat < 43.0 < bounds.ne.lat
+        assert bounds.sw.lng < -83.0 < bounds.ne.lng
+
+    def test_circle_vertices(self, circle):
+        distances = [
+            num_haversine(42.0, -84.0, lat, lng) for lat, lng in circle.vertices
+        ]
+        assert distances == pytest.approx([1000.0] * len(distances))
+        assert circle.geometry.contains(circle.geometry.centroid)
+
+    def test_polygon_area(self, polygon):
+        side_lat = num_haversine(42.0, -84.0, 42.01, -84.0)
+        side_lng = num_haversine(42.005, -84.0, 42.005, -83.99)
+        assert polygon.area == pytest.approx(side_lat * side_lng, rel=1e-3)
+
+    def test_polyline_bounds(self):
+        bounds = GeoBounds(LatLng(41.0, -85.0), LatLng(43.0, -83.0))
+        polyline = MapPolyline(
+            "1_gps",
+            1,
+            10,
+            1.0,
+            "#000",
+            3.0,
+            0.6,
+            "gps",
+            square(42.0, -84.0).locations,
+            bounds=bounds,
+        )
+        assert polyline.get_bounds() is bounds
+
+        polyline.locations = square(44.0, -82.0).locations
+        assert polyline.get_bounds().sw == LatLng(44.0, -82.0)
+
+    def test_index_follows_radius(self, circle):
+        index = ShapeIndex(ObservableList([circle]))
+        outside = LatLng(42.0, -84.0 + 0.02)
+        assert index.find(outside) is None
+
+        circle.radius = 2000.0
+        assert index.find(outside) is circle
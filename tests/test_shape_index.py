@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from app.geo.geomath import delta_location
+from app.viewmodels.polyline import MapPolyline
+from app.viewmodels.shape_index import ShapeIndex, TraceIndex
+from nicemvvm.controls.leaflet.types import LatLng
+from nicemvvm.observables.collections import ObservableList
+from tests.conftest import circle, square
+
+
+def linear_find(collections, pt):
+    for shapes in collections:
+        for shape in shapes:
+            if shape.contains(pt):
+                return shape
+    return None
+
+
+class TestShapeIndex:
+    @pytest.fixture
+    def shapes(self):
+        rng = np.random.default_rng(11)
+        polygons = ObservableList(
+            square(*rng.uniform((42.0, -84.0), (42.2, -83.8)), shape_id=f"area-{i}")
+            for i in range(200)
+        )
+        circles = ObservableList(
+            circle(
+                *rng.uniform((42.0, -84.0), (42.2, -83.8)),
+                500.0,
+                shape_id=f"circle-{i}",
+            )
+            for i in range(50)
+        )
+        return polygons, circles
+
+    def test_matches_linear_scan(self, shapes):
+        index = ShapeIndex(*shapes)
+        rng = np.random.default_rng(12)
+        points = [
+            LatLng(*rng.uniform((42.0, -84.0), (42.2, -83.8))) for _ in range(500)
+        ]
+        found = [index.find(pt) for pt in points]
+        assert any(shape is not None for shape in found)
+        assert found == [linear_find(shapes, pt) for pt in points]
+
+    def test_polygons_take_precedence(self):
+        polygons = ObservableList([square(42.0, -84.0)])
+        circles = ObservableList([circle(42.005, -83.995, 100.0, shape_id="circle")])
+        index = ShapeIndex(polygons, circles)
+        assert index.find(LatLng(42.005, -83.995)) is polygons[0]
+
+    def test_follows_collections(self, shapes):
+        polygons, circles = shapes
+        index = ShapeIndex(polygons, circles)
+        pt = LatLng(43.005, -83.005)
+        assert index.find(pt) is None
+
+        added = square(43.0, -83.01, shape_id="added")
+        polygons.append(added)
+        assert index.find(pt) is added
+
+        polygons.remove(added)
+        assert index.find(pt) is None
+
+        circles.extend([circle(43.005, -83.005, 50.0, shape_id="far")])
+        assert index.find(pt) is circles[-1]
+
+        circles.clear()
+        polygons.clear()
+        assert index.find(LatLng(42.1, -83.9)) is None
+
+    def test_follows_shape_changes(self):
+        polygon = square(42.0, -84.0)
+        index = ShapeIndex(ObservableList([polygon]))
+        assert index.find(LatLng(42.005, -83.995)) is polygon
+
+        polygon.locations = square(43.0, -83.0, shape_id="moved").locations
+        assert index.find(LatLng(42.005, -83.995)) is None
+        assert index.find(LatLng(43.005, -82.995)) is polygon
+
+
+def trace(shape_id, points):
+    return MapPolyline(
+        shape_id=shape_id,
+        traj_id=1,
+        vehicle_id=10,
+        km=1.0,
+        color="#000",
+        weight=3.0,
+        opacity=0.6,
+        trace_name="nodes",
+        locations=[LatLng(lat, lng) for lat, lng in points],
+    )
+
+
+class TestTraceIndex:
+    def test_click_mid_segment(self):
+        # Two nodes a kilometer apart, far beyond the tolerance of both ends
+        start = (42.25, -83.7)
+        end = delta_location(*start, 90.0, 1000.0)
+        polylines = ObservableList([trace("nodes", [start, end])])
+        index = TraceIndex(polylines)
+
+        middle = delta_location(*start, 90.0, 500.0)
+        near = LatLng(*delta_location(*middle, 0.0, 5.0))
+        found, distance = index.nearest(near, 15.0)
+        assert found is polylines[0]
+        assert distance == pytest.approx(5.0, abs=0.1)
+
+        far = LatLng(*delta_location(*middle, 0.0, 30.0))
+        found, distance = index.nearest(far, 15.0)
+        assert found is None and np.isnan(distance)
+
+    def test_follows_collection(self):
+        polylines = ObservableList([trace("first", [(42.0, -84.0), (42.0, -83.99)])])
+        index = TraceIndex(polylines)
+        pt = LatLng(43.0, -83.005)
+        assert index.nearest(pt, 50.0)[0] is None
+
+        polylines.append(trace("second", [(43.0, -83.01), (43.0, -83.0)]))
+        assert index.nearest(pt, 50.0)[0] is polylines[1]
+        assert TraceIndex(ObservableList()).nearest(pt, 50.0)[0] is None
@@ -0,0 +1,109 @@
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from app.geo.geomath import simplification_importance, zoom_tolerance
+from app.viewmodels.polyline import MapPolyline
+from nicemvvm.controls.leaflet.polyline import Polyline
+from nicemvvm.controls.leaflet.types import LatLng
+
+
+def random_trace(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    lats = 42.2 + np.cumsum(rng.normal(0.0, 1e-5, n))
+    lons = -83.7 + np.cumsum(rng.normal(0.0, 1e-5, n))
+    return lats, lons
+
+
+def to_meters(lats, lons):
+    radius = 6378137.0
+    scale = np.cos(np.radians(np.mean(lats)))
+    return np.radians(lons) * radius * scale, np.radians(lats) * radius
+
+
+def max_deviation(lats, lons, keep):
+    """
+    Largest distance from a dropped vertex to the simplified segment that
+    replaces it.
+    """
+    x, y = to_meters(lats, lons)
+    kept = np.flatnonzero(keep)
+    worst = 0.0
+    for first, last in zip(kept[:-1], kept[1:]):
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first:last] - x[first], y[first:last] - y[first]
+        t = np.clip((px * dx + py * dy) / max(dx * dx + dy * dy, 1e-12), 0.0, 1.0)
+        worst = max(worst, float(np.hypot(px - t * dx, py - t * dy).max()))
+    return worst
+
+
+class TestSimplificationImportance:
+    def test_endpoints_are_kept(self):
+        importance = simplification_importance(*random_trace(10))
+        assert np.isinf(importance[[0, -1]]).all()
+        assert simplification_importance(np.array([]), np.array([])).size == 0
+        assert np.isinf(simplification_importance(np.array([1.0]), np.array([2.0])))
+
+    def test_collinear_vertices_are_dropped(self):
+        lats = np.linspace(42.0, 42.1, 11)
+        importance = simplification_importance(lats, np.full(11, -83.7))
+        assert np.allclose(importance[1:-1], 0.0, atol=1e-6)
+
+    @pytest.mark.parametrize("tolerance", [0.5, 2.0, 10.0, 50.0])
+    def test_within_tolerance(self, tolerance):
+        lats, lons = random_trace()
+        keep = simplification_importance(lats, lons) >= tolerance
+        assert keep.sum() < len(lats)
+        assert max_deviation(lats, lons, keep) <= tolerance + 1e-6
+
+    def test_levels_are_nested(self):
+        importance = simplification_importance(*random_trace())
+        coarse, fine = importance >= 20.0, importance >= 5.0
+        assert not (coarse & ~fine).any()
+
+    def test_zoom_tolerance(self):
+        assert zoom_tolerance(0, 0.0, pixels=1.0) == pytest.approx(156543.03392)
+        assert zoom_tolerance(11, 42.0) == pytest.approx(zoom_tolerance(10, 42.0) / 2)
+
+
+class TestLevelOfDetail:
+    @pytest.fixture
+    def map_polyline(self):
+        lats, lons = random_trace()
+        return MapPolyline(
+            shape_id="1_gps",
+            traj_id=1,
+            vehicle_id=10,
+            km=1.0,
+            color="#800000",
+            weight=3.0,
+            opacity=0.6,
+            trace_name="gps",
+            locations=[LatLng(lat, lon) for lat, lon in zip(lats, lons)],
+        )
+
+    def test_detail_grows_with_zoom(self, map_polyline):
+        sizes = [len(map_polyline.locations_at_zoom(zoom)) for zoom in (8, 12, 16)]
+        assert sizes[0] < sizes[1] < sizes[2] <= len(map_polyline.locations)
+        first = map_polyline.locations_at_zoom(8)[0]
+        assert first is map_polyline.locations[0]
+
+    def test_polyline_swaps_detail_on_zoom(self, map_polyline):
+        leaflet = Mock()
+        leaflet.zoom = 10
+        polyline = Polyline(
+            "1_gps", map_polyline.locations, detail=map_polyline.locations_at_zoom
+        )
+        polyline.add_to(leaflet)
+        points, _ = leaflet.generic_layer.call_args.kwargs["args"]
+        assert points == map_polyline.locations_at_zoom(10)
+
+        layer = leaflet.generic_layer.return_value
+        polyline.set_zoom(15)
+        layer.run_method.assert_called_with(
+            "setLatLngs", map_polyline.locations_at_zoom(15)
+        )
+        calls = layer.run_method.call_count
+        polyline.set_zoom(15)
+        assert layer.run_method.call_count == calls
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.models.Trip import Trip
+from app.models.TripDataCache import TripDataCache
+from nicemvvm.singleton import singleton
+
+
+@pytest.fixture
+def cache(eved_db, monkeypatch):
+    cache = TripDataCache()
+    cache.clear()
+    monkeypatch.setattr(cache, "max_bytes", cache.max_bytes)
+    yield cache
+    cache.clear()
+
+
+def make_trip(traj_id: int) -> Trip:
+    return Trip(
+        traj_id=traj_id,
+        vehicle_id=10,
+        trip_id=100,
+        km=1.0,
+        duration=60.0,
+        engine="",
+        weight=0.0,
+        start="",
+        end="",
+    )
+
+
+class TestTripDataCache:
+    def test_loads_on_miss_and_hits_after(self, cache):
+        trip = make_trip(1)
+        assert not trip.has_signals
+
+        assert len(trip.signals) == 5
+        assert len(trip.signals) == 5
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.bytes == trip.signals.nbytes
+
+    def test_evicts_least_recently_used(self, cache):
+        one = cache.get("signals", 1)
+        cache.get("signals", 2)
+        cache.max_bytes = one.nbytes + make_trip(3).signals.nbytes
+        cache.clear()
+
+        cache.get("signals", 1)
+        cache.get("signals", 2)
+        cache.get("signals", 1)  # 1 becomes the most recently used
+        cache.get("signals", 3)
+
+        assert cache.peek("signals", 2) is None
+        assert cache.peek("signals", 1) is not None
+        assert cache.stats().evictions >= 1
+        assert cache.stats().bytes <= cache.max_bytes
+
+        # Evicted data is reloaded transparently
+        assert len(make_trip(2).signals) == 3
+
+    def test_oversized_data_is_not_cached(self, cache):
+        cache.max_bytes = 16
+        assert len(cache.get("signals", 1)) == 5
+        assert cache.stats().entries == 0
+
+    def test_async_load(self, cache):
+        trip = make_trip(3)
+        asyncio.run(trip.load_nodes_async())
+        assert trip.has_nodes
+        assert len(trip.nodes) == 4
+
+
+class TestSingleton:
+    def test_created_once_across_threads(self):
+        created = []
+
+        @singleton
+        class Slow:
+            def __init__(self):
+                created.append(threading.current_thread().name)
+                time.sleep(0.01)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            instances = list(executor.map(lambda _: Slow(), range(8)))
+        assert len(created) == 1
+        assert all(instance is instances[0] for instance in instances)
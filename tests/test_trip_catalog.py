@@ -0,0 +1,207 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.converters.trip import TripToDictConverter
+from app.models import TripCatalog as catalog_module
+from app.models.TripCatalog import TripCatalog
+from app.models.TripModel import TripModel
+from app.repositories.trip import CATALOG_SORT_KEYS, load_trip_page
+from nicemvvm.controls.grid_view import parse_filter_model
+from nicemvvm.datasource import RowRequest, SortSpec
+
+
+@pytest.fixture
+def catalog_db(eved_db):
+    # 20 more trips, with start times repeating in pairs and running backwards
+    eved_db.execute_sql(
+        "INSERT INTO trajectory VALUES (?, 10, ?, 1000.0, 60.0, ?, ?)",
+        [
+            (traj_id, traj_id, f"2017-10-{30 - traj_id // 2:02d} 08:00:00.000", "")
+            for traj_id in range(4, 24)
+        ],
+        many=True,
+    )
+    return eved_db
+
+
+def page_ids(**kwargs):
+    return load_trip_page(**kwargs)["traj_id"].tolist()
+
+
+def fetch(catalog, start, end, sort=None, filter_model=None):
+    request = RowRequest(start, end, sort or [], parse_filter_model(filter_model or {}))
+    return asyncio.run(catalog.get_rows(request))
+
+
+def block_ids(block):
+    return [trip.traj_id for trip in block.rows]
+
+
+class TestTripPages:
+    def test_keyset_pages_match_offset_pages(self, catalog_db):
+        for sort in ("traj_id", "dt_ini"):
+            for descending in (False, True):
+                everything = page_ids(sort=sort, descending=descending, limit=100)
+                assert len(everything) == 23
+
+                pages, after = [], None
+                while True:
+                    page = load_trip_page(
+                        sort=sort, descending=descending, after=after, limit=5
+                    )
+                    if page.empty:
+                        break
+                    pages.extend(page["traj_id"].tolist())
+                    after = page[list(CATALOG_SORT_KEYS[sort])].iloc[-1].tolist()
+                assert pages == everything
+
+    def test_keyset_pages_cross_null_keys(self, catalog_db):
+        catalog_db.execute_sql(
+            "UPDATE trajectory SET length_m = NULL, dt_end = NULL "
+            "WHERE traj_id BETWEEN 4 AND 10"
+        )
+        for sort in ("length_m", "dt_end"):
+            for descending in (False, True):
+                everything = page_ids(sort=sort, descending=descending, limit=100)
+                pages, after = [], None
+                while True:
+                    page = load_trip_page(
+                        sort=sort, descending=descending, after=after, limit=3
+                    )
+                    if page.empty:
+                        break
+                    pages.extend(page["traj_id"].tolist())
+                    after = page[list(CATALOG_SORT_KEYS[sort])].iloc[-1].tolist()
+                assert pages == everything and len(pages) == 23
+
+    def test_offset_after_keyset(self, catalog_db):
+        assert page_ids(after=(5,), offset=2, limit=3) == [8, 9, 10]
+
+    def test_invalid_sort(self, catalog_db):
+        with pytest.raises(ValueError):
+            load_trip_page(sort="km")
+
+
+class TestTripCatalog:
+    def test_sequential_blocks_use_bookmarks(self, catalog_db):
+        catalog = TripCatalog(TripModel())
+
+        first = fetch(catalog, 0, 10)
+        second = fetch(catalog, 10, 20)
+        last = fetch(catalog, 20, 30)
+
+        ids = [trip.traj_id for block in (first, second, last) for trip in block.rows]
+        assert ids == list(range(1, 24))
+        assert first.last_row == 23
+        assert last.last_row == 23
+
+    def test_jump_and_sort(self, catalog_db):
+        catalog = TripCatalog(TripModel())
+        block = fetch(catalog, 15, 20, [SortSpec("start", descending=True)])
+        expected = page_ids(sort="dt_ini", descending=True, limit=100)[15:20]
+        assert [trip.traj_id for trip in block.rows] == expected
+
+    def test_unsupported_sort_falls_back_to_traj_id(self, catalog_db):
+        catalog = TripCatalog(TripModel())
+        block = fetch(catalog, 0, 3, [SortSpec("engine")])
+        assert [trip.traj_id for trip in block.rows] == [1, 2, 3]
+
+    def test_trips_are_shared_with_model(self, catalog_db):
+        model = TripModel()
+        block = fetch(TripCatalog(model), 0, 5)
+        assert model.get(3) is block.rows[2]
+        assert model.get(999) is None
+
+    def test_model_holds_trips_weakly(self, catalog_db):
+        model = TripModel()
+        block = fetch(TripCatalog(model), 0, 5)
+        del block
+        gc.collect()
+        assert len(model.trips) == 0
+        assert model.get(3).traj_id == 3
+
+    def test_converter_resolves_rows_through_model(self, catalog_db):
+        model = TripModel()
+        converter = TripToDictConverter(model)
+        block = fetch(TripCatalog(model), 0, 5)
+        row = converter.convert(block.rows[2])
+        assert converter.reverse_convert(row) is block.rows[2]
+        assert converter.reverse_convert({}) is None
+
+    def test_sorts_on_every_column(self, catalog_db):
+        catalog = TripCatalog(TripModel())
+        block = fetch(catalog, 0, 30, [SortSpec("km", descending=True)])
+        lengths = [trip.km for trip in block.rows]
+        assert lengths == sorted(lengths, reverse=True)
+        # Ties are ordered by trip id, in the same direction
+        assert block_ids(block)[:3] == [3, 2, 23]
+
+
+class TestTripCatalogFilters:
+    def test_vehicle_and_date_range(self, catalog_db):
+        block = fetch(
+            TripCatalog(TripModel()),
+            0,
+            100,
+            [SortSpec("start")],
+            {
+                "vehicle_id": {"filterType": "number", "type": "equals", "filter": 10},
+                "start": {
+                    "filterType": "date",
+                    "type": "inRange",
+                    "dateFrom": "2017-10-25 00:00:00",
+                    "dateTo": "2017-10-26 00:00:00",
+                },
+            },
+        )
+        # Days 26 and 25 hold trips 8, 9 and 10, 11
+        assert block_ids(block) == [10, 11, 8, 9]
+        assert block.last_row == 4
+
+    def test_km_equality_matches_rounded_value(self, catalog_db):
+        model = {"km": {"filterType": "number", "type": "equals", "filter": 2.0}}
+        block = fetch(TripCatalog(TripModel()), 0, 100, filter_model=model)
+        assert block_ids(block) == [2]
+
+    def test_combined_conditions(self, catalog_db):
+        model = {
+            "traj_id": {
+                "filterType": "number",
+                "operator": "OR",
+                "conditions": [
+                    {"filterType": "number", "type": "lessThan", "filter": 3},
+                    {"filterType": "number", "type": "greaterThan", "filter": 21},
+                ],
+            },
+            "end": {"filterType": "date", "type": "notBlank"},
+        }
+        block = fetch(TripCatalog(TripModel()), 0, 100, filter_model=model)
+        assert block_ids(block) == [1, 2, 22, 23]
+
+    def test_invalid_filter_field(self, catalog_db):
+        model = {"engine": {"filterType": "text", "type": "equals", "filter": "x"}}
+        with pytest.raises(ValueError):
+            fetch(TripCatalog(TripModel()), 0, 10, filter_model=model)
+
+    def test_results_cached_per_signature(self, catalog_db, monkeypatch):
+        calls = []
+        load = catalog_module.load_trip_page_async
+
+        async def counting_load(*args, **kwargs):
+            calls.append(kwargs["filters"])
+            return await load(*args, **kwargs)
+
+        monkeypatch.setattr(catalog_module, "load_trip_page_async", counting_load)
+        catalog = TripCatalog(TripModel())
+        model = {"vehicle_id": {"filterType": "number", "type": "equals", "filter": 11}}
+
+        assert block_ids(fetch(catalog, 0, 10, filter_model=model)) == [3]
+        assert block_ids(fetch(catalog, 0, 10)) == list(range(1, 11))
+        assert block_ids(fetch(catalog, 0, 10, filter_model=model)) == [3]
+        assert len(calls) == 2
+
+        catalog.refresh()
+        fetch(catalog, 0, 10, filter_model=model)
+        assert len(calls) == 3
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from app.models.TripModel import TripModel
+from app.repositories.trip import (
+    load_nodes,
+    load_nodes_many,
+    load_nodes_many_async,
+    load_signals,
+    load_signals_async,
+    load_signals_many,
+    load_trip,
+)
+from tests.conftest import TRIPS
+
+
+class TestBatchLoading:
+    def test_load_signals_many_matches_single(self, eved_db):
+        traj_ids = [traj_id for traj_id, *_ in TRIPS]
+        many = load_signals_many(traj_ids, chunk_size=2)
+
+        assert sorted(many) == traj_ids
+        for traj_id in traj_ids:
+            single = load_signals(traj_id)
+            np.testing.assert_array_equal(many[traj_id].signal_id, single.signal_id)
+            np.testing.assert_array_equal(many[traj_id].lat, single.lat)
+
+    def test_load_signals_many_missing_trip(self, eved_db):
+        many = load_signals_many([2, 99, 2])
+        assert list(many) == [2, 99]
+        assert len(many[2]) == 3
+        assert len(many[99]) == 0
+
+    def test_load_nodes_many(self, eved_db):
+        many = load_nodes_many([1, 3])
+        assert len(many[1]) == 5
+        assert len(many[3]) == 4
+        assert set(many[3].column("traj_id")) == {3}
+        assert many[1][0].match_error is None
+        np.testing.assert_array_equal(many[1].node_id, load_nodes(1).node_id)
+
+
+class TestAsyncLoading:
+    def test_load_signals_async(self, eved_db):
+        async def load():
+            return await asyncio.gather(
+                load_signals_async(1), load_nodes_many_async([1, 2])
+            )
+
+        signals, nodes = asyncio.run(load())
+        np.testing.assert_array_equal(signals.signal_id, load_signals(1).signal_id)
+        assert len(nodes[2]) == 3
+
+    def test_load_details_async_off_loop(self, eved_db, monkeypatch):
+        threads = []
+
+        def recording_load_trip(traj_id):
+            threads.append(threading.current_thread().name)
+            return load_trip(traj_id)
+
+        monkeypatch.setattr("app.models.TripModel.load_trip", recording_load_trip)
+        trips = asyncio.run(TripModel().load_details_async([2, 1]))
+        assert [trip.traj_id for trip in trips] == [2, 1]
+        assert len(trips[0].signals) == 3 and len(trips[1].nodes) == 5
+        assert threads and all(name.startswith("repository") for name in threads)
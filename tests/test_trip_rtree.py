@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.repositories.trip import has_trip_rtree, trips_in_bounds
+from app.services.spatial import build_trip_rtree
+from nicemvvm.controls.leaflet.types import GeoBounds, LatLng
+
+
+def view(south, west, north, east):
+    return GeoBounds(LatLng(south, west), LatLng(north, east))
+
+
+def in_view(bounds, **kwargs):
+    return trips_in_bounds(bounds, **kwargs)["traj_id"].tolist()
+
+
+@pytest.fixture
+def rtree_db(eved_db):
+    build_trip_rtree(eved_db, segment_size=2)
+    return eved_db
+
+
+class TestTripRTree:
+    def test_build(self, rtree_db):
+        assert has_trip_rtree(rtree_db)
+        # Trips of 5, 3 and 4 points in segments of 2
+        boxes = rtree_db.query_df("select traj_id from trip_rtree")
+        assert sorted(boxes["traj_id"].tolist()) == [1, 1, 1, 2, 2, 3, 3]
+        assert build_trip_rtree(rtree_db) == 3
+
+    def test_trips_in_bounds(self, rtree_db):
+        assert in_view(view(42.0, -84.0, 43.0, -83.0)) == [1, 2, 3]
+        assert in_view(view(42.24, -83.71, 42.26, -83.69)) == [2]
+        assert in_view(view(42.203, -83.6965, 42.2035, -83.696)) == [1]
+        assert in_view(view(42.0, -84.0, 42.1, -83.9)) == []
+        assert in_view(view(42.0, -84.0, 43.0, -83.0), limit=2) == [1, 2]
+
+    def test_segment_edges(self, rtree_db):
+        # Between the last point of a segment and the first of the next one
+        assert in_view(view(42.2015, -83.6985, 42.2016, -83.6984)) == [1]
+
+    def test_without_index(self, eved_db):
+        assert in_view(view(42.0, -84.0, 43.0, -83.0)) == []
+
+
+class TestTripsInView:
+    def test_find_trips_in_view(self, rtree_db, map_view_model):
+        view_model = map_view_model
+        bounds = view(42.24, -83.71, 42.26, -83.69)
+        view_model.view_bounds = bounds
+        asyncio.run(view_model.find_trips_in_view(bounds))
+        assert [trip.traj_id for trip in view_model.trips_in_view] == [2]
+
+        # Stale results are dropped
+        view_model.view_bounds = view(42.0, -84.0, 43.0, -83.0)
+        asyncio.run(view_model.find_trips_in_view(bounds))
+        assert [trip.traj_id for trip in view_model.trips_in_view] == [2]
@@ -0,0 +1,107 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.models.Signal import Signal
+from app.models.TripSignals import TripSignals
+
+
+@pytest.fixture
+def signal_rows():
+    return [
+        (
+            1,
+            1.5,
+            1000,
+            7,
+            3,
+            42.20,
+            -83.70,
+            42.201,
+            -83.701,
+            10.0,
+            250.0,
+            251.0,
+            0.5,
+            11,
+        ),
+        (
+            2,
+            1.5,
+            2000,
+            7,
+            3,
+            42.25,
+            -83.75,
+            42.251,
+            -83.751,
+            20.0,
+            252.0,
+            252.5,
+            None,
+            12,
+        ),
+        (
+            3,
+            1.5,
+            3000,
+            7,
+            3,
+            42.30,
+            -83.65,
+            42.301,
+            -83.651,
+            30.0,
+            254.0,
+            254.0,
+            -0.5,
+            13,
+        ),
+    ]
+
+
+class TestTripSignals:
+    def test_from_cursor(self, signal_rows):
+        conn = sqlite3.connect(":memory:")
+        conn.execute(f"CREATE TABLE signal ({', '.join(TripSignals.names())})")
+        conn.executemany(
+            f"INSERT INTO signal VALUES ({', '.join('?' * 14)})", signal_rows
+        )
+
+        cursor = conn.execute(f"SELECT {', '.join(TripSignals.names())} FROM signal")
+        signals = TripSignals.from_cursor(cursor, batch_size=2)
+
+        assert len(signals) == 3
+        assert signals.lat.dtype == np.float64
+        assert signals.lat.flags.c_contiguous
+        np.testing.assert_array_equal(signals.timestamp, [1000, 2000, 3000])
+        assert np.isnan(signals.gradient[1])
+
+    def test_row_view(self, signal_rows):
+        signals = TripSignals.from_rows(signal_rows)
+
+        row = signals[1]
+        assert isinstance(row, Signal)
+        assert row.signal_id == 2
+        assert row.lat == pytest.approx(42.25)
+        assert row.gradient is None
+        assert [s.signal_id for s in signals] == [1, 2, 3]
+
+    def test_slicing(self, signal_rows):
+        signals = TripSignals.from_rows(signal_rows)
+
+        assert len(signals[1:]) == 2
+        fast = signals[signals.speed > 15.0]
+        assert isinstance(fast, TripSignals)
+        np.testing.assert_array_equal(fast.signal_id, [2, 3])
+
+    def test_empty(self):
+        signals = TripSignals.empty()
+        assert len(signals) == 0
+        assert signals.nbytes == 0
+        assert len(TripSignals.from_rows([])) == 0
+
+    def test_mismatched_columns(self):
+        with pytest.raises(ValueError):
+            TripSignals(signal_id=[1, 2], day_num=[1.0])
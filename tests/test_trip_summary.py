@@ -0,0 +1,65 @@
+import pytest
+
+from app.models.TripDataCache import TripDataCache
+from app.models.TripModel import TripModel
+from app.repositories.trip import has_trip_summary, load_trip
+from app.services.summary import build_trip_summaries
+from app.viewmodels.map import summary_bounds
+
+
+@pytest.fixture
+def summary_db(eved_db):
+    build_trip_summaries(eved_db, chunk_size=2)
+    return eved_db
+
+
+class TestTripSummary:
+    def test_build(self, summary_db):
+        assert has_trip_summary(summary_db)
+        rows = summary_db.query_df("select * from trip_summary order by traj_id")
+        assert rows["traj_id"].tolist() == [1, 2, 3]
+        assert rows["point_count"].tolist() == [5, 3, 4]
+
+        first = rows.iloc[0]
+        assert first["node_count"] == 5
+        assert first["min_speed"] == 0.0
+        assert first["max_speed"] == 40.0
+        assert first["avg_speed"] == pytest.approx(20.0)
+        assert first["elevation_gain"] == pytest.approx(4.0)
+        assert first["h3_count"] == 5
+        assert first["start_lat"] == pytest.approx(42.20)
+        assert first["end_lat"] == pytest.approx(42.204)
+        # The box covers the map-matched points too
+        assert first["min_lat"] == pytest.approx(42.20)
+        assert first["max_lat"] == pytest.approx(42.2041)
+
+    def test_rebuild_replaces_rows(self, summary_db):
+        assert build_trip_summaries(summary_db) == 3
+        assert summary_db.query_scalar("select count(*) from trip_summary") == 3
+
+    def test_trip_carries_summary(self, summary_db):
+        trip = TripModel().add_frame(load_trip(2))[0]
+        assert trip.summary.point_count == 3
+        assert trip.summary.node_count == 3
+        assert isinstance(trip.summary.point_count, int)
+
+        bounds = summary_bounds(trip.summary)
+        assert bounds.sw.lat == pytest.approx(42.25)
+        assert bounds.ne.lat == pytest.approx(42.2521)
+
+    def test_no_summary_table(self, eved_db):
+        assert not has_trip_summary(eved_db)
+        trip = TripModel().add_frame(load_trip(1))[0]
+        assert trip.summary is None
+
+    def test_node_trace_bounds(self, summary_db, map_view_model):
+        # Nodes may lie outside the box of the signals
+        summary_db.execute_sql("UPDATE node SET latitude = 42.3 WHERE node_id = 5")
+        TripDataCache().clear()
+        trip = TripModel().add_frame(load_trip(1))[0]
+
+        map_view_model.show_polyline(trip, "gps")
+        map_view_model.show_polyline(trip, "nodes")
+        gps, nodes = map_view_model.polylines
+        assert gps.get_bounds().ne.lat == pytest.approx(42.2041)
+        assert nodes.get_bounds().ne.lat == pytest.approx(42.3)
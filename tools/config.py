@@ -1,8 +1,26 @@
+import functools
 from pathlib import Path
 from typing import Dict
 
 import tomli
 
 
+@functools.cache
 def load_config() -> Dict:
+    """
+    Loads and parses the application configuration file.
+    The parsed configuration is cached for the lifetime of the process, so
+    callers must treat the returned dictionary as read-only. Use
+    `reload_config` to force a new read from disk.
+    :return: Configuration dictionary
+    """
     return tomli.loads(Path("./config.toml").read_text(encoding="utf-8"))
+
+
+def reload_config() -> Dict:
+    """
+    Discards the cached configuration and reads it again from disk.
+    :return: Configuration dictionary
+    """
+    load_config.cache_clear()
+    return load_config()
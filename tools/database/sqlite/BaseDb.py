@@ -1,18 +1,52 @@
 import contextlib
 import sqlite3
+import threading
 from sqlite3 import Connection
-from typing import List
+from typing import Iterator, List, Tuple
 
 import pandas.io.sql as sqlio
 from pandas import DataFrame
 
+from tools.database.sqlite.ConnectionPool import ConnectionPool
+from tools.database.sqlite.ConnectionProfile import ConnectionProfile
+
+# Number of SQLite virtual machine instructions between cancellation checks
+CANCEL_CHECK_STEPS = 10_000
+
 
 class BaseDb(object):
-    def __init__(self, db_name):
+    def __init__(
+        self,
+        db_name,
+        pool_size: int = 4,
+        pool_timeout: float = 30.0,
+        check_interval: float = 60.0,
+        profile: ConnectionProfile | None = None,
+    ):
         self.db_name = db_name
+        self.profile = profile if profile is not None else ConnectionProfile()
+        self.pool = ConnectionPool.get(
+            db_name,
+            size=pool_size,
+            timeout=pool_timeout,
+            check_interval=check_interval,
+            factory=self.profile.connect_reader,
+        )
 
     def connect(self) -> Connection:
-        return sqlite3.connect(self.db_name, check_same_thread=True)
+        """
+        Opens a dedicated connection, used for writes.
+        Reads go through the shared connection pool, see `connection`.
+        """
+        return self.profile.connect_writer(self.db_name)
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """
+        Borrows a read connection from the shared pool for the calling thread.
+        """
+        with self.pool.connection() as conn:
+            yield conn
 
     def execute_sql(self, sql, parameters=None, many=False) -> None:
         if parameters is None:
@@ -32,9 +66,9 @@ class BaseDb(object):
     def query_df(self, sql: str, parameters=None) -> DataFrame:
         """
         Execute SQL query and return results as DataFrame.
-        Use chunk_size for large result sets to process data in chunks.
+        Use `query_df_chunks` for large result sets to process data in chunks.
         """
-        with self.connect() as conn:
+        with self.connection() as conn:
             df = sqlio.read_sql_query(sql, conn, params=parameters)
         return df
 
@@ -45,26 +79,95 @@ class BaseDb(object):
     def query(self, sql, parameters=None):
         if parameters is None:
             parameters = []
-        conn = self.connect()
-        cur = conn.cursor()
-        result = None
-        try:
-            result = list(cur.execute(sql, parameters))
-        finally:
-            cur.close()
-            conn.close()
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                result = list(cur.execute(sql, parameters))
+            finally:
+                cur.close()
         return result
 
     @contextlib.contextmanager
     def query_iterator(self, sql, parameters=None):
         if parameters is None:
             parameters = []
-        conn = self.connect()
-        cur = conn.cursor()
-        try:
-            yield cur.execute(sql, parameters)
-        finally:
-            cur.close()
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur.execute(sql, parameters)
+            finally:
+                cur.close()
+
+    def query_batches(
+        self,
+        sql: str,
+        parameters=None,
+        batch_size: int = 10_000,
+        cancel: threading.Event | None = None,
+    ) -> Iterator[List[Tuple]]:
+        """
+        Streams the rows of a query in lists of at most `batch_size` rows, so
+        memory stays bounded whatever the size of the result.
+
+        The generator holds a pooled connection until it is exhausted, closed
+        or garbage collected. Setting `cancel` ends the stream quietly, also
+        interrupting a statement that is still computing its next row.
+        """
+        with contextlib.closing(
+            self._stream(sql, parameters, batch_size, cancel)
+        ) as stream:
+            for _, rows in stream:
+                yield rows
+
+    def query_df_chunks(
+        self,
+        sql: str,
+        parameters=None,
+        chunk_size: int = 50_000,
+        cancel: threading.Event | None = None,
+    ) -> Iterator[DataFrame]:
+        """
+        Streams the result of a query as DataFrames of at most `chunk_size`
+        rows. Resource handling and cancellation work as in `query_batches`.
+        """
+        with contextlib.closing(
+            self._stream(sql, parameters, chunk_size, cancel)
+        ) as stream:
+            for columns, rows in stream:
+                yield DataFrame.from_records(rows, columns=columns)
+
+    def _stream(
+        self,
+        sql: str,
+        parameters,
+        size: int,
+        cancel: threading.Event | None,
+    ) -> Iterator[Tuple[List[str], List[Tuple]]]:
+        if size < 1:
+            raise ValueError(f"BaseDb - Invalid batch size: {size}")
+        if parameters is None:
+            parameters = []
+
+        with self.pool.dedicated() as conn:
+            if cancel is not None:
+                conn.set_progress_handler(cancel.is_set, CANCEL_CHECK_STEPS)
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, parameters)
+                columns = [column[0] for column in cur.description or []]
+                while cancel is None or not cancel.is_set():
+                    rows = cur.fetchmany(size)
+                    if not rows:
+                        break
+                    yield columns, rows
+            except sqlite3.OperationalError:
+                # The progress handler aborts a cancelled statement
+                if cancel is None or not cancel.is_set():
+                    raise
+            finally:
+                cur.close()
+                if cancel is not None:
+                    conn.set_progress_handler(None, 0)
 
     def query_scalar(self, sql, parameters=None):
         if parameters is None:
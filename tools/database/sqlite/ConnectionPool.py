@@ -0,0 +1,246 @@
+import atexit
+import contextlib
+import sqlite3
+import threading
+import time
+from queue import Empty, LifoQueue
+from sqlite3 import Connection
+from typing import Callable, Dict, Iterator, Tuple
+
+
+def default_connection_factory(db_name: str) -> Connection:
+    # Pooled connections move between threads, although only one thread
+    # holds a given connection at any time.
+    return sqlite3.connect(db_name, check_same_thread=False)
+
+
+class ConnectionPool(object):
+    """
+    Thread-aware pool of read connections to a single SQLite database.
+
+    Connections are created lazily, up to `size`, and reused across calls.
+    A thread that already holds a connection gets the same one back on nested
+    acquisitions, so helpers like `query_scalar` never need two connections.
+    Connections idle for longer than `check_interval` seconds are checked with
+    a trivial query before being handed out and replaced if they fail.
+    `recycle` starts a new generation of connections: older ones are closed
+    instead of being pooled again, including those checked out at the time.
+    """
+
+    _pools: Dict[str, "ConnectionPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(
+        self,
+        db_name: str,
+        size: int = 4,
+        timeout: float = 30.0,
+        check_interval: float = 60.0,
+        factory: Callable[[str], Connection] = default_connection_factory,
+    ):
+        if size < 1:
+            raise ValueError(f"ConnectionPool - Invalid size: {size}")
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self._factory = factory
+        self._idle: LifoQueue[Tuple[Connection, float]] = LifoQueue()
+        self._created: int = 0
+        self._generation: int = 0
+        # Generation of every open connection, by connection id
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed: bool = False
+
+    @classmethod
+    def get(cls, db_name: str, **kwargs) -> "ConnectionPool":
+        """
+        Gets the process-wide pool for a database, creating it on first use.
+        The keyword arguments are only used when the pool is created.
+        :param db_name: Database file name
+        :return: The shared connection pool
+        """
+        with cls._pools_lock:
+            pool = cls._pools.get(db_name)
+            if pool is None or pool.closed:
+                pool = cls(db_name, **kwargs)
+                cls._pools[db_name] = pool
+            return pool
+
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.close()
+            cls._pools.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> Dict[str, int]:
+        idle = self._idle.qsize()
+        return {
+            "size": self.size,
+            "created": self._created,
+            "idle": idle,
+            "in_use": self._created - idle,
+        }
+
+    def acquire(self) -> Connection:
+        """
+        Acquires a connection for the calling thread. Blocks for up to
+        `timeout` seconds when all connections are in use.
+        :return: A pooled connection
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot acquire from a closed pool")
+
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        conn = self._checkout()
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn: Connection) -> None:
+        """
+        Returns a connection acquired by the calling thread to the pool.
+        :param conn: Connection returned by `acquire`
+        """
+        if getattr(self._local, "conn", None) is not conn:
+            raise ValueError("ConnectionPool - Connection not held by this thread")
+
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self._local.conn = None
+            self._checkin(conn)
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextlib.contextmanager
+    def dedicated(self) -> Iterator[Connection]:
+        """
+        Borrows a connection that is not bound to the calling thread, for
+        long-lived cursors such as streaming generators, which may be resumed
+        or closed from another thread. Nested acquisitions do not share it.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot acquire from a closed pool")
+
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def recycle(self) -> None:
+        """
+        Closes the idle connections, so the next acquisitions open new ones.
+        Connections in use are closed when they are released. Used after
+        schema changes, which immutable readers do not detect.
+        """
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(conn)
+
+    def close(self) -> None:
+        self._closed = True
+        self.recycle()
+
+    def _checkout(self) -> Connection:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except Empty:
+                conn = self._create()
+                if conn is not None:
+                    return conn
+
+                remaining = deadline - time.monotonic()
+                try:
+                    conn, last_used = self._idle.get(timeout=max(remaining, 0.0))
+                except Empty:
+                    raise TimeoutError(
+                        f"No connection to {self.db_name} available "
+                        f"after {self.timeout} seconds"
+                    ) from None
+
+            if self._is_stale(conn):
+                self._discard(conn)
+                continue
+            if time.monotonic() - last_used < self.check_interval:
+                return conn
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def _checkin(self, conn: Connection) -> None:
+        if self._closed or self._is_stale(conn):
+            self._discard(conn)
+            return
+
+        try:
+            # Never hand out a connection with a dangling transaction
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def _create(self) -> Connection | None:
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+            generation = self._generation
+
+        try:
+            conn = self._factory(self.db_name)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._generations[id(conn)] = generation
+        return conn
+
+    def _is_stale(self, conn: Connection) -> bool:
+        with self._lock:
+            return self._generations.get(id(conn)) != self._generation
+
+    def _discard(self, conn: Connection) -> None:
+        with self._lock:
+            self._created -= 1
+            self._generations.pop(id(conn), None)
+        with contextlib.suppress(sqlite3.Error):
+            conn.close()
+
+    @staticmethod
+    def _is_healthy(conn: Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+
+atexit.register(ConnectionPool.close_all)
@@ -0,0 +1,86 @@
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from sqlite3 import Connection
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """
+    SQLite connection settings, read from the `[database.performance]` section
+    of the configuration.
+
+    Readers open the database through a `mode=ro` URI, optionally with
+    `immutable=1`, which skips all file locking and change detection. Only use
+    `immutable` when nothing modifies the file while the application runs.
+    The writer settings only apply to the dedicated connections used by the
+    ingestion tools.
+    """
+
+    read_only: bool = False
+    immutable: bool = False
+    mmap_size: int = 0
+    cache_size: int | None = None
+    temp_store: str | None = None
+    query_only: bool = False
+    wal: bool = False
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> "ConnectionProfile":
+        return cls(
+            read_only=settings.get("read_only", False),
+            immutable=settings.get("immutable", False),
+            mmap_size=settings.get("mmap_size", 0),
+            cache_size=settings.get("cache_size"),
+            temp_store=settings.get("temp_store"),
+            query_only=settings.get("query_only", False),
+            wal=settings.get("wal", False),
+        )
+
+    def reader_uri(self, db_name: str) -> str:
+        uri = Path(db_name).absolute().as_uri()
+        if self.immutable:
+            return f"{uri}?mode=ro&immutable=1"
+        return f"{uri}?mode=ro"
+
+    def reader_pragmas(self) -> List[str]:
+        pragmas = []
+        if self.mmap_size:
+            pragmas.append(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.cache_size is not None:
+            pragmas.append(f"PRAGMA cache_size = {int(self.cache_size)}")
+        if self.temp_store is not None:
+            if self.temp_store.upper() not in ("DEFAULT", "FILE", "MEMORY"):
+                raise ValueError(
+                    f"ConnectionProfile - Invalid temp_store: {self.temp_store}"
+                )
+            pragmas.append(f"PRAGMA temp_store = {self.temp_store.upper()}")
+        if self.query_only:
+            pragmas.append("PRAGMA query_only = ON")
+        return pragmas
+
+    def connect_reader(self, db_name: str) -> Connection:
+        """
+        Opens a read connection with this profile. Used as the connection
+        pool factory, so the connection may move between threads.
+        """
+        if self.read_only or self.immutable:
+            conn = sqlite3.connect(
+                self.reader_uri(db_name), uri=True, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(db_name, check_same_thread=False)
+        for pragma in self.reader_pragmas():
+            conn.execute(pragma)
+        return conn
+
+    def connect_writer(self, db_name: str) -> Connection:
+        """
+        Opens a dedicated read-write connection, switching the database to
+        write-ahead logging when `wal` is set.
+        """
+        conn = sqlite3.connect(db_name, check_same_thread=True)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode = WAL")
+        return conn
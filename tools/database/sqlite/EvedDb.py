@@ -4,17 +4,45 @@ import pandas as pd
 
 from tools.config import load_config
 from tools.database.sqlite.BaseDb import BaseDb
+from tools.database.sqlite.ConnectionProfile import ConnectionProfile
+from tools.database.sqlite.IndexManager import IndexManager, IndexSpec
+
+EVED_INDEXES = [
+    IndexSpec(
+        "idx_signal_vehicle_trip_ts", "signal", ("vehicle_id", "trip_id", "time_stamp")
+    ),
+    IndexSpec("idx_node_traj", "node", ("traj_id",)),
+    IndexSpec("idx_trajectory_vehicle_trip", "trajectory", ("vehicle_id", "trip_id")),
+    IndexSpec("idx_trajectory_dt_ini", "trajectory", ("dt_ini",)),
+    IndexSpec("idx_trajectory_dt_end", "trajectory", ("dt_end",)),
+    IndexSpec("idx_trajectory_length_m", "trajectory", ("length_m",)),
+    IndexSpec("idx_trajectory_vehicle_dt_ini", "trajectory", ("vehicle_id", "dt_ini")),
+]
 
 
 class EvedDb(BaseDb):
-    def __init__(self):
+    def __init__(self, db_name: str | None = None):
         config = load_config()
         database = config.get("database")
-        filename = path.join(
-            database.get("folder", "./data/eved.db"),
-            database.get("eved", "eved.sqlite"),
+        pool = database.get("pool", {})
+        if db_name is None:
+            db_name = path.join(
+                database.get("folder", "./data/eved.db"),
+                database.get("eved", "eved.sqlite"),
+            )
+        super().__init__(
+            db_name=db_name,
+            pool_size=pool.get("size", 4),
+            pool_timeout=pool.get("timeout", 30.0),
+            check_interval=pool.get("check_interval", 60.0),
+            profile=ConnectionProfile.from_config(database.get("performance", {})),
         )
-        super().__init__(db_name=filename)
+
+    def index_manager(self) -> IndexManager:
+        manager = IndexManager(self)
+        for spec in EVED_INDEXES:
+            manager.register_index(spec)
+        return manager
 
     def insert_vehicles(self, vehicles):
         self.insert_list("sql/eved/insert_vehicle.sql", vehicles)
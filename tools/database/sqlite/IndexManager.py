@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from tools.database.sqlite.BaseDb import BaseDb
+
+
+@dataclass
+class IndexSpec:
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+
+    def to_sql(self) -> str:
+        unique = "UNIQUE " if self.unique else ""
+        return (
+            f"CREATE {unique}INDEX IF NOT EXISTS {self.name} "
+            f"ON {self.table} ({', '.join(self.columns)})"
+        )
+
+
+@dataclass
+class QuerySpec:
+    name: str
+    sql: str
+    parameters: Sequence = ()
+
+
+@dataclass
+class QueryPlanReport:
+    name: str
+    plan: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return len(self.full_scans) == 0
+
+
+class IndexManager(object):
+    """
+    Audits and provisions the indexes the registered queries rely on.
+
+    An index spec is satisfied by any existing index on the same table whose
+    leading columns match the spec's columns. Registered queries are checked
+    with EXPLAIN QUERY PLAN and every plain table scan is reported.
+    """
+
+    def __init__(self, db: BaseDb):
+        self.db = db
+        self._indexes: Dict[str, IndexSpec] = {}
+        self._queries: Dict[str, QuerySpec] = {}
+
+    @property
+    def indexes(self) -> List[IndexSpec]:
+        return list(self._indexes.values())
+
+    @property
+    def queries(self) -> List[QuerySpec]:
+        return list(self._queries.values())
+
+    def register_index(self, spec: IndexSpec) -> None:
+        self._indexes[spec.name] = spec
+
+    def register_query(self, name: str, sql: str, parameters: Sequence = ()) -> None:
+        self._queries[name] = QuerySpec(name, sql, parameters)
+
+    def table_indexes(self, table: str) -> Dict[str, Tuple[str, ...]]:
+        """
+        Lists the indexes of a table with their key columns, in order.
+        :param table: Table name
+        :return: Dictionary of index column tuples keyed by index name
+        """
+        result: Dict[str, Tuple[str, ...]] = {}
+        for row in self.db.query(f"PRAGMA index_list('{table}')"):
+            index_name = row[1]
+            columns = self.db.query(f"PRAGMA index_info('{index_name}')")
+            result[index_name] = tuple(col[2] for col in sorted(columns))
+        return result
+
+    def is_satisfied(self, spec: IndexSpec) -> bool:
+        if not self.db.table_exists(spec.table):
+            return True
+        width = len(spec.columns)
+        return any(
+            columns[:width] == spec.columns
+            for columns in self.table_indexes(spec.table).values()
+        )
+
+    def missing_indexes(self) -> List[IndexSpec]:
+        return [spec for spec in self._indexes.values() if not self.is_satisfied(spec)]
+
+    def explain(self, sql: str, parameters: Sequence = ()) -> List[str]:
+        rows = self.db.query(f"EXPLAIN QUERY PLAN {sql}", list(parameters))
+        return [row[3] for row in rows]
+
+    def audit(self) -> List[QueryPlanReport]:
+        """
+        Runs EXPLAIN QUERY PLAN on every registered query.
+        :return: One report per query, listing its full table scans
+        """
+        reports = []
+        for query in self._queries.values():
+            plan = self.explain(query.sql, query.parameters)
+            full_scans = [
+                detail
+                for detail in plan
+                if detail.startswith("SCAN ") and " USING " not in detail
+            ]
+            reports.append(QueryPlanReport(query.name, plan, full_scans))
+        return reports
+
+    def provision(self) -> List[IndexSpec]:
+        """
+        Creates the missing indexes and refreshes the planner statistics.
+        Pooled readers are recycled, so they see the new indexes.
+        :return: The indexes that were created
+        """
+        missing = self.missing_indexes()
+        for spec in missing:
+            self.db.execute_sql(spec.to_sql())
+        if missing:
+            self.db.execute_sql("ANALYZE")
+            self.db.pool.recycle()
+        return missing
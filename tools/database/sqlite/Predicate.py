@@ -0,0 +1,80 @@
+import json
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Sequence, Tuple
+
+OPERATORS = ("=", "<>", "<", "<=", ">", ">=", "in", "is null", "is not null")
+
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    Comparison of a named column with a value. Column names are resolved
+    against a whitelist when the predicate is rendered, and values are always
+    bound as parameters. The `in` operator takes a sequence of values, bound
+    as a single JSON array, so its length is not limited by the number of
+    parameters.
+    """
+
+    column: str
+    op: str
+    value: Any = None
+
+
+@dataclass(frozen=True)
+class AllOf:
+    parts: Tuple["Predicate", ...]
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    parts: Tuple["Predicate", ...]
+
+
+Predicate = Condition | AllOf | AnyOf
+
+
+def to_sql(predicate: Predicate, columns: Mapping[str, str]) -> Tuple[str, List[Any]]:
+    """
+    Renders a predicate as a parameterized SQL expression.
+    :param predicate: Predicate tree
+    :param columns: SQL expressions of the columns that may be referenced
+    :return: SQL expression and its parameters
+    """
+    match predicate:
+        case Condition(column, op, value):
+            if column not in columns:
+                raise ValueError(f"Predicate - Invalid column: {column}")
+            if op not in OPERATORS:
+                raise ValueError(f"Predicate - Invalid operator: {op}")
+            if op.startswith("is "):
+                return f"{columns[column]} {op}", []
+            if op == "in":
+                sql = f"{columns[column]} in (select value from json_each(?))"
+                return sql, [json.dumps(list(value))]
+            return f"{columns[column]} {op} ?", [value]
+
+        case AllOf(parts) | AnyOf(parts):
+            if not parts:
+                return ("1 = 1" if isinstance(predicate, AllOf) else "1 = 0"), []
+            joiner = " and " if isinstance(predicate, AllOf) else " or "
+            clauses, parameters = [], []
+            for part in parts:
+                sql, values = to_sql(part, columns)
+                clauses.append(f"({sql})")
+                parameters.extend(values)
+            return joiner.join(clauses), parameters
+
+    raise TypeError(f"Predicate - Invalid predicate: {predicate!r}")
+
+
+def where_clause(
+    predicates: Sequence[Predicate], columns: Mapping[str, str]
+) -> Tuple[str, List[Any]]:
+    """
+    Renders predicates joined with `and` as a WHERE clause, or an empty string
+    when there are none.
+    """
+    if not predicates:
+        return "", []
+    sql, parameters = to_sql(AllOf(tuple(predicates)), columns)
+    return f"where {sql}", parameters